@@ -41,9 +41,11 @@ var FEATURED_EVENT_OVERRIDE_START    = "";
  * NYRG site.js (collaborator-friendly)
  *
  * This file contains the client-side rendering for:
- * - Instagram embeds (from data/instagram.json)
+ * - Homepage first render (from data/home.json, falling back to the feeds below)
+ * - Instagram post cards / embeds (from data/instagram.json)
  * - Gallery cards (from data/gallery.json)
  * - Jobs board (from data/jobs.json)
+ * - Site search box in the header (from the prebuilt index in data/search/)
  *
  * IMPORTANT:
  * - Do not rename DOM element IDs referenced here unless you update BOTH:
@@ -64,9 +66,11 @@ var FEATURED_EVENT_OVERRIDE_START    = "";
  * NYRG site.js
  *
  * Purpose:
- * - Load the latest Instagram post URLs from: data/instagram.json
- * - Render up to 3 "best-effort" Instagram embeds on the homepage.
- * - Always provide clickable fallback links if embeds are blocked.
+ * - Load the latest Instagram posts from: data/instagram.json
+ * - Render them on the homepage as static cards (cached thumbnail + caption).
+ *   Posts without a cached thumbnail fall back to "best-effort" Instagram embeds.
+ * - Instagram's embed script is only loaded when an embed needs it (the profile
+ *   embed loads it when it scrolls into view).
  *
  * This file is intentionally small and heavily commented because
  * collaborators may be new to coding.
@@ -80,7 +84,14 @@ var FEATURED_EVENT_OVERRIDE_START    = "";
  * {
  *   "updated_at": "2026-02-07T12:34:56Z",
  *   "posts": [
- *     { "url": "https://www.instagram.com/p/POST_ID/" },
+ *     {
+ *       "url": "https://www.instagram.com/p/POST_ID/",
+ *       "shortcode": "POST_ID",
+ *       "media_type": "image",              // image | video | reel | carousel (optional)
+ *       "taken_at": "2026-02-01T18:00:00+00:00",  // optional
+ *       "caption": "First 200 characters...",     // optional
+ *       "thumbnail": "assets/instagram/POST_ID.jpg"  // optional (no thumbnail = embed)
+ *     },
  *     ...
  *   ]
  * }
@@ -96,6 +107,29 @@ function setHidden(el, hidden) {
   el.style.display = hidden ? "none" : "";
 }
 
+// Homepage bundle written by scripts/home_bundle.py: a rotator sample, the next Luma events
+// and the latest Instagram posts in one small file (instead of gallery.json + luma.json +
+// instagram.json). Each homepage section uses its part of the bundle when present and
+// fetches its own feed otherwise.
+const HOME_BUNDLE_URL = "data/home.json"; // set to "" to always load the individual feeds
+let _homeBundlePromise = null;
+
+// Fetched once per page view, shared by all homepage sections. Resolves to null on any error.
+function loadHomeBundle() {
+  if (!HOME_BUNDLE_URL) return Promise.resolve(null);
+  if (!_homeBundlePromise) {
+    const url = new URL(HOME_BUNDLE_URL, document.baseURI);
+    url.searchParams.set("_ts", String(Date.now()));
+    _homeBundlePromise = fetch(url.toString(), { cache: "no-store" })
+      .then((res) => (res.ok ? res.json() : null))
+      .catch((e) => {
+        console.warn("[NYRG] Home bundle unavailable, loading the individual feeds.", e);
+        return null;
+      });
+  }
+  return _homeBundlePromise;
+}
+
 // Randomize an array in-place (Fisher-Yates).
 // We use this to randomize Featured Photos on each page load.
 function shuffleInPlace(arr) {
@@ -161,6 +195,102 @@ function instaMaxPostsForWidth() {
   return window.matchMedia("(max-width: 980px)").matches ? 2 : 4;
 }
 
+// Load Instagram's embed script once (it turns <blockquote class="instagram-media"> into embeds).
+function loadInstagramEmbedScript() {
+  const processEmbeds = () => {
+    if (window.instgrm && window.instgrm.Embeds && window.instgrm.Embeds.process) {
+      window.instgrm.Embeds.process();
+    }
+  };
+
+  if (!document.getElementById("ig-embed-script")) {
+    const s = document.createElement("script");
+    s.id = "ig-embed-script";
+    s.async = true;
+    s.src = "https://www.instagram.com/embed.js";
+    s.onload = processEmbeds;
+    document.body.appendChild(s);
+  } else {
+    processEmbeds();
+  }
+}
+
+const INSTA_MEDIA_LABELS = { video: "Video", reel: "Reel", carousel: "Album" };
+
+// One static post card: a link with the cached thumbnail, a media badge, the date and the caption.
+// Built with DOM APIs (textContent), so captions can never inject HTML.
+function buildInstaCard(post, onImageError) {
+  const card = document.createElement("a");
+  card.className = "insta-card";
+  card.href = post.url;
+  card.target = "_blank";
+  card.rel = "noopener";
+
+  const media = document.createElement("div");
+  media.className = "insta-card-media";
+  const img = document.createElement("img");
+  img.src = new URL(post.thumbnail, document.baseURI).toString();
+  img.alt = post.caption || "Instagram post";
+  img.loading = "lazy";
+  img.decoding = "async";
+  img.addEventListener("error", () => onImageError(card), { once: true });
+  media.appendChild(img);
+
+  const label = INSTA_MEDIA_LABELS[post.media_type];
+  if (label) {
+    const badge = document.createElement("span");
+    badge.className = "insta-card-badge";
+    badge.textContent = label;
+    media.appendChild(badge);
+  }
+  card.appendChild(media);
+
+  const body = document.createElement("div");
+  body.className = "insta-card-body";
+  const when = post.taken_at ? new Date(post.taken_at) : null;
+  if (when && !Number.isNaN(when.getTime())) {
+    const time = document.createElement("time");
+    time.className = "small";
+    time.dateTime = post.taken_at;
+    time.textContent = when.toLocaleDateString(undefined, { year: "numeric", month: "short", day: "numeric" });
+    body.appendChild(time);
+  }
+  if (post.caption) {
+    const caption = document.createElement("p");
+    caption.className = "insta-card-caption";
+    caption.textContent = post.caption;
+    body.appendChild(caption);
+  }
+  card.appendChild(body);
+  return card;
+}
+
+function buildInstaEmbed(url) {
+  const block = document.createElement("blockquote");
+  block.className = "instagram-media";
+  block.setAttribute("data-instgrm-permalink", url);
+  block.setAttribute("data-instgrm-version", "14");
+  return block;
+}
+
+// The profile embed at the bottom of the card is the only embed on a normal page load:
+// fetch Instagram's script when it is about to scroll into view, not up front.
+function deferInstagramProfileEmbed() {
+  const wrap = document.querySelector(".insta-profile-wrap");
+  if (!wrap) return;
+  if (!("IntersectionObserver" in window)) {
+    loadInstagramEmbedScript();
+    return;
+  }
+  const io = new IntersectionObserver((entries) => {
+    if (entries.some((e) => e.isIntersecting)) {
+      io.disconnect();
+      loadInstagramEmbedScript();
+    }
+  }, { rootMargin: "300px" });
+  io.observe(wrap);
+}
+
 async function loadInstagramLatest() {
   const container = document.getElementById("insta-latest");
   const fallback = document.getElementById("insta-fallback-links");
@@ -176,32 +306,39 @@ async function loadInstagramLatest() {
   };
 
   try {
-    // IMPORTANT:
-    // Build an absolute URL based on the page base URL.
-    // This makes it work on / and on /branch-name/ and on nested pages.
-    const jsonUrl = new URL("data/instagram.json", document.baseURI);
+    // The homepage bundle has the latest posts; otherwise load instagram.json.
+    const home = await loadHomeBundle();
+    let allPosts = Array.isArray(home?.instagram) ? home.instagram : null;
 
-    // Cache-bust to reduce stale JSON on GitHub Pages/CDN layers.
-    jsonUrl.searchParams.set("_ts", String(Date.now()));
+    if (!allPosts) {
+      // IMPORTANT:
+      // Build an absolute URL based on the page base URL.
+      // This makes it work on / and on /branch-name/ and on nested pages.
+      const jsonUrl = new URL("data/instagram.json", document.baseURI);
 
-    const res = await fetch(jsonUrl.toString(), { cache: "no-store" });
+      // Cache-bust to reduce stale JSON on GitHub Pages/CDN layers.
+      jsonUrl.searchParams.set("_ts", String(Date.now()));
 
-    // If the file is missing or returns an error, show a friendly message.
-    if (!res.ok) {
-      setMessage(container, "Instagram feed temporarily unavailable.");
-      if (fallback) fallback.innerHTML = "";
-      return;
-    }
+      const res = await fetch(jsonUrl.toString(), { cache: "no-store" });
 
-    const data = await res.json();
+      // If the file is missing or returns an error, show a friendly message.
+      if (!res.ok) {
+        setMessage(container, "Instagram feed temporarily unavailable.");
+        if (fallback) fallback.innerHTML = "";
+        return;
+      }
+
+      const data = await res.json();
+      allPosts = Array.isArray(data?.posts) ? data.posts : [];
+    }
 
-    // Extract up to 2 or 4 URLs (responsive) safely.
-    const posts = Array.isArray(data?.posts) ? data.posts : [];
+    // Extract up to 2 or 4 posts (responsive) safely.
     const maxPosts = instaMaxPostsForWidth();
-    const urls = posts
-      .map((p) => (p && typeof p.url === "string" ? p.url.trim() : ""))
-      .filter(Boolean)
+    const posts = allPosts
+      .filter((p) => p && typeof p.url === "string" && p.url.trim())
+      .map((p) => ({ ...p, url: p.url.trim() }))
       .slice(0, maxPosts);
+    const urls = posts.map((p) => p.url);
 
     // You asked to remove this label, keep it blank.
     if (updatedEl) updatedEl.textContent = "";
@@ -213,15 +350,21 @@ async function loadInstagramLatest() {
       return;
     }
 
-    // Build embed placeholders.
-    // Instagram will convert these <blockquote> elements into embeds.
+    // Static cards for posts with a cached thumbnail, embed placeholders for the rest.
+    // Instagram will convert the <blockquote> elements into embeds.
     container.innerHTML = "";
-    urls.forEach((url) => {
-      const block = document.createElement("blockquote");
-      block.className = "instagram-media";
-      block.setAttribute("data-instgrm-permalink", url);
-      block.setAttribute("data-instgrm-version", "14");
-      container.appendChild(block);
+    let needsEmbeds = false;
+    posts.forEach((post) => {
+      if (typeof post.thumbnail === "string" && post.thumbnail) {
+        // If the thumbnail is missing on the server, swap the card for an embed.
+        container.appendChild(buildInstaCard(post, (card) => {
+          card.replaceWith(buildInstaEmbed(post.url));
+          loadInstagramEmbedScript();
+        }));
+      } else {
+        container.appendChild(buildInstaEmbed(post.url));
+        needsEmbeds = true;
+      }
     });
 
     // Build fallback links (currently configured to hide these in CSS).
@@ -231,23 +374,10 @@ async function loadInstagramLatest() {
         .join("");
     }
 
-    // Ensure Instagram embed script exists, then process embeds.
+    // Only load Instagram's embed script if a post has no static card.
     // If the script is blocked, the fallback links remain usable.
-    const processEmbeds = () => {
-      if (window.instgrm && window.instgrm.Embeds && window.instgrm.Embeds.process) {
-        window.instgrm.Embeds.process();
-      }
-    };
-
-    if (!document.getElementById("ig-embed-script")) {
-      const s = document.createElement("script");
-      s.id = "ig-embed-script";
-      s.async = true;
-      s.src = "https://www.instagram.com/embed.js";
-      s.onload = processEmbeds;
-      document.body.appendChild(s);
-    } else {
-      processEmbeds();
+    if (needsEmbeds) {
+      loadInstagramEmbedScript();
     }
   } catch (e) {
     // If anything unexpected happens, fail gracefully.
@@ -260,6 +390,7 @@ async function loadInstagramLatest() {
 // Run immediately on page load.
 // This file is included from the shared layout near the end of the page, so the DOM is already present.
 loadInstagramLatest();
+deferInstagramProfileEmbed();
 
 let lastMaxPosts = instaMaxPostsForWidth();
 window.addEventListener("resize", () => {
@@ -270,6 +401,140 @@ window.addEventListener("resize", () => {
   }
 });
 
+/**
+ * Gallery data loader (shared by the homepage rotator and the gallery page).
+ *
+ * Reads data/gallery.json. If GALLERY_SHARDS_MANIFEST is set, it prefers the sharded
+ * layout written by `update_gallery_json.py --shards-dir data/gallery` instead:
+ * - data/gallery/manifest.json: event titles, months, shard URLs (small, always fresh)
+ * - data/gallery/events/<hash>.json: one event with its images
+ * Only the first `imagesForFirst` events download their shard; the rest keep
+ * their metadata with an empty images list.
+ *
+ * Off by default: the workflows do not write shards, so the manifest request would only
+ * be a 404 before every gallery.json load (and an old manifest left in place would win
+ * over a newer gallery.json). Set it together with NYRG_GALLERY_SHARDS_DIR.
+ * Falls back to data/gallery.json if the manifest cannot be loaded.
+ * Returns the gallery.json shape ({ root_folder, folder_id, events, ... }) or null.
+ */
+const GALLERY_SHARDS_MANIFEST = ""; // e.g. "data/gallery/manifest.json" when the shards are published
+
+/**
+ * gallery.json schema 2 (update_gallery_json.py --schema 2) -> schema 1 shape.
+ *
+ * Schema 2 stores each image once as columns (id, name, mime, link) and events
+ * list image indexes. URLs are rebuilt from templates that contain "{id}", except
+ * where the optional "url" / "variants" columns hold the image's own value.
+ * Schema 1 data is returned unchanged.
+ */
+function expandGalleryData(data) {
+  if (!data || data.schema !== 2) return data;
+
+  const cols = data.images || {};
+  const ids = Array.isArray(cols.id) ? cols.id : [];
+  const mimeTypes = Array.isArray(data.mime_types) ? data.mime_types : [];
+  const viewLinks = Array.isArray(data.view_links) ? data.view_links : [];
+  const fill = (template, id) => String(template || "").split("{id}").join(id);
+
+  const variantWidths = Array.isArray(data.variant_widths) ? data.variant_widths : [];
+
+  const images = ids.map((id, i) => {
+    const link = cols.link ? cols.link[i] : "";
+    const img = {
+      id,
+      name: cols.name ? cols.name[i] : "",
+      mimeType: mimeTypes[cols.mime ? cols.mime[i] : 0] || "",
+      url: fill(data.thumb_url, id),
+      webViewLink: typeof link === "number" ? fill(viewLinks[link], id) : (link || "")
+    };
+    // Optional columns (null = unknown): dimensions, capture time, placeholder colour.
+    ["width", "height", "taken_at", "placeholder"].forEach((name) => {
+      if (Array.isArray(cols[name]) && cols[name][i] != null) img[name] = cols[name][i];
+    });
+    if (Array.isArray(cols.url) && cols.url[i] != null) img.url = cols.url[i];
+    const ownVariants = Array.isArray(cols.variants) ? cols.variants[i] : null;
+    if (ownVariants != null) {
+      if (ownVariants.length > 0) img.variants = ownVariants;
+    } else if (variantWidths.length > 0) {
+      img.variants = variantWidths.map((w) => ({ w, url: fill(data.variant_url, id).split("{w}").join(String(w)) }));
+    }
+    return img;
+  });
+
+  const events = (Array.isArray(data.events) ? data.events : []).map((ev) =>
+    Array.isArray(ev?.images) ? { ...ev, images: ev.images.map((i) => images[i]).filter(Boolean) } : ev
+  );
+
+  // Flat list (schema 1 "images"): every Drive event's images, sorted by name.
+  const flat = [];
+  events.forEach((ev) => {
+    if (ev?.type === "drive" && Array.isArray(ev.images)) flat.push(...ev.images);
+  });
+  const nameKey = (img) => (img.name || "").toLowerCase();
+  flat.sort((a, b) => (nameKey(a) < nameKey(b) ? -1 : nameKey(a) > nameKey(b) ? 1 : 0));
+
+  const out = { ...data, images: flat, events };
+  delete out.schema;
+  delete out.thumb_url;
+  delete out.view_links;
+  delete out.mime_types;
+  delete out.variant_url;
+  delete out.variant_widths;
+  return out;
+}
+
+/**
+ * Pick the smallest image URL that still looks sharp in a box `cssWidth` px wide.
+ *
+ * Images written with `update_gallery_json.py --variant-widths` carry
+ * `variants: [{ w, url }, ...]`. Without variants this returns img.url (w2000).
+ */
+function bestImageUrl(img, cssWidth) {
+  const url = img && typeof img.url === "string" ? img.url.trim() : "";
+  const variants = Array.isArray(img?.variants)
+    ? img.variants.filter((v) => v && typeof v.url === "string" && v.w > 0).sort((a, b) => a.w - b.w)
+    : [];
+  if (variants.length === 0 || !(cssWidth > 0)) return url;
+
+  const needed = cssWidth * (window.devicePixelRatio || 1);
+  const fit = variants.find((v) => v.w >= needed) || variants[variants.length - 1];
+  return fit.url || url;
+}
+
+async function loadGalleryData({ imagesForFirst = Infinity } = {}) {
+  if (GALLERY_SHARDS_MANIFEST) {
+    try {
+      const manifestUrl = new URL(GALLERY_SHARDS_MANIFEST, document.baseURI);
+      manifestUrl.searchParams.set("_ts", String(Date.now()));
+      const res = await fetch(manifestUrl.toString(), { cache: "no-store" });
+
+      if (res.ok) {
+        const manifest = await res.json();
+        const entries = Array.isArray(manifest?.events) ? manifest.events : [];
+
+        const events = await Promise.all(entries.map(async (entry, i) => {
+          if (i >= imagesForFirst || !entry?.shard) return { ...entry, images: [] };
+
+          // Shard names are content hashes, so the normal browser cache is safe here.
+          const shardRes = await fetch(new URL(entry.shard, res.url).toString());
+          if (!shardRes.ok) return { ...entry, images: [] };
+          return await shardRes.json();
+        }));
+
+        return { ...manifest, events };
+      }
+    } catch (e) {
+      console.warn("[NYRG] Gallery manifest unavailable, using gallery.json.", e);
+    }
+  }
+
+  const jsonUrl = new URL("data/gallery.json", document.baseURI);
+  jsonUrl.searchParams.set("_ts", String(Date.now()));
+  const res = await fetch(jsonUrl.toString(), { cache: "no-store" });
+  if (!res.ok) return null;
+  return expandGalleryData(await res.json());
+}
+
 async function loadGalleryRotatorSlides() {
   const slidesRoot = document.getElementById("hero-rotator-slides");
   const captionEl = document.getElementById("hero-rotator-caption");
@@ -283,23 +548,29 @@ async function loadGalleryRotatorSlides() {
   const MAX_EVENTS_USED = 50;    // safety cap
 
   try {
-    const jsonUrl = new URL("data/gallery.json", document.baseURI);
-    jsonUrl.searchParams.set("_ts", String(Date.now()));
-
-    const res = await fetch(jsonUrl.toString(), { cache: "no-store" });
-
-    // If gallery.json fails to load, treat it as "no accessible photos".
-    if (!res.ok) {
+    // The homepage bundle has a small sample of photos per event (same shape as gallery.json
+    // events), so the full gallery.json is only downloaded if the bundle is missing.
+    const home = await loadHomeBundle();
+    const data = Array.isArray(home?.rotator) && home.rotator.length > 0
+      ? { events: home.rotator }
+      : await loadGalleryData({ imagesForFirst: MAX_EVENTS_USED });
+
+    // If gallery data fails to load, treat it as "no accessible photos".
+    if (!data) {
       setPhotosVisibility({ show: false });
       return;
     }
 
-    const data = await res.json();
     const events = Array.isArray(data?.events) ? data.events : [];
 
+    // Width the rotator needs. object-fit: cover crops landscape photos to the frame
+    // height, so also allow for a 3:2 photo at full height.
+    const rotatorWidth = Math.max(imgEl.clientWidth || 0, (imgEl.clientHeight || 0) * 1.5) || 900;
+
     // Helper: normalize images into a consistent shape
     const shapeImage = (img, caption) => ({
-      url: img && typeof img.url === "string" ? img.url.trim() : "",
+      url: bestImageUrl(img, rotatorWidth),
+      placeholder: img && typeof img.placeholder === "string" ? img.placeholder : "",
       caption: typeof caption === "string" && caption.trim() ? caption.trim() : "Featured photo",
       webViewLink: img && typeof img.webViewLink === "string" ? img.webViewLink.trim() : ""
     });
@@ -391,12 +662,14 @@ async function loadGalleryRotatorSlides() {
         const d = document.createElement("div");
         d.setAttribute("data-image-url", s.url);
         d.setAttribute("data-caption", s.caption || "Featured photo");
+        if (s.placeholder) d.setAttribute("data-placeholder", s.placeholder);
         slidesRoot.appendChild(d);
       });
 
       // Prime hero image
       if (deck.length > 0) {
         if (captionEl) captionEl.textContent = deck[0].caption || "Featured photo";
+        imgEl.style.backgroundColor = deck[0].placeholder || "";
         imgEl.src = deck[0].url;
         imgEl.alt = deck[0].caption || "Featured photo";
       }
@@ -427,6 +700,7 @@ async function loadGalleryRotatorSlides() {
  * This reads slide entries from #hero-rotator-slides where each child has:
  * - data-image-url: image URL to show
  * - data-caption: text shown below the image
+ * - data-placeholder: optional colour shown while the image loads
  */
 function loadHeroRotator() {
   const imgEl = document.getElementById("hero-rotator-image");
@@ -444,7 +718,8 @@ function loadHeroRotator() {
     Array.from(slidesRoot.children)
       .map((el) => ({
         url: (el.getAttribute("data-image-url") || "").trim(),
-        caption: (el.getAttribute("data-caption") || "").trim()
+        caption: (el.getAttribute("data-caption") || "").trim(),
+        placeholder: (el.getAttribute("data-placeholder") || "").trim()
       }))
       .filter((s) => s.url);
 
@@ -455,6 +730,7 @@ function loadHeroRotator() {
 
   const render = () => {
     const active = slides[idx];
+    imgEl.style.backgroundColor = active.placeholder || "";
     imgEl.src = active.url;
     imgEl.alt = active.caption || "Featured photo";
     if (captionEl) captionEl.textContent = active.caption || "Featured photo";
@@ -564,6 +840,9 @@ loadGalleryRotatorSlides().then(loadHeroRotator);
    - Rotate Drive event thumbnails every 5 seconds
 
    Important:
+   - The cards are normally already in the page: update_gallery_json.py writes
+     them to _includes/gallery_cards.html. Then this code only adds the rotation
+     (cards with data-event-id). It renders everything itself if they are missing.
    - External events come from a Google Sheet (published as CSV) and are merged
      into data/gallery.json by update_gallery_json.py.
    - We use document.baseURI so this works on branch previews too.
@@ -593,7 +872,7 @@ function pickRandom(arr) {
   return arr[Math.floor(Math.random() * arr.length)];
 }
 
-function buildGalleryCard({ title, photographer, note, href, thumbUrl, linkHint }) {
+function buildGalleryCard({ title, photographer, note, href, thumbUrl, linkHint, placeholder, width, height }) {
   const card = document.createElement("div");
   card.className = "gallery-card";
 
@@ -607,6 +886,14 @@ function buildGalleryCard({ title, photographer, note, href, thumbUrl, linkHint
   img.className = "gallery-thumb";
   img.loading = "lazy";
   img.alt = title;
+
+  // Known size + placeholder colour (from update_gallery_json.py) so the card
+  // does not jump or flash empty while the photo loads.
+  if (width > 0 && height > 0) {
+    img.width = width;
+    img.height = height;
+  }
+  if (placeholder) img.style.backgroundColor = placeholder;
   img.src = thumbUrl;
 
   const body = document.createElement("div");
@@ -682,11 +969,12 @@ async function loadGalleryPage() {
   }
 
   // Pick a new image URL, trying to avoid repeating the current image.
-  function pickNextUrl(imgs, currentUrl) {
+  // cssWidth: rendered thumbnail width, used to choose the smallest adequate variant.
+  function pickNextUrl(imgs, currentUrl, cssWidth) {
     if (!Array.isArray(imgs) || imgs.length === 0) return "";
 
     const urls = imgs
-      .map((x) => (x && typeof x.url === "string" ? x.url : ""))
+      .map((x) => bestImageUrl(x, cssWidth))
       .filter(Boolean);
 
     if (urls.length === 0) return "";
@@ -706,19 +994,87 @@ async function loadGalleryPage() {
     return urls[0];
   }
 
+  // Round-robin thumbnail rotation:
+  // - Desktop: 1 card changes every 2s
+  // - Mobile: 1 card changes every 3s
+  // - Initial delay: first change happens after stepMs (not immediately)
+  // rotatables: [{ imgEl, imgs, currentUrl, width }]
+  function startRotation(rotatables) {
+    clearRotationTimer();
+    if (rotatables.length === 0) return;
+
+    const stepMs = galleryThumbStepMs();
+    const initialDelayMs = stepMs;
+
+    let slot = 0;
+
+    const tick = () => {
+      // If the viewport changed since we started, we re-render anyway on breakpoint changes.
+      // But this keeps timing correct even without a rerender.
+      const liveStepMs = galleryThumbStepMs();
+
+      const r = rotatables[slot];
+      slot = (slot + 1) % rotatables.length;
+
+      // Cards hidden by CSS (pre-rendered cards 3-4 on mobile) are skipped.
+      const nextUrl = r.imgEl.offsetParent ? pickNextUrl(r.imgs, r.currentUrl, r.width) : "";
+      if (nextUrl && nextUrl !== r.currentUrl) {
+        r.imgEl.style.opacity = "0.15";
+        setTimeout(() => {
+          // A pre-rendered srcset would win over src.
+          r.imgEl.removeAttribute("srcset");
+          r.imgEl.src = nextUrl;
+          r.imgEl.style.opacity = "1";
+          r.currentUrl = nextUrl;
+        }, 180);
+      }
+
+      rotationTimeout = setTimeout(tick, liveStepMs);
+    };
+
+    rotationTimeout = setTimeout(tick, initialDelayMs);
+  }
+
+  // Pre-rendered cards: only attach the rotation (the page is already complete).
+  const prerendered = grid.querySelectorAll(".gallery-card");
+  if (prerendered.length > 0) {
+    try {
+      const data = await loadGalleryData({ imagesForFirst: 4 });
+      const events = Array.isArray(data?.events) ? data.events : [];
+      const byId = new Map(events.filter((ev) => ev?.type === "drive" && ev.id).map((ev) => [ev.id, ev]));
+
+      const rotatables = [];
+      grid.querySelectorAll(".gallery-card[data-event-id]").forEach((card) => {
+        const ev = byId.get(card.dataset.eventId);
+        const imgEl = card.querySelector(".gallery-thumb");
+        const imgs = Array.isArray(ev?.images) ? ev.images : [];
+        if (!imgEl || imgs.length < 2) return;
+        rotatables.push({
+          imgEl,
+          imgs,
+          currentUrl: imgEl.currentSrc || imgEl.src,
+          width: imgEl.clientWidth || 400,
+        });
+      });
+      startRotation(rotatables);
+    } catch (e) {
+      // The cards stay as they are; only the rotation is missing.
+      console.warn("[NYRG] Gallery rotation unavailable.", e);
+    }
+    return;
+  }
+
   try {
     // Build an absolute URL for the default thumbnail that works on branch previews.
     const defaultThumb = new URL("assets/icon.png", document.baseURI).toString();
 
-    const jsonUrl = new URL("data/gallery.json", document.baseURI);
-    jsonUrl.searchParams.set("_ts", String(Date.now()));
-    const res = await fetch(jsonUrl.toString(), { cache: "no-store" });
-    if (!res.ok) {
+    // Only the 4 "recent" cards need images; the past list uses titles only.
+    const data = await loadGalleryData({ imagesForFirst: 4 });
+    if (!data) {
       setMessage(grid, "Gallery temporarily unavailable.");
       return;
     }
 
-    const data = await res.json();
     const events = Array.isArray(data?.events) ? data.events : [];
     const rootFolderUrl =
       data?.root_folder?.url ||
@@ -743,6 +1099,9 @@ async function loadGalleryPage() {
       const maxCards = galleryMaxCardsForWidth();
       const toShow = recent4.slice(0, maxCards);
 
+      // Thumbnail width: 2 columns on desktop, 1 on mobile (see .gallery-grid in style.css).
+      const thumbWidth = (grid.clientWidth || 800) / (maxCards === 4 ? 2 : 1);
+
       // Track the visible Drive cards that can rotate thumbnails.
       // We will rotate these 1 at a time in a round-robin loop.
       const rotatables = [];
@@ -759,7 +1118,7 @@ async function loadGalleryPage() {
           const imgs = Array.isArray(ev?.images) ? ev.images : [];
 
           const first = pickRandom(imgs);
-          const initialUrl = (first && typeof first.url === "string") ? first.url : defaultThumb;
+          const initialUrl = bestImageUrl(first, thumbWidth) || defaultThumb;
 
           const built = buildGalleryCard({
             title,
@@ -768,6 +1127,9 @@ async function loadGalleryPage() {
             href: folderUrl || rootFolderUrl || "#",
             thumbUrl: initialUrl,
             linkHint: "Google Drive folder",
+            placeholder: first?.placeholder || "",
+            width: first?.width || 0,
+            height: first?.height || 0,
           });
 
           grid.appendChild(built.card);
@@ -778,6 +1140,7 @@ async function loadGalleryPage() {
               imgEl: built.imgEl,
               imgs,
               currentUrl: initialUrl,
+              width: thumbWidth,
             });
           }
         } else {
@@ -798,39 +1161,7 @@ async function loadGalleryPage() {
         }
       });
 
-      // Round-robin thumbnail rotation:
-      // - Desktop: 1 card changes every 2s
-      // - Mobile: 1 card changes every 3s
-      // - Initial delay: first change happens after stepMs (not immediately)
-      if (rotatables.length > 0) {
-        const stepMs = galleryThumbStepMs();
-        const initialDelayMs = stepMs;
-
-        let slot = 0;
-
-        const tick = () => {
-          // If the viewport changed since we started, we re-render anyway on breakpoint changes.
-          // But this keeps timing correct even without a rerender.
-          const liveStepMs = galleryThumbStepMs();
-
-          const r = rotatables[slot];
-          slot = (slot + 1) % rotatables.length;
-
-          const nextUrl = pickNextUrl(r.imgs, r.currentUrl);
-          if (nextUrl && nextUrl !== r.currentUrl) {
-            r.imgEl.style.opacity = "0.15";
-            setTimeout(() => {
-              r.imgEl.src = nextUrl;
-              r.imgEl.style.opacity = "1";
-              r.currentUrl = nextUrl;
-            }, 180);
-          }
-
-          rotationTimeout = setTimeout(tick, liveStepMs);
-        };
-
-        rotationTimeout = setTimeout(tick, initialDelayMs);
-      }
+      startRotation(rotatables);
 
       // C5 full-width Drive link card
       if (driveLinkRoot && rootFolderUrl) {
@@ -1023,6 +1354,8 @@ function _renderJobs(grid, jobs) {
 
     const card = document.createElement("div");
     card.className = "job-card";
+    // Anchor for links from the site search (jobs.html#job-<id>).
+    if (job.id) card.id = `job-${job.id}`;
 
     // ----- Top row (title + pill) -----
     const top = document.createElement("div");
@@ -1242,6 +1575,12 @@ async function loadJobsPage() {
     // Initial render
     applyFiltersAndRender();
 
+    // Arriving from the site search: the card did not exist when the browser looked for the anchor.
+    if (location.hash.startsWith("#job-")) {
+      const target = document.getElementById(location.hash.slice(1));
+      if (target) target.scrollIntoView({ block: "start" });
+    }
+
   } catch (err) {
     console.error(err);
     if (empty) empty.style.display = "block";
@@ -1355,18 +1694,23 @@ function _formatLumaDate(isoStr) {
 
   if (!featuredCard && !featuredRow) return;
 
-  // ---- Fetch luma.json ----
+  // ---- Upcoming events: homepage bundle, else luma.json ----
   let lumaEvents = [];
-  try {
-    const jsonUrl = new URL("data/luma.json", document.baseURI);
-    jsonUrl.searchParams.set("_ts", String(Date.now()));
-    const res = await fetch(jsonUrl.toString(), { cache: "no-store" });
-    if (res.ok) {
-      const data = await res.json();
-      lumaEvents = Array.isArray(data.events) ? data.events : [];
+  const home = await loadHomeBundle();
+  if (Array.isArray(home?.events)) {
+    lumaEvents = home.events;
+  } else {
+    try {
+      const jsonUrl = new URL("data/luma.json", document.baseURI);
+      jsonUrl.searchParams.set("_ts", String(Date.now()));
+      const res = await fetch(jsonUrl.toString(), { cache: "no-store" });
+      if (res.ok) {
+        const data = await res.json();
+        lumaEvents = Array.isArray(data.events) ? data.events : [];
+      }
+    } catch (e) {
+      console.error("[NYRG] Failed to load luma.json:", e);
     }
-  } catch (e) {
-    console.error("[NYRG] Failed to load luma.json:", e);
   }
 
   const firstLuma  = lumaEvents[0] || null;
@@ -1523,4 +1867,202 @@ function _formatLumaDate(isoStr) {
     }
   }
 
-})();
\ No newline at end of file
+})();
+
+/* =========================================================
+   Site search (header search box)
+   Reads the prebuilt index written by scripts/search_index.py:
+   - data/search/index.json        manifest (a digest per file, for caching)
+   - data/search/terms/<xx>.json   posting lists for terms starting with "xx"
+   - data/search/docs/<n>.json     [kind, title, subtitle, url] for doc ids
+                                   n*docs_per_shard .. (n+1)*docs_per_shard-1
+   Only the shards for the typed words, and the document chunks holding
+   the top results, are downloaded. The last word
+   also matches longer terms ("bra" finds "Brasov"), so results update
+   while typing. All words must match.
+
+   Dependencies (in _includes/header.html):
+   - <input id="site-search">
+   - <div id="site-search-results"></div>
+   ========================================================= */
+const SEARCH_INDEX_DIR = "data/search/";
+const SEARCH_MAX_RESULTS = 8;
+const SEARCH_KIND_LABELS = { event: "Event", job: "Job", gallery: "Album" };
+
+// One fetch per file per page view.
+const _searchCache = { manifest: null, files: {} };
+
+function _searchTokens(text, minLen) {
+  // Same folding as scripts/search_index.py: no diacritics ("Ștefan" -> "stefan"), lowercase, [a-z0-9] words.
+  const folded = (text || "").normalize("NFKD").replace(/[\u0300-\u036f]/g, "").toLowerCase();
+  return (folded.match(/[a-z0-9]+/g) || []).filter(t => t.length >= minLen);
+}
+
+function _searchFetchJson(path, version) {
+  const url = new URL(SEARCH_INDEX_DIR + path, document.baseURI);
+  // The manifest is always re-checked; the other files change name (v=digest) when they change.
+  if (version) url.searchParams.set("v", version);
+  else url.searchParams.set("_ts", String(Date.now()));
+  return fetch(url.toString(), version ? {} : { cache: "no-store" })
+    .then(res => (res.ok ? res.json() : null));
+}
+
+function _searchManifest() {
+  if (!_searchCache.manifest) {
+    _searchCache.manifest = _searchFetchJson("index.json", "").catch(() => null);
+  }
+  return _searchCache.manifest;
+}
+
+function _searchFile(manifest, name) {
+  // name is a manifest key: "terms/br", "docs/0".
+  if (!manifest.files[name]) return Promise.resolve(null);
+  if (!_searchCache.files[name]) {
+    _searchCache.files[name] = _searchFetchJson(`${name}.json`, manifest.files[name]).catch(() => null);
+  }
+  return _searchCache.files[name];
+}
+
+// Returns the hits, or null when there is nothing to search yet: no index, or no word
+// of at least min_token characters (e.g. the first letter typed).
+async function searchSite(query, { limit = SEARCH_MAX_RESULTS } = {}) {
+  const manifest = await _searchManifest();
+  if (!manifest || !manifest.files) return null;
+
+  const tokens = _searchTokens(query, manifest.min_token || 2);
+  if (!tokens.length) return null;
+
+  const prefixLen = manifest.prefix_len || 2;
+  const keys = tokens.map(t => t.slice(0, prefixLen));
+  const shards = await Promise.all(keys.map(k => _searchFile(manifest, `terms/${k}`)));
+
+  let matches = null;
+  for (let i = 0; i < tokens.length; i++) {
+    const token = tokens[i];
+    const isLast = i === tokens.length - 1;
+    const shard = shards[i] || {};
+    const ids = new Set();
+
+    Object.keys(shard).forEach(term => {
+      if (term !== token && !(isLast && term.startsWith(token))) return;
+      // Posting lists are delta-encoded: [3, 1, 4] = docs 3, 4, 8.
+      let id = 0;
+      shard[term].forEach(delta => { id += delta; ids.add(id); });
+    });
+
+    matches = matches === null ? ids : new Set([...matches].filter(id => ids.has(id)));
+    if (!matches.size) return [];
+  }
+
+  // Doc ids follow the index order: upcoming events, then jobs, then albums.
+  const ids = [...matches].sort((a, b) => a - b).slice(0, limit);
+  const perChunk = manifest.docs_per_shard || 50;
+  const chunkIds = [...new Set(ids.map(id => Math.floor(id / perChunk)))];
+  const chunks = {};
+  await Promise.all(chunkIds.map(n => _searchFile(manifest, `docs/${n}`).then(rows => { chunks[n] = rows || []; })));
+  return ids
+    .map(id => chunks[Math.floor(id / perChunk)][id % perChunk])
+    .filter(Boolean)
+    .map(([kind, title, sub, url]) => ({ kind, title, sub, url }));
+}
+
+function _renderSearchResults(box, hits, query) {
+  box.innerHTML = "";
+  if (!query.trim() || hits === null) {
+    setHidden(box, true);
+    return;
+  }
+
+  if (!hits.length) {
+    const none = document.createElement("div");
+    none.className = "site-search-empty";
+    none.textContent = "No matches.";
+    box.appendChild(none);
+  }
+
+  hits.forEach(hit => {
+    const a = document.createElement("a");
+    a.className = "site-search-hit";
+    a.href = new URL(hit.url || "", document.baseURI).toString();
+    if (/^https?:/.test(hit.url || "")) {
+      a.target = "_blank";
+      a.rel = "noopener";
+    }
+
+    const kind = document.createElement("span");
+    kind.className = "site-search-kind";
+    kind.textContent = SEARCH_KIND_LABELS[hit.kind] || hit.kind;
+
+    const title = document.createElement("span");
+    title.className = "site-search-title";
+    title.textContent = hit.title;
+
+    a.appendChild(kind);
+    a.appendChild(title);
+    if (hit.sub) {
+      const sub = document.createElement("span");
+      sub.className = "site-search-sub small";
+      sub.textContent = hit.sub;
+      a.appendChild(sub);
+    }
+    box.appendChild(a);
+  });
+
+  setHidden(box, false);
+}
+
+(function initSiteSearch() {
+  const input = document.getElementById("site-search");
+  const box = document.getElementById("site-search-results");
+  if (!input || !box) return;
+
+  let timer = null;
+  let latest = 0;
+
+  // No index (not built yet, or unreachable): remove the search box rather than
+  // answering "No matches." to everything. Checked on first use, not on every page load.
+  async function checkIndex() {
+    const manifest = await _searchManifest();
+    if (!manifest || !manifest.files) {
+      setHidden(input.closest(".site-search") || input, true);
+      return false;
+    }
+    return true;
+  }
+
+  async function run() {
+    const query = input.value;
+    const mine = ++latest;
+    if (!(await checkIndex())) return;
+    let hits = [];
+    try {
+      hits = await searchSite(query);
+    } catch (e) {
+      console.error("[NYRG] Search failed:", e);
+    }
+    // A newer query was typed while this one was loading.
+    if (mine !== latest) return;
+    _renderSearchResults(box, hits, query);
+  }
+
+  input.addEventListener("input", () => {
+    clearTimeout(timer);
+    timer = setTimeout(run, 120);
+  });
+
+  input.addEventListener("keydown", e => {
+    if (e.key === "Escape") {
+      input.value = "";
+      _renderSearchResults(box, [], "");
+    }
+  });
+
+  input.addEventListener("focus", () => {
+    checkIndex();
+    if (input.value.trim() && box.childNodes.length) setHidden(box, false);
+  });
+
+  document.addEventListener("click", e => {
+    if (!e.target.closest(".site-search")) setHidden(box, true);
+  });
+})();
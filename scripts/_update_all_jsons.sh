@@ -77,34 +77,67 @@ if [[ "$BRANCH" == "main" ]]; then
   git pull --rebase origin main >/dev/null 2>&1 || true
 fi
 
-# --- 1) Run the 3 updaters (no git inside them) ---
-run_step "Instagram JSON" env NYRG_SKIP_GIT=1 ./scripts/daily_instagram_update.sh || fail_any=1
-run_step "Gallery JSON"   env NYRG_SKIP_GIT=1 ./scripts/update_gallery_daily.sh   || fail_any=1
-run_step "Jobs JSON"      env NYRG_SKIP_GIT=1 ./scripts/update_jobs_daily.sh      || fail_any=1
-run_step "Luma JSON"      env NYRG_SKIP_GIT=1 ./scripts/daily_luma_update.sh      || fail_any=1
+# --- 1) Run the updaters (no git inside them) ---
+# NYRG_REFRESH_IN_PROCESS=1: one Python process refreshes all feeds concurrently
+# (scripts/refresh_all.py), so the run takes as long as the slowest feed.
+# Arguments are passed on to it (scripts/refresh_daemon.py uses --feeds / --status-json).
+if [[ "${NYRG_REFRESH_IN_PROCESS:-0}" == "1" ]]; then
+  run_step "All feeds (in process)" python3 scripts/refresh_all.py "$@" || fail_any=1
+else
+  run_step "Instagram JSON" env NYRG_SKIP_GIT=1 ./scripts/daily_instagram_update.sh || fail_any=1
+  run_step "Gallery JSON"   env NYRG_SKIP_GIT=1 ./scripts/update_gallery_daily.sh   || fail_any=1
+  run_step "Jobs JSON"      env NYRG_SKIP_GIT=1 ./scripts/update_jobs_daily.sh      || fail_any=1
+  run_step "Luma JSON"      env NYRG_SKIP_GIT=1 ./scripts/daily_luma_update.sh      || fail_any=1
+fi
 
 # --- 2) Restore previous local edits, but keep fresh JSON outputs ---
 if [[ "$had_stash" == "1" ]]; then
   echo "[$(ts)] Restoring previous local changes (keeping freshly generated JSONs)..."
 
-  # Save the freshly-generated JSONs to a temp dir
+  # Save the freshly-generated JSONs (and the other outputs the commit step stages) to a temp dir
   tmpdir="$(mktemp -d)"
   cp -f data/instagram.json "$tmpdir/instagram.json" 2>/dev/null || true
   cp -f data/gallery.json   "$tmpdir/gallery.json"   2>/dev/null || true
   cp -f data/jobs.json      "$tmpdir/jobs.json"      2>/dev/null || true
+  cp -f data/jobs_changes.json "$tmpdir/jobs_changes.json" 2>/dev/null || true
+  cp -f data/luma.json      "$tmpdir/luma.json"      2>/dev/null || true
+  cp -f data/luma_past.json "$tmpdir/luma_past.json" 2>/dev/null || true
+  cp -f data/home.json      "$tmpdir/home.json"      2>/dev/null || true
+  cp -f _includes/gallery_cards.html "$tmpdir/gallery_cards.html" 2>/dev/null || true
+  # Directories: copied whole, and replaced whole below (deleted shards stay deleted).
+  if [[ -d data/search ]];      then cp -a data/search      "$tmpdir/search";      fi
+  if [[ -d data/gallery ]];     then cp -a data/gallery     "$tmpdir/gallery";     fi
+  if [[ -d assets/instagram ]]; then cp -a assets/instagram "$tmpdir/instagram"; fi
+
+  # Put those paths back to HEAD first: the stash may hold edits to (or untracked copies of)
+  # them, and git refuses to pop over a modified or existing file.
+  for p in data/instagram.json data/gallery.json data/jobs.json data/jobs_changes.json data/luma.json \
+           data/luma_past.json data/home.json _includes/gallery_cards.html \
+           data/search data/gallery assets/instagram; do
+    git checkout -q HEAD -- "$p" 2>/dev/null || true
+    git clean -fdq -- "$p" 2>/dev/null || true
+  done
 
   # Restore stash (brings back *all* prior edits)
   # If conflicts happen, we still force our JSONs afterward.
   git stash pop >/dev/null || true
 
-  # Force the freshly generated JSONs back into place (override any stashed versions)
+  # Force the freshly generated outputs back into place (override any stashed versions)
   if [[ -f "$tmpdir/instagram.json" ]]; then cp -f "$tmpdir/instagram.json" data/instagram.json; fi
   if [[ -f "$tmpdir/gallery.json" ]];   then cp -f "$tmpdir/gallery.json"   data/gallery.json;   fi
   if [[ -f "$tmpdir/jobs.json" ]];      then cp -f "$tmpdir/jobs.json"      data/jobs.json;      fi
+  if [[ -f "$tmpdir/jobs_changes.json" ]]; then cp -f "$tmpdir/jobs_changes.json" data/jobs_changes.json; fi
+  if [[ -f "$tmpdir/luma.json" ]];      then cp -f "$tmpdir/luma.json"      data/luma.json;      fi
+  if [[ -f "$tmpdir/luma_past.json" ]]; then cp -f "$tmpdir/luma_past.json" data/luma_past.json; fi
+  if [[ -f "$tmpdir/home.json" ]];      then cp -f "$tmpdir/home.json"      data/home.json;      fi
+  if [[ -f "$tmpdir/gallery_cards.html" ]]; then cp -f "$tmpdir/gallery_cards.html" _includes/gallery_cards.html; fi
+  if [[ -d "$tmpdir/search" ]];    then rm -rf data/search;      cp -a "$tmpdir/search"    data/search;      fi
+  if [[ -d "$tmpdir/gallery" ]];   then rm -rf data/gallery;     cp -a "$tmpdir/gallery"   data/gallery;     fi
+  if [[ -d "$tmpdir/instagram" ]]; then rm -rf assets/instagram; cp -a "$tmpdir/instagram" assets/instagram; fi
 
   rm -rf "$tmpdir"
 
-  echo "[$(ts)] Stash restored; JSONs kept from this run."
+  echo "[$(ts)] Stash restored; JSONs and other outputs kept from this run."
   echo
 fi
 
@@ -116,6 +149,19 @@ git reset
 
 # Stage just the JSONs (even if the tree has tons of other changes)
 git add data/instagram.json data/gallery.json data/jobs.json data/luma.json
+if [[ -f data/luma_past.json ]]; then git add data/luma_past.json; fi
+if [[ -f data/jobs_changes.json ]]; then git add data/jobs_changes.json; fi
+
+# Optional sharded gallery layout (see NYRG_GALLERY_SHARDS_DIR). -A also stages deleted shards.
+if [[ -d data/gallery ]]; then git add -A data/gallery; fi
+# Instagram post thumbnails referenced by data/instagram.json.
+if [[ -d assets/instagram ]]; then git add -A assets/instagram; fi
+# Site search index (scripts/search_index.py). -A also stages deleted term shards.
+if [[ -d data/search ]]; then git add -A data/search; fi
+# Pre-rendered Gallery page cards (written with data/gallery.json).
+if [[ -f _includes/gallery_cards.html ]]; then git add _includes/gallery_cards.html; fi
+# Homepage bundle (scripts/home_bundle.py), updated by the gallery, Luma and Instagram scripts.
+if [[ -f data/home.json ]]; then git add data/home.json; fi
 
 # If no JSON changes, do nothing
 if git diff --cached --quiet; then
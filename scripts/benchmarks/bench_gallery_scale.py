@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+End-to-end scale benchmark for update_gallery_json.py against the local mock Drive API.
+
+For every tree size (and every --workers / --batch-parents combination) it:
+- generates a tree and serves it with scripts/benchmarks/mock_drive.py (in-process),
+- runs the gallery builder as a subprocess pointed at it (NYRG_DRIVE_FILES_ENDPOINT),
+- reports wall time, Drive requests, bytes transferred and the builder's peak RSS.
+
+No Google API key or network access is needed.
+
+Usage (from repo root):
+  python3 scripts/benchmarks/bench_gallery_scale.py
+  python3 scripts/benchmarks/bench_gallery_scale.py --sizes 10,1000,10000 --workers 1,8 --batch-parents 0,40
+  python3 scripts/benchmarks/bench_gallery_scale.py --latency-ms 20 --error-rate 0.01 --json /tmp/scale.json
+  python3 scripts/benchmarks/bench_gallery_scale.py --endpoint http://127.0.0.1:8765/drive/v3/files
+
+With --endpoint, an already running mock (python3 scripts/benchmarks/mock_drive.py) is
+used instead and --sizes is ignored; counters come from its /_stats URL.
+
+Notes:
+- The HTTP cache is disabled for the builder (cold runs), so every run lists the tree.
+- Peak RSS is the builder process's maximum resident set size (Linux/macOS only).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from mock_drive import ROOT_ID, MockDriveServer, generate_tree
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+GALLERY_SCRIPT = SCRIPTS_DIR / "update_gallery_json.py"
+
+DEFAULT_SIZES = "10,1000,10000"
+
+
+def parse_int_list(raw: str) -> List[int]:
+    return [int(p) for p in (raw or "").split(",") if p.strip()]
+
+
+def fetch_stats(endpoint: str, path: str) -> dict:
+    """GET /_stats or /_reset on the mock behind `endpoint`."""
+    u = urlparse(endpoint)
+    with urllib.request.urlopen(f"{u.scheme}://{u.netloc}{path}", timeout=10) as r:
+        return json.loads(r.read())
+
+
+def peak_rss_mb(rusage) -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    kib = rusage.ru_maxrss / 1024 if sys.platform == "darwin" else rusage.ru_maxrss
+    return kib / 1024
+
+
+def run_builder(endpoint: str, workers: int, batch_parents: int, extra_args: List[str]) -> dict:
+    """Run update_gallery_json.py once; returns wall time, peak RSS and output stats."""
+    with tempfile.TemporaryDirectory(prefix="nyrg-scale-") as tmp:
+        out = os.path.join(tmp, "gallery.json")
+        env = dict(os.environ)
+        env.update({
+            "GOOGLE_API_KEY": "mock",
+            "NYRG_DRIVE_FILES_ENDPOINT": endpoint,
+            "NYRG_HTTP_CACHE": "0",
+            "NYRG_EXTERNAL_EVENTS_CSV_URL": "",
+            # Never touch the site: page cards, homepage bundle and search index are only side outputs here.
+            "NYRG_GALLERY_CARDS": "0",
+            "NYRG_HOME_BUNDLE": "0",
+            "NYRG_SEARCH_INDEX": "0",
+        })
+        cmd = [
+            sys.executable, str(GALLERY_SCRIPT),
+            "--folder-id", ROOT_ID,
+            "--out", out,
+            "--workers", str(workers),
+            "--batch-parents", str(batch_parents),
+        ] + extra_args
+
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        # wait4 gives this child's own rusage (RUSAGE_CHILDREN would accumulate runs).
+        _, status, rusage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - t0
+        stdout, stderr = proc.stdout.read(), proc.stderr.read()
+        proc.stdout.close()
+        proc.stderr.close()
+
+        code = os.waitstatus_to_exitcode(status)
+        if code != 0:
+            raise RuntimeError(f"builder exited with {code}:\n{stderr.decode('utf-8', 'replace')[-2000:]}")
+
+        result = {"wall_s": round(wall, 3), "peak_rss_mb": round(peak_rss_mb(rusage), 1)}
+        try:
+            with open(out, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            result["images"] = data.get("count", 0)
+            result["events"] = len(data.get("events") or [])
+            result["output_kb"] = round(os.path.getsize(out) / 1024, 1)
+        except (OSError, ValueError):
+            result["stdout"] = stdout.decode("utf-8", "replace")
+        return result
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Scale benchmark for the gallery builder against a mock Drive API.")
+    ap.add_argument("--sizes", default=DEFAULT_SIZES, help="Tree sizes in folders (comma-separated)")
+    ap.add_argument("--workers", default="1,8", help="--workers values to try (comma-separated)")
+    ap.add_argument("--batch-parents", default="0,40", help="--batch-parents values to try (comma-separated)")
+    ap.add_argument("--images-per-folder", type=int, default=8)
+    ap.add_argument("--page-size", type=int, default=100, help="Mock page size (smaller = more pagination)")
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="Mock latency per request")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Mock error share (0..1)")
+    ap.add_argument("--endpoint", default="", help="Use an already running mock instead of starting one")
+    ap.add_argument("--json", default="", help="Also write the results to this JSON file")
+    ap.add_argument("builder_args", nargs="*", help="Extra args for update_gallery_json.py (after --)")
+    args = ap.parse_args()
+
+    configs = [(w, b) for w in parse_int_list(args.workers) for b in parse_int_list(args.batch_parents)]
+    sizes: List[Optional[int]] = [None] if args.endpoint else parse_int_list(args.sizes)
+
+    results: List[Dict] = []
+    print(
+        f"{'folders':>8} {'workers':>7} {'batch':>5} {'wall s':>8} {'requests':>9} "
+        f"{'MB in':>8} {'errors':>6} {'RSS MB':>7} {'images':>7}"
+    )
+    for size in sizes:
+        server = None
+        endpoint = args.endpoint
+        folders = size
+        if size is not None:
+            tree = generate_tree(size, images_per_folder=args.images_per_folder)
+            server = MockDriveServer(
+                tree, page_size=args.page_size, latency_ms=args.latency_ms, error_rate=args.error_rate
+            ).start()
+            endpoint = server.endpoint
+            folders = tree.folder_count
+
+        try:
+            for workers, batch_parents in configs:
+                fetch_stats(endpoint, "/_reset")
+                row = run_builder(endpoint, workers, batch_parents, args.builder_args)
+                stats = fetch_stats(endpoint, "/_stats")
+                row.update({
+                    "folders": folders,
+                    "workers": workers,
+                    "batch_parents": batch_parents,
+                    "requests": stats["requests"],
+                    "bytes": stats["bytes"],
+                    "errors": stats["errors"],
+                })
+                results.append(row)
+                print(
+                    f"{str(folders or '-'):>8} {workers:>7} {batch_parents:>5} {row['wall_s']:>8.2f} "
+                    f"{row['requests']:>9} {row['bytes'] / 1e6:>8.2f} {row['errors']:>6} "
+                    f"{row['peak_rss_mb']:>7.1f} {row.get('images', 0):>7}"
+                )
+        finally:
+            if server is not None:
+                server.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {len(results)} results -> {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the per-item parsers in the data scripts.
+
+These helpers run once per Drive folder, per sheet row or per page anchor, so a
+slow regex or a needless recompile only shows up on big runs. This script feeds
+them large synthetic corpora and compares throughput with a stored baseline.
+
+Benchmarked:
+- update_gallery_json.py:        parse_month_from_name, parse_event_meta_from_description, prettify_title
+- update_jobs_json.py:           find_col, parse_date, is_truthy
+- selenium_instagram_scrape.py:  collect_post_urls (with a fake driver, so no browser is needed)
+
+Usage (from repo root):
+  python3 scripts/benchmarks/bench_parsers.py                   # compare with the baseline
+  python3 scripts/benchmarks/bench_parsers.py --update-baseline # store new numbers
+  python3 scripts/benchmarks/bench_parsers.py --only gallery.prettify_title --names 10000
+
+Exit code 1 if any benchmark is slower than baseline * (1 - tolerance).
+
+Notes:
+- Corpora are generated from a fixed seed, so every run parses the same data.
+- Each benchmark runs --repeat times and the best time counts (least noisy).
+- Throughput depends on the machine: refresh the baseline when you change machines.
+  The baseline records the Python version and platform it was taken on.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_NAMES = 100_000
+DEFAULT_ROWS = 50_000
+DEFAULT_ANCHORS = 20_000
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25
+SEED = 2026
+
+MONTH_WORDS = ["Jan", "February", "mar", "April", "May", "jun", "July", "Aug", "Sept", "October", "nov", "Dec"]
+EVENT_WORDS = ["Picnic", "Mingle", "Dinner", "Concert", "Hike", "Film_Night", "Book.Club", "Gala", "Brunch"]
+PEOPLE = ["Ana Pop", "Mihai Ionescu", "Ioana Radu", "Andrei Stan", "Elena Dumitru"]
+
+
+# -------------------------------------------------------------
+# Synthetic corpora (deterministic)
+# -------------------------------------------------------------
+
+def make_folder_names(n: int, rng: random.Random) -> List[str]:
+    """Folder names in every shape the month parser supports, plus some without a month."""
+    out: List[str] = []
+    for i in range(n):
+        month = rng.choice(MONTH_WORDS)
+        year = rng.randint(2015, 2027)
+        event = rng.choice(EVENT_WORDS)
+        shape = i % 5
+        if shape == 0:
+            out.append(f"NYRG {month} {year} - {event}")
+        elif shape == 1:
+            out.append(f"NYRG {month}{year} {event}")
+        elif shape == 2:
+            out.append(f"{year} {month} {event}")
+        elif shape == 3:
+            out.append(f"  nyrg   {event}   {month} {year}  ")
+        else:
+            out.append(f"{event} #{i}")
+    return out
+
+
+def make_descriptions(n: int, rng: random.Random) -> List[str]:
+    out: List[str] = []
+    for i in range(n):
+        lines = []
+        if i % 3 != 2:
+            lines.append(f"{rng.choice(['Photo', 'Photographer', 'credit'])}: {rng.choice(PEOPLE)}")
+        if i % 2 == 0:
+            lines.append(f"Note: Thanks to everyone who came to event {i}!")
+        if i % 4 == 0:
+            lines.append("Bring a friend next time.")
+        out.append("\n".join(lines))
+    return out
+
+
+def make_sheet_rows(n: int, rng: random.Random) -> Tuple[List[str], List[dict]]:
+    """Headers as they appear in the published jobs CSV, plus n rows."""
+    headers = [
+        "Timestamp", "Job Title / Position", "Company or Person", "Description / Details",
+        "Location", "How to apply (URL or email)", "Deadline", "Show?", "Notes",
+    ]
+    rows: List[dict] = []
+    for i in range(n):
+        if i % 3 == 0:
+            deadline = f"{rng.randint(2024, 2027)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        elif i % 3 == 1:
+            deadline = f"{rng.randint(1, 12)}/{rng.randint(1, 28)}/{rng.randint(2024, 2027)}"
+        else:
+            deadline = rng.choice(["", "ASAP", "rolling", "n/a"])
+        rows.append({
+            "Timestamp": "",
+            "Job Title / Position": f"Job {i}",
+            "Company or Person": rng.choice(PEOPLE),
+            "Description / Details": "x" * 40,
+            "Location": "New York, NY",
+            "How to apply (URL or email)": f"https://example.org/jobs/{i}",
+            "Deadline": deadline,
+            "Show?": rng.choice(["yes", "Yes ", "no", "", "TRUE", "open", "0"]),
+            "Notes": "",
+        })
+    return headers, rows
+
+
+def make_anchor_hrefs(n: int, rng: random.Random) -> List[Optional[str]]:
+    """hrefs found on a profile page: posts, reels, nested post links and noise."""
+    out: List[Optional[str]] = []
+    for i in range(n):
+        code = f"C{rng.getrandbits(40):010x}"
+        shape = i % 6
+        if shape == 0:
+            out.append(f"https://www.instagram.com/p/{code}/")
+        elif shape == 1:
+            out.append(f"https://www.instagram.com/reel/{code}/?utm_source=ig_web")
+        elif shape == 2:
+            out.append(f"https://www.instagram.com/newyorkromaniangroup/p/{code}/")
+        elif shape == 3:
+            out.append("https://www.instagram.com/explore/tags/romania/")
+        elif shape == 4:
+            out.append(None)
+        else:
+            out.append(f"https://www.instagram.com/p/{code}/#comments")
+    return out
+
+
+class FakeDriver:
+    """Just enough of a Selenium WebDriver for collect_post_urls()."""
+
+    def __init__(self, hrefs: List[Optional[str]]):
+        # What the in-page script returns: every anchor's href (the noise is kept
+        # on purpose, so normalization still sees non-post links).
+        self.hrefs = [h for h in hrefs if h]
+
+    def execute_script(self, script, *args):
+        return list(self.hrefs)
+
+
+# -------------------------------------------------------------
+# Benchmarks
+# -------------------------------------------------------------
+
+# name -> (items per run, callable that processes all items once)
+Benchmark = Tuple[int, Callable[[], object]]
+
+
+def build_benchmarks(names_n: int, rows_n: int, anchors_n: int) -> Dict[str, Benchmark]:
+    rng = random.Random(SEED)
+    benches: Dict[str, Benchmark] = {}
+
+    import update_gallery_json as gallery
+
+    names = make_folder_names(names_n, rng)
+    descriptions = make_descriptions(names_n, rng)
+    benches["gallery.parse_month_from_name"] = (
+        len(names), lambda: [gallery.parse_month_from_name(n) for n in names]
+    )
+    benches["gallery.parse_event_meta_from_description"] = (
+        len(descriptions), lambda: [gallery.parse_event_meta_from_description(d) for d in descriptions]
+    )
+    benches["gallery.prettify_title"] = (
+        len(names), lambda: [gallery.prettify_title(n) for n in names]
+    )
+
+    import update_jobs_json as jobs
+
+    headers, rows = make_sheet_rows(rows_n, rng)
+    deadlines = [r["Deadline"] for r in rows]
+    flags = [r["Show?"] for r in rows]
+    # find_col runs once per column per sheet; one call per row simulates many sheets.
+    keywords = [("title", "position"), ("company", "person", "employer"), ("apply", "url", "email", "link"),
+                ("deadline",), ("show", "open"), ("note",)]
+    benches["jobs.find_col"] = (
+        len(rows), lambda: [jobs.find_col(headers, *keywords[i % len(keywords)]) for i in range(len(rows))]
+    )
+    benches["jobs.parse_date"] = (len(deadlines), lambda: [jobs.parse_date(d) for d in deadlines])
+    benches["jobs.is_truthy"] = (len(flags), lambda: [jobs.is_truthy(f) for f in flags])
+
+    import selenium_instagram_scrape as instagram  # selenium itself is only imported for the browser
+
+    driver = FakeDriver(make_anchor_hrefs(anchors_n, rng))
+    benches["instagram.collect_post_urls"] = (
+        anchors_n, lambda: instagram.collect_post_urls(driver, anchors_n, False)
+    )
+
+    return benches
+
+
+def run_benchmark(fn: Callable[[], object], repeat: int) -> float:
+    """Best wall time (seconds) over `repeat` runs."""
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def machine_info() -> dict:
+    return {"python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine()}
+
+
+def load_baseline(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path: Path, results: Dict[str, dict]) -> None:
+    payload = {
+        "_comment": "Written by scripts/benchmarks/bench_parsers.py --update-baseline. Throughput in items/second.",
+        "updated_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+        "machine": machine_info(),
+        "results": results,
+    }
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    tmp.replace(path)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the data-script parsers against a stored baseline.")
+    ap.add_argument("--names", type=int, default=DEFAULT_NAMES, help="Synthetic folder names / descriptions")
+    ap.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Synthetic jobs sheet rows")
+    ap.add_argument("--anchors", type=int, default=DEFAULT_ANCHORS, help="Synthetic Instagram page anchors")
+    ap.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Runs per benchmark (best one counts)")
+    ap.add_argument("--only", default="", help="Comma-separated benchmark names (default: all)")
+    ap.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON path")
+    ap.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed slowdown before a result counts as a regression (0.25 = 25%%)",
+    )
+    ap.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    args = ap.parse_args()
+
+    benches = build_benchmarks(args.names, args.rows, args.anchors)
+    only = [b.strip() for b in args.only.split(",") if b.strip()]
+    if only:
+        unknown = sorted(set(only) - set(benches))
+        if unknown:
+            print(f"ERROR: unknown benchmark(s): {', '.join(unknown)}", file=sys.stderr)
+            return 2
+        benches = {name: benches[name] for name in only}
+
+    baseline_path = Path(args.baseline)
+    baseline = load_baseline(baseline_path)
+    base_results = baseline.get("results", {})
+    if baseline and baseline.get("machine") != machine_info():
+        print("[NYRG] NOTE: baseline was recorded on a different Python/platform; compare with care.")
+
+    results: Dict[str, dict] = {}
+    regressions: List[str] = []
+    print(f"{'benchmark':45} {'items':>8} {'best s':>9} {'items/s':>12} {'vs base':>8}")
+    for name, (items, fn) in benches.items():
+        seconds = run_benchmark(fn, args.repeat)
+        rate = items / seconds if seconds > 0 else float("inf")
+        results[name] = {"items": items, "seconds": round(seconds, 6), "items_per_sec": round(rate, 1)}
+
+        change = ""
+        base_rate = (base_results.get(name) or {}).get("items_per_sec")
+        if base_rate:
+            ratio = rate / base_rate
+            change = f"{(ratio - 1) * 100:+.0f}%"
+            if ratio < 1 - args.tolerance:
+                regressions.append(name)
+                change += " !"
+        print(f"{name:45} {items:>8} {seconds:>9.4f} {rate:>12,.0f} {change:>8}")
+
+    if args.update_baseline:
+        merged = dict(base_results)
+        merged.update(results)
+        save_baseline(baseline_path, merged)
+        print(f"Baseline updated -> {baseline_path}")
+        return 0
+
+    if regressions:
+        print(
+            f"[NYRG] REGRESSION: {', '.join(regressions)} slower than the baseline by more than "
+            f"{args.tolerance:.0%}.",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
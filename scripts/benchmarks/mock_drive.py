@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Google Drive v3 files API (just what update_gallery_json.py uses).
+
+Serves a generated folder tree, so the gallery builder can be load-tested without
+Google and without an API key:
+- GET <prefix>/files              files.list: "'<id>' in parents" queries, including the
+                                  OR'ed batched form, pagination (pageSize / pageToken),
+                                  and `parents` on every file when it is in `fields`
+- GET <prefix>/files/<id>         files.get (id, modifiedTime)
+- GET /_stats                     request / byte counters as JSON
+- GET /_reset                     reset the counters
+
+The tree has nested folders, images with imageMediaMetadata, shortcuts to folders
+and to images, and one "(not for website)" folder. Latency and errors (429 / 403
+rateLimitExceeded / 500 / 503) can be injected.
+
+Usage (from repo root):
+  python3 scripts/benchmarks/mock_drive.py --folders 1000 --port 8765
+  NYRG_DRIVE_FILES_ENDPOINT=http://127.0.0.1:8765/drive/v3/files GOOGLE_API_KEY=mock \\
+    python3 scripts/update_gallery_json.py --folder-id root --out /tmp/gallery.json
+
+Notes:
+- The tree is generated from --seed, so the same options always serve the same tree.
+- Use NYRG_HTTP_CACHE=0 (or a throwaway NYRG_HTTP_CACHE_DIR) so local responses do not
+  end up in your real HTTP cache.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+FOLDER_MIME = "application/vnd.google-apps.folder"
+SHORTCUT_MIME = "application/vnd.google-apps.shortcut"
+
+ROOT_ID = "root"
+DEFAULT_PREFIX = "/drive/v3/files"
+DEFAULT_EVENTS = 50
+DEFAULT_IMAGES_PER_FOLDER = 8
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_SHORTCUT_RATE = 0.02
+DEFAULT_SEED = 2026
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+MODIFIED = "2025-01-01T00:00:00.000Z"
+
+PARENTS_RE = re.compile(r"'([^']+)' in parents")
+
+
+class DriveTree:
+    """A generated Drive tree: {folder_id: [child file dicts]} plus a by-id index."""
+
+    def __init__(self) -> None:
+        self.children: Dict[str, List[dict]] = {ROOT_ID: []}
+        self.files: Dict[str, dict] = {ROOT_ID: {"id": ROOT_ID, "modifiedTime": MODIFIED}}
+
+    def add(self, parent_id: str, f: dict) -> dict:
+        f.setdefault("modifiedTime", MODIFIED)
+        f["parents"] = [parent_id]
+        self.children.setdefault(parent_id, []).append(f)
+        self.files[f["id"]] = f
+        if f.get("mimeType") == FOLDER_MIME:
+            self.children.setdefault(f["id"], [])
+        return f
+
+    @property
+    def folder_count(self) -> int:
+        return sum(1 for f in self.files.values() if f.get("mimeType") == FOLDER_MIME)
+
+    @property
+    def image_count(self) -> int:
+        return sum(1 for f in self.files.values() if f.get("mimeType", "").startswith("image/"))
+
+
+def generate_tree(
+    folders: int,
+    events: int = DEFAULT_EVENTS,
+    images_per_folder: int = DEFAULT_IMAGES_PER_FOLDER,
+    shortcut_rate: float = DEFAULT_SHORTCUT_RATE,
+    seed: int = DEFAULT_SEED,
+) -> DriveTree:
+    """
+    Build a tree with `folders` folders in total: up to `events` event folders under
+    the root, the rest nested below them (random parents, so depth varies). Every
+    folder gets `images_per_folder` images; a `shortcut_rate` share of folders also
+    get a shortcut to another folder and one to an image.
+    """
+    rng = random.Random(seed)
+    tree = DriveTree()
+    n_events = max(1, min(events, folders))
+
+    all_folders: List[str] = []
+    for e in range(n_events):
+        fid = f"ev{e:05d}"
+        tree.add(ROOT_ID, {
+            "id": fid,
+            "name": f"NYRG {rng.choice(MONTHS)} {rng.randint(2018, 2026)} - Event {e}",
+            "mimeType": FOLDER_MIME,
+            "webViewLink": f"https://drive.google.com/drive/folders/{fid}",
+            "description": "Photographer: Ana Pop\nNote: Thanks to everyone who came!" if e % 2 else "",
+        })
+        all_folders.append(fid)
+
+    for i in range(folders - n_events):
+        fid = f"sub{i:06d}"
+        tree.add(rng.choice(all_folders), {
+            "id": fid,
+            "name": f"Part {i}",
+            "mimeType": FOLDER_MIME,
+            "webViewLink": f"https://drive.google.com/drive/folders/{fid}",
+        })
+        all_folders.append(fid)
+
+    image_ids: List[str] = []
+    for fid in all_folders:
+        for j in range(images_per_folder):
+            iid = f"{fid}img{j:03d}"
+            landscape = rng.random() < 0.6
+            tree.add(fid, {
+                "id": iid,
+                "name": f"IMG_{rng.randint(0, 9999):04d}.jpg",
+                "mimeType": "image/jpeg" if j % 5 else "image/png",
+                "webViewLink": f"https://drive.google.com/file/d/{iid}/view?usp=drivesdk",
+                "imageMediaMetadata": {
+                    "width": 4000 if landscape else 3000,
+                    "height": 3000 if landscape else 4000,
+                    "rotation": 0,
+                    "time": f"{rng.randint(2018, 2026)}:0{rng.randint(1, 9)}:1{rng.randint(0, 9)} 18:22:11",
+                },
+            })
+            image_ids.append(iid)
+
+    for k, fid in enumerate(all_folders):
+        if rng.random() >= shortcut_rate:
+            continue
+        target = rng.choice(all_folders)
+        tree.add(fid, {
+            "id": f"{fid}sf{k}",
+            "name": "Shortcut to more photos",
+            "mimeType": SHORTCUT_MIME,
+            "shortcutDetails": {"targetId": target, "targetMimeType": FOLDER_MIME},
+        })
+        if image_ids:
+            tree.add(fid, {
+                "id": f"{fid}si{k}",
+                "name": f"Shortcut IMG {k}.jpg",
+                "mimeType": SHORTCUT_MIME,
+                "shortcutDetails": {"targetId": rng.choice(image_ids), "targetMimeType": "image/jpeg"},
+            })
+
+    tree.add(ROOT_ID, {"id": "hidden", "name": "(not for website) drafts", "mimeType": FOLDER_MIME})
+    return tree
+
+
+class MockDriveServer:
+    """Threaded HTTP server around a DriveTree, with counters and fault injection."""
+
+    def __init__(
+        self,
+        tree: DriveTree,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        prefix: str = DEFAULT_PREFIX,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        latency_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = DEFAULT_SEED,
+    ):
+        self.tree = tree
+        self.prefix = prefix.rstrip("/")
+        self.page_size = max(1, page_size)
+        self.latency = max(0.0, latency_ms) / 1000.0
+        self.error_rate = max(0.0, error_rate)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "bytes": 0, "errors": 0}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{self.prefix}"
+
+    def start(self) -> "MockDriveServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = {"requests": 0, "bytes": 0, "errors": 0}
+
+    # ---------------------------------------------------------
+    # Request handling
+    # ---------------------------------------------------------
+
+    def injected_error(self) -> Optional[tuple]:
+        """(status, body) for a simulated failure, or None."""
+        with self._lock:
+            if self.error_rate <= 0 or self._rng.random() >= self.error_rate:
+                return None
+            choice = self._rng.randrange(4)
+        if choice == 0:
+            return 429, {"error": {"code": 429, "message": "Too Many Requests"}}
+        if choice == 1:
+            return 403, {"error": {"code": 403, "errors": [{"reason": "rateLimitExceeded"}]}}
+        if choice == 2:
+            return 500, {"error": {"code": 500, "message": "Internal Error"}}
+        return 503, {"error": {"code": 503, "message": "Backend Error"}}
+
+    def files_list(self, qs: Dict[str, List[str]]) -> dict:
+        q = (qs.get("q") or [""])[0]
+        fields = (qs.get("fields") or [""])[0]
+        try:
+            page_size = min(self.page_size, int((qs.get("pageSize") or ["1000"])[0]))
+        except ValueError:
+            page_size = self.page_size
+        start = int((qs.get("pageToken") or ["0"])[0] or 0)
+
+        # One entry per file even if several requested parents contain it (like Drive).
+        files: List[dict] = []
+        seen = set()
+        for parent_id in dict.fromkeys(PARENTS_RE.findall(q)):
+            for f in self.tree.children.get(parent_id, []):
+                if f["id"] not in seen:
+                    seen.add(f["id"])
+                    files.append(f)
+
+        with_parents = "parents" in fields
+        page = [f if with_parents else {k: v for k, v in f.items() if k != "parents"}
+                for f in files[start:start + page_size]]
+        out: dict = {"files": page}
+        if start + page_size < len(files):
+            out["nextPageToken"] = str(start + page_size)
+        return out
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like Google
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def send_json(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=UTF-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.stats["bytes"] += len(body)
+                    if status >= 400:
+                        server.stats["errors"] += 1
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                if url.path == "/_stats":
+                    with server._lock:
+                        stats = dict(server.stats)
+                    return self.send_json(200, stats)
+                if url.path == "/_reset":
+                    server.reset_stats()
+                    return self.send_json(200, {"ok": True})
+
+                with server._lock:
+                    server.stats["requests"] += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                error = server.injected_error()
+                if error:
+                    return self.send_json(*error)
+
+                if url.path == server.prefix:
+                    return self.send_json(200, server.files_list(parse_qs(url.query)))
+                if url.path.startswith(server.prefix + "/"):
+                    file_id = url.path[len(server.prefix) + 1:]
+                    f = server.tree.files.get(file_id)
+                    if f is None:
+                        return self.send_json(404, {"error": {"code": 404, "message": f"File not found: {file_id}"}})
+                    return self.send_json(200, {"id": file_id, "modifiedTime": f.get("modifiedTime", MODIFIED)})
+                return self.send_json(404, {"error": {"code": 404, "message": "Not found"}})
+
+        return Handler
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Serve a generated Drive tree over a local files API.")
+    ap.add_argument("--folders", type=int, default=1000, help="Total folders in the tree")
+    ap.add_argument("--events", type=int, default=DEFAULT_EVENTS, help="Event folders under the root")
+    ap.add_argument("--images-per-folder", type=int, default=DEFAULT_IMAGES_PER_FOLDER)
+    ap.add_argument("--shortcut-rate", type=float, default=DEFAULT_SHORTCUT_RATE)
+    ap.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Max files per page")
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="Added delay per request")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Share of requests that fail (0..1)")
+    ap.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    args = ap.parse_args()
+
+    tree = generate_tree(args.folders, args.events, args.images_per_folder, args.shortcut_rate, args.seed)
+    server = MockDriveServer(
+        tree, args.host, args.port,
+        page_size=args.page_size, latency_ms=args.latency_ms, error_rate=args.error_rate, seed=args.seed,
+    )
+    print(f"[NYRG] Mock Drive: {tree.folder_count} folders, {tree.image_count} images -> {server.endpoint}")
+    print(f"[NYRG] Root folder ID: {ROOT_ID}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
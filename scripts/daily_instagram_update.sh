@@ -62,8 +62,11 @@ if [[ "$SKIP_GIT" == "1" ]]; then
   exit 0
 fi
 
-# Stage just the JSON file.
+# Stage just the JSON file (and its cached post thumbnails; -A also stages pruned ones).
 git add "$JSON_PATH"
+if [[ -d assets/instagram ]]; then git add -A assets/instagram; fi
+# Homepage bundle (scripts/home_bundle.py), updated by the gallery, Luma and Instagram scripts.
+if [[ -f data/home.json ]]; then git add data/home.json; fi
 
 # If nothing changed, exit cleanly.
 if git diff --cached --quiet; then
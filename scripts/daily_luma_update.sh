@@ -56,6 +56,12 @@ if [[ "$SKIP_GIT" == "1" ]]; then
 fi
 
 git add "$JSON_PATH"
+# Past-events archive (written by the same script).
+if [[ -f data/luma_past.json ]]; then git add data/luma_past.json; fi
+# Site search index (scripts/search_index.py). -A also stages deleted term shards.
+if [[ -d data/search ]]; then git add -A data/search; fi
+# Homepage bundle (scripts/home_bundle.py), updated by the gallery, Luma and Instagram scripts.
+if [[ -f data/home.json ]]; then git add data/home.json; fi
 
 if git diff --cached --quiet; then
   echo "[NYRG] No changes to commit."
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Semantic change detection for the generated data/*.json feeds.
+
+Every run stamps a new "updated_at". Rewriting a file only for that makes a
+commit, a GitHub Pages rebuild and a fresh download for every visitor, so the
+writers first compare the new payload with the file on disk:
+- volatile top-level keys (updated_at) are ignored,
+- if everything else is equal, the old file is kept as is,
+- otherwise a compact structural diff is printed, e.g.
+    [NYRG] data/gallery.json changed: events +1 -0 ~2, images +37 -0 ~0, count 410 -> 447
+
+List items are matched by identity (api_id, id, url; otherwise the whole item),
+so "~" counts items that are still there but whose fields changed.
+
+Used by:
+- update_gallery_json.py (gallery.json, shard manifest), update_jobs_json.py,
+  luma_scrape.py, selenium_instagram_scrape.py
+
+Optional environment variables:
+- NYRG_FORCE_WRITE=1   always rewrite (e.g. to refresh updated_at on purpose)
+
+Usage in a script:
+  import feed_diff
+  if not feed_diff.content_changed(path, payload):
+      return False   # keep the existing file
+  ... write ...
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Top-level keys that change on every run without saying anything about the content.
+VOLATILE_KEYS = ("updated_at",)
+
+# Fields that identify a list item across runs, in order of preference.
+IDENTITY_FIELDS = ("api_id", "id", "url")
+
+
+def force_write() -> bool:
+    return os.environ.get("NYRG_FORCE_WRITE", "").strip() in ("1", "true", "True", "yes", "YES")
+
+
+def load_json(path) -> Optional[Any]:
+    """The existing file's JSON, or None if it is missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def strip_volatile(payload: Any, volatile: Iterable[str] = VOLATILE_KEYS) -> Any:
+    if not isinstance(payload, dict):
+        return payload
+    skip = set(volatile)
+    return {k: v for k, v in payload.items() if k not in skip}
+
+
+def same_content(old: Any, new: Any, volatile: Iterable[str] = VOLATILE_KEYS) -> bool:
+    return strip_volatile(old, volatile) == strip_volatile(new, volatile)
+
+
+def item_key(item: Any) -> str:
+    if isinstance(item, dict):
+        for field in IDENTITY_FIELDS:
+            value = item.get(field)
+            if value:
+                return f"{field}:{value}"
+    return json.dumps(item, sort_keys=True, ensure_ascii=False)
+
+
+def item_digest(item: Any) -> str:
+    body = json.dumps(item, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(body.encode("utf-8")).hexdigest()
+
+
+def digest_items(items: Iterable[Any], into: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    item_key -> item_digest. Small enough to keep for large lists (streamed writers
+    pass `into` to add items one at a time). Repeated keys (the same Drive file in
+    two folders) are numbered in order: "id:abc", "id:abc#2", ...
+    """
+    out: Dict[str, str] = {} if into is None else into
+    for item in items:
+        key = base = item_key(item)
+        n = 1
+        while key in out:
+            n += 1
+            key = f"{base}#{n}"
+        out[key] = item_digest(item)
+    return out
+
+
+def digest_diff(old: Dict[str, str], new: Dict[str, str]) -> Tuple[int, int, int]:
+    """(added, removed, changed) between two digest_items() maps."""
+    added = sum(1 for k in new if k not in old)
+    removed = sum(1 for k in old if k not in new)
+    changed = sum(1 for k, v in new.items() if k in old and old[k] != v)
+    return added, removed, changed
+
+
+def list_diff(old: list, new: list) -> Tuple[int, int, int]:
+    """(added, removed, changed) between two lists of items, matched by item_key()."""
+    return digest_diff(digest_items(old), digest_items(new))
+
+
+def structural_diff(old: Any, new: Any, volatile: Iterable[str] = VOLATILE_KEYS) -> Dict[str, Any]:
+    """
+    Top-level diff: lists -> (added, removed, changed), other keys -> (old, new).
+    Only keys that differ are included.
+    """
+    old = strip_volatile(old if isinstance(old, dict) else {}, volatile)
+    new = strip_volatile(new if isinstance(new, dict) else {}, volatile)
+    diff: Dict[str, Any] = {}
+    for key in list(new) + [k for k in old if k not in new]:
+        a, b = old.get(key), new.get(key)
+        if a == b:
+            continue
+        if isinstance(a, list) or isinstance(b, list):
+            diff[key] = list_diff(a if isinstance(a, list) else [], b if isinstance(b, list) else [])
+        else:
+            diff[key] = (a, b)
+    return diff
+
+
+def format_diff(diff: Dict[str, Any]) -> str:
+    parts = []
+    for key, value in diff.items():
+        if isinstance(value, tuple) and len(value) == 3 and all(isinstance(n, int) for n in value):
+            parts.append(f"{key} +{value[0]} -{value[1]} ~{value[2]}")
+        elif isinstance(value[0], (dict, list)) or isinstance(value[1], (dict, list)):
+            parts.append(f"{key} changed")
+        else:
+            parts.append(f"{key} {value[0]!r} -> {value[1]!r}")
+    return ", ".join(parts) or "no structural changes"
+
+
+def content_changed(path, payload: Any, volatile: Iterable[str] = VOLATILE_KEYS) -> bool:
+    """
+    True if `payload` should be written to `path` (new file, or real changes; the
+    diff is printed). False if only volatile keys differ from the file on disk.
+    """
+    if force_write() or not os.path.exists(path):
+        return True
+    old = load_json(path)
+    if old is None:
+        return True
+    if same_content(old, payload, volatile):
+        print(f"[NYRG] {path} unchanged (ignoring {', '.join(volatile)}); not rewriting it.")
+        return False
+    print(f"[NYRG] {path} changed: {format_diff(structural_diff(old, payload, volatile))}")
+    return True
+
+
+def files_equal_ignoring(old_path, new_path, volatile: Iterable[str] = VOLATILE_KEYS) -> bool:
+    """
+    Line-by-line comparison of two indent=2 JSON files, skipping top-level volatile
+    keys. Nothing is parsed, so it works on files too big to load comfortably.
+    """
+    prefixes = tuple(f'  "{k}": '.encode("utf-8") for k in volatile)
+    try:
+        with open(old_path, "rb") as a, open(new_path, "rb") as b:
+            while True:
+                la, lb = a.readline(), b.readline()
+                if la.startswith(prefixes) and lb.startswith(prefixes):
+                    continue
+                if la != lb:
+                    return False
+                if not la:
+                    return True
+    except OSError:
+        return False
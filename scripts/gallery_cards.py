@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Pre-render the Gallery page into a Jekyll include (_includes/gallery_cards.html).
+
+Without this, /gallery.html is empty until assets/site.js has downloaded and parsed
+data/gallery.json. update_gallery_json.py now hands every event to this module while
+it writes gallery.json, and the page markup is written once, at build time:
+
+  {% include gallery_cards.html %}                   the "Recent Events" cards
+  {% include gallery_cards.html part="drive_link" %} the full-width shared folder link
+  {% include gallery_cards.html part="past" %}       the "Past Events" list
+
+Each card has its first image (with its size, placeholder colour and a srcset when
+thumbnail variants exist), the photographer credit from the Drive folder description
+and loading="lazy". assets/site.js only adds the thumbnail rotation on top.
+
+Desktop shows 4 cards, phones 2: the CSS hides cards 3 and 4 on small screens and
+shows their entries at the top of the past list instead (same result as the old
+JavaScript renderer).
+
+Optional environment variables:
+- NYRG_GALLERY_CARDS=0      do not write the include
+- NYRG_GALLERY_CARDS_PATH   output path (default: _includes/gallery_cards.html)
+
+update_gallery_json.py only writes to that path when its --out is data/gallery.json
+(otherwise next to --out, or --cards-out), and not for an empty gallery. refresh_all.py
+stages the include and publishes it together with gallery.json.
+
+Standalone (re-render from an existing data/gallery.json, schema 1 or 2):
+  python3 scripts/gallery_cards.py [data/gallery.json]
+"""
+
+from __future__ import annotations
+
+import html
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Cards on desktop (2x2). Phones show the first MOBILE_CARDS of them.
+RECENT_CARDS = 4
+MOBILE_CARDS = 2
+
+# Rendered thumbnail width: 1 column on phones, 2 columns inside the 1100px container.
+THUMB_SIZES = "(max-width: 980px) 100vw, 540px"
+
+# Full-size Drive thumbnails are w2000 (update_gallery_json.THUMBNAIL_MAX_WIDTH).
+MAX_WIDTH = 2000
+
+DEFAULT_THUMB = "assets/icon.png"
+
+
+def enabled() -> bool:
+    return os.environ.get("NYRG_GALLERY_CARDS", "1").strip() not in ("0", "false", "no")
+
+
+def default_path() -> Path:
+    raw = os.environ.get("NYRG_GALLERY_CARDS_PATH", "").strip()
+    if not raw:
+        return REPO_ROOT / "_includes" / "gallery_cards.html"
+    p = Path(raw)
+    return p if p.is_absolute() else REPO_ROOT / p
+
+
+def esc(value) -> str:
+    """HTML-escape, and keep Liquid from seeing "{{" or "{%" in titles and URLs."""
+    return html.escape(str(value or ""), quote=True).replace("{", "&#123;").replace("}", "&#125;")
+
+
+# -------------------------------------------------------------
+# Events -> the few fields the page needs
+# -------------------------------------------------------------
+
+def event_href(ev: dict, root_url: str) -> str:
+    if ev.get("type") == "drive":
+        return ev.get("folder_url") or root_url or "#"
+    return ev.get("url") or "#"
+
+
+def card_entry(ev: dict, root_url: str, with_image: bool) -> dict:
+    """Reduce an event to what the page renders. Only the recent cards keep an image."""
+    entry = {
+        "type": ev.get("type", ""),
+        "id": ev.get("id", ""),
+        "title": (ev.get("title") or "Event").strip(),
+        "href": event_href(ev, root_url),
+    }
+    if not with_image:
+        return entry
+
+    entry["photographer"] = (ev.get("photographer") or "").strip()
+    entry["note"] = (ev.get("note") or "").strip()
+    if ev.get("type") == "drive":
+        images = ev.get("images") or []
+        entry["image"] = images[0] if images else None
+        entry["image_count"] = len(images)
+    else:
+        entry["thumb_url"] = (ev.get("thumb_url") or "").strip()
+    return entry
+
+
+class CardCollector:
+    """Collect card entries one event at a time (update_gallery_json.py streams its events)."""
+
+    def __init__(self, root_url: str):
+        self.root_url = root_url
+        self.entries: List[dict] = []
+
+    def add(self, ev: dict) -> None:
+        self.entries.append(card_entry(ev, self.root_url, len(self.entries) < RECENT_CARDS))
+
+
+# -------------------------------------------------------------
+# Markup (mirrors buildGalleryCard() in assets/site.js)
+# -------------------------------------------------------------
+
+def image_attrs(img: dict) -> str:
+    attrs = [f'src="{esc(img.get("url"))}"']
+    variants = sorted(
+        (v for v in img.get("variants") or [] if v.get("url") and v.get("w")),
+        key=lambda v: v["w"],
+    )
+    if variants:
+        srcset = [f'{v["url"]} {v["w"]}w' for v in variants]
+        if variants[-1]["w"] < MAX_WIDTH:
+            srcset.append(f'{img.get("url")} {MAX_WIDTH}w')
+        attrs.append(f'srcset="{esc(", ".join(srcset))}" sizes="{THUMB_SIZES}"')
+    if img.get("width") and img.get("height"):
+        attrs.append(f'width="{int(img["width"])}" height="{int(img["height"])}"')
+    if img.get("placeholder"):
+        attrs.append(f'style="background-color: {esc(img["placeholder"])};"')
+    return " ".join(attrs)
+
+
+def render_card(entry: dict, default_thumb: str) -> str:
+    title = esc(entry["title"])
+    card_attrs = 'class="gallery-card"'
+    if entry["type"] == "drive":
+        img = entry.get("image")
+        img_attrs = image_attrs(img) if img else f'src="{default_thumb}"'
+        hint = "Google Drive folder"
+        # site.js rotates the thumbnails of cards that have more than one photo.
+        if entry.get("image_count", 0) > 1 and entry.get("id"):
+            card_attrs += f' data-event-id="{esc(entry["id"])}"'
+    else:
+        thumb = entry.get("thumb_url")
+        img_attrs = f'src="{esc(thumb)}"' if thumb else f'src="{default_thumb}"'
+        hint = "External link"
+
+    lines = [
+        f"<div {card_attrs}>",
+        f'  <a href="{esc(entry["href"])}" target="_blank" rel="noopener" aria-label="{title} (opens in a new tab)">',
+        f'    <img class="gallery-thumb" loading="lazy" alt="{title}" {img_attrs}>',
+        '    <div class="gallery-card-body">',
+        f'      <div class="gallery-title">{title}</div>',
+    ]
+    if entry.get("photographer"):
+        lines.append(f'      <div class="small gallery-card-meta">Photo: {esc(entry["photographer"])}</div>')
+    if entry.get("note"):
+        lines.append(f'      <div class="small gallery-card-meta">{esc(entry["note"])}</div>')
+    lines += [
+        f'      <div class="small gallery-card-hint">{hint}</div>',
+        "    </div>",
+        "  </a>",
+        "</div>",
+    ]
+    return "\n".join(lines)
+
+
+def render(entries: List[dict], root_url: str) -> str:
+    """The whole include: one Liquid branch per part of the page."""
+    # Relative to the site root, like the rest of the site (works on branch previews).
+    default_thumb = "{{ '/" + DEFAULT_THUMB + "' | relative_url }}"
+
+    recent = entries[:RECENT_CARDS]
+    cards = "\n".join(render_card(e, default_thumb) for e in recent)
+    if not cards:
+        cards = '<div class="small">No events loaded yet. Check back soon.</div>'
+
+    drive_link = ""
+    if root_url:
+        drive_link = "\n".join([
+            f'<a class="gallery-drive-link" href="{esc(root_url)}" target="_blank" rel="noopener">',
+            '  <div style="font-weight:700; margin-bottom:6px;">Open the full shared Google Drive folder</div>',
+            '  <div class="small" style="color: var(--muted);">See all events, all photos, and download originals.</div>',
+            "</a>",
+        ])
+
+    past_links = []
+    # Recent cards that phones do not show are listed first (hidden on desktop by CSS).
+    for e in recent[MOBILE_CARDS:]:
+        past_links.append(
+            f'<a class="gallery-past-recent" href="{esc(e["href"])}" target="_blank" rel="noopener">{esc(e["title"])}</a>'
+        )
+    for e in entries[RECENT_CARDS:]:
+        past_links.append(f'<a href="{esc(e["href"])}" target="_blank" rel="noopener">{esc(e["title"])}</a>')
+    if len(entries) <= RECENT_CARDS:
+        past_links.append('<div class="small gallery-past-empty">No past events yet.</div>')
+
+    return "\n".join([
+        "{%- comment -%}",
+        "  THIS FILE IS AUTO-GENERATED. DO NOT EDIT MANUALLY.",
+        "  Written by scripts/gallery_cards.py (via update_gallery_json.py) from the same events as data/gallery.json.",
+        "  Used by gallery.md; assets/site.js adds the thumbnail rotation.",
+        "{%- endcomment -%}",
+        '{%- if include.part == "drive_link" -%}',
+        drive_link,
+        '{%- elsif include.part == "past" -%}',
+        "\n".join(past_links),
+        "{%- else -%}",
+        cards,
+        "{%- endif -%}",
+        "",
+    ])
+
+
+def write(entries: List[dict], root_url: str, path: Optional[Path] = None) -> bool:
+    """Write the include if its content changed. Returns True if written."""
+    path = Path(path) if path is not None else default_path()
+    body = render(entries, root_url)
+    try:
+        if path.read_text(encoding="utf-8") == body:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(body, encoding="utf-8")
+    os.replace(tmp, path)
+    return True
+
+
+# -------------------------------------------------------------
+# Standalone: from an existing gallery.json
+# -------------------------------------------------------------
+
+def iter_gallery_events(data: dict) -> Iterable[dict]:
+    """Events with image dicts, for schema 1 and the compact schema 2 (see encode_compact_gallery)."""
+    if data.get("schema") != 2:
+        yield from data.get("events") or []
+        return
+
+    columns = data.get("images") or {}
+    widths = [w for w in data.get("variant_widths") or [] if w < MAX_WIDTH]
+
+    def image(i: int) -> dict:
+        file_id = columns["id"][i]
+        img = {"id": file_id, "url": data["thumb_url"].replace("{id}", file_id)}
+        # Explicit per-image values (null = templated).
+        if columns.get("url") and columns["url"][i] is not None:
+            img["url"] = columns["url"][i]
+        if columns.get("variants") and columns["variants"][i] is not None:
+            if columns["variants"][i]:
+                img["variants"] = columns["variants"][i]
+        elif widths:
+            img["variants"] = [
+                {"w": w, "url": data["variant_url"].replace("{id}", file_id).replace("{w}", str(w))} for w in widths
+            ]
+        for name in ("width", "height", "placeholder"):
+            if columns.get(name) and columns[name][i] is not None:
+                img[name] = columns[name][i]
+        return img
+
+    for ev in data.get("events") or []:
+        out = dict(ev)
+        if "images" in ev:
+            out["images"] = [image(i) for i in ev["images"]]
+        yield out
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    src = Path(argv[0]) if argv else REPO_ROOT / "data" / "gallery.json"
+    data = json.loads(src.read_text(encoding="utf-8"))
+    root_url = (data.get("root_folder") or {}).get("url", "")
+    collector = CardCollector(root_url)
+    for ev in iter_gallery_events(data):
+        collector.add(ev)
+    path = default_path()
+    if write(collector.entries, root_url, path):
+        print(f"[NYRG] Gallery cards: {len(collector.entries)} event(s) -> {path}")
+    else:
+        print(f"[NYRG] Gallery cards unchanged -> {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Homepage data bundle (data/home.json): everything the homepage needs for its first render,
+in one small request.
+
+Without it the homepage fetches instagram.json, luma.json and the whole gallery.json, of
+which the photo rotator only uses a few dozen images. The bundle holds:
+
+  rotator     a seeded sample of gallery images, spread across events (newest first),
+              grouped like gallery.json events: [{"title": ..., "images": [...]}]
+  events      the next upcoming Luma events, with only the fields the homepage shows
+  instagram   the latest Instagram posts
+
+Each generator replaces its own section after writing its feed (update_gallery_json.py
+"rotator", luma_scrape.py "events", selenium_instagram_scrape.py "instagram"), so one
+feed refresh does not need the others. refresh_all.py gives each feed a private bundle
+and merges only the sections of the feeds it publishes (merge_sections()).
+
+The sample is deterministic: the same gallery gives the same file (no daily commit),
+and assets/site.js shuffles it on every visit.
+
+Optional environment variables:
+- NYRG_HOME_BUNDLE=0           do not update data/home.json
+- NYRG_HOME_JSON_PATH          output path (default: data/home.json)
+- NYRG_HOME_ROTATOR_IMAGES     rotator sample size (default: 48)
+- NYRG_HOME_SEED               sample seed (default: "nyrg"); change it to pick other photos
+
+Standalone (rebuild every section from the current data/*.json files):
+  python3 scripts/home_bundle.py
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import feed_diff
+import gallery_cards
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+BUNDLE_VERSION = 1
+
+SECTIONS = ("rotator", "events", "instagram")
+
+DEFAULT_ROTATOR_IMAGES = 48
+DEFAULT_SEED = "nyrg"
+
+# The homepage shows one featured event plus the calendar (2+ events), and up to 4 posts.
+MAX_EVENTS = 6
+MAX_POSTS = 4
+
+# Per-image fields the rotator uses (see bestImageUrl() in assets/site.js).
+IMAGE_FIELDS = ("url", "variants", "placeholder")
+EVENT_FIELDS = ("title", "url", "start_at", "end_at", "cover_url")
+ADDRESS_FIELDS = ("short_address", "address", "city")
+POST_FIELDS = ("url", "shortcode", "thumbnail", "media_type", "taken_at", "caption")
+
+# refresh_all.py runs the generators in threads of one process.
+_LOCK = threading.Lock()
+
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, "").strip() or default)
+    except ValueError:
+        return default
+
+
+def enabled() -> bool:
+    return os.environ.get("NYRG_HOME_BUNDLE", "1").strip() not in ("0", "false", "no")
+
+
+def default_path() -> Path:
+    raw = os.environ.get("NYRG_HOME_JSON_PATH", "").strip()
+    if not raw:
+        return REPO_ROOT / "data" / "home.json"
+    p = Path(raw)
+    return p if p.is_absolute() else REPO_ROOT / p
+
+
+def iso_utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+# -------------------------------------------------------------
+# Sections
+# -------------------------------------------------------------
+
+class RotatorSampler:
+    """
+    Seeded sample of gallery images, fed one event at a time (update_gallery_json.py streams them).
+
+    Each event gets its own random.Random(seed + event id), so adding a new album does not
+    reshuffle the photos picked from the others. The sample is then filled round-robin, one
+    photo per event per round, so every event is represented before any gets a second photo.
+    """
+
+    def __init__(self, size: Optional[int] = None, seed: Optional[str] = None):
+        self.size = size if size is not None else env_int("NYRG_HOME_ROTATOR_IMAGES", DEFAULT_ROTATOR_IMAGES)
+        self.seed = seed if seed is not None else (os.environ.get("NYRG_HOME_SEED", "").strip() or DEFAULT_SEED)
+        self.picks: List[dict] = []
+
+    def add(self, ev: dict) -> None:
+        images = [img for img in ev.get("images") or [] if isinstance(img, dict) and img.get("url")]
+        if ev.get("type") != "drive" or not images or self.size <= 0:
+            return
+        rng = random.Random(f"{self.seed}:{ev.get('id') or ev.get('title', '')}")
+        chosen = rng.sample(images, min(len(images), self.size))
+        self.picks.append({
+            "title": (ev.get("title") or "Event").strip(),
+            "images": [{k: img[k] for k in IMAGE_FIELDS if img.get(k)} for img in chosen],
+        })
+
+    def section(self) -> List[dict]:
+        taken = [0] * len(self.picks)
+        total, progress = 0, True
+        while total < self.size and progress:
+            progress = False
+            for i, pick in enumerate(self.picks):
+                if total >= self.size:
+                    break
+                if taken[i] < len(pick["images"]):
+                    taken[i] += 1
+                    total += 1
+                    progress = True
+        return [
+            {"title": pick["title"], "images": pick["images"][:n]}
+            for pick, n in zip(self.picks, taken) if n
+        ]
+
+
+def events_section(events: Iterable[dict]) -> List[dict]:
+    """The next upcoming Luma events (luma.json is already sorted by start time)."""
+    out: List[dict] = []
+    for ev in events:
+        if len(out) >= MAX_EVENTS:
+            break
+        record = {k: ev[k] for k in EVENT_FIELDS if ev.get(k)}
+        geo = ev.get("geo_address_info") or {}
+        address = {k: geo[k] for k in ADDRESS_FIELDS if geo.get(k)}
+        if address:
+            record["geo_address_info"] = address
+        out.append(record)
+    return out
+
+
+def instagram_section(posts: Iterable[dict]) -> List[dict]:
+    out: List[dict] = []
+    for post in posts:
+        if len(out) >= MAX_POSTS:
+            break
+        if isinstance(post, dict) and post.get("url"):
+            out.append({k: post[k] for k in POST_FIELDS if post.get(k)})
+    return out
+
+
+# -------------------------------------------------------------
+# Write
+# -------------------------------------------------------------
+
+def write_sections(sections: Dict[str, list], path: Path) -> bool:
+    """Replace some sections and keep the others. Returns True if the file was written."""
+    current = feed_diff.load_json(path)
+    bundle = {
+        "_comment": "THIS FILE IS AUTO-GENERATED. DO NOT EDIT MANUALLY. Built by scripts/home_bundle.py.",
+        "updated_at": iso_utc_now(),
+        "version": BUNDLE_VERSION,
+    }
+    for name in SECTIONS:
+        if name in sections:
+            bundle[name] = sections[name]
+        elif isinstance(current, dict) and isinstance(current.get(name), list):
+            bundle[name] = current[name]
+
+    if not feed_diff.content_changed(str(path), bundle):
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    # No indentation: this file is meant to be small.
+    tmp.write_text(json.dumps(bundle, ensure_ascii=False, separators=(",", ":")) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+    return True
+
+
+def update_section(name: str, value: List[dict], path: Optional[Path] = None) -> None:
+    """
+    Replace one section of data/home.json. Never fails the caller: the homepage falls back
+    to the individual feeds when the bundle is missing or broken.
+    """
+    if not enabled():
+        return
+    if name not in SECTIONS:
+        raise ValueError(f"unknown home bundle section {name!r}")
+    path = Path(path) if path is not None else default_path()
+    try:
+        with _LOCK:
+            written = write_sections({name: value}, path)
+        if written:
+            print(f"[NYRG] Home bundle: {name} updated ({len(value)} entries) -> {path}")
+    except (OSError, ValueError) as e:
+        print(f"[NYRG] WARNING: could not update the home bundle: {e}")
+
+
+def merge_sections(sources: Dict[str, Path], path: Path) -> bool:
+    """
+    Copy sections out of other bundles into `path`: {section: bundle it is taken from}.
+    Used by refresh_all.py with the private bundles of the feeds it publishes.
+    Returns True if `path` was written.
+    """
+    sections: Dict[str, list] = {}
+    for name, source in sources.items():
+        data = feed_diff.load_json(source)
+        if isinstance(data, dict) and isinstance(data.get(name), list):
+            sections[name] = data[name]
+    if not sections:
+        return False
+    with _LOCK:
+        return write_sections(sections, path)
+
+
+def rebuild(path: Optional[Path] = None) -> None:
+    """Rebuild every section from the feeds in data/."""
+    data_dir = REPO_ROOT / "data"
+    sections: Dict[str, list] = {}
+
+    gallery = feed_diff.load_json(data_dir / "gallery.json")
+    if isinstance(gallery, dict):
+        sampler = RotatorSampler()
+        for ev in gallery_cards.iter_gallery_events(gallery):
+            sampler.add(ev)
+        sections["rotator"] = sampler.section()
+
+    luma = feed_diff.load_json(data_dir / "luma.json")
+    if isinstance(luma, dict):
+        sections["events"] = events_section(luma.get("events") or [])
+
+    instagram = feed_diff.load_json(data_dir / "instagram.json")
+    if isinstance(instagram, dict):
+        sections["instagram"] = instagram_section(instagram.get("posts") or [])
+
+    path = Path(path) if path is not None else default_path()
+    with _LOCK:
+        written = write_sections(sections, path)
+    print(f"[NYRG] Home bundle {'rebuilt' if written else 'unchanged'}: {', '.join(sections) or 'no sections'} -> {path}")
+
+
+if __name__ == "__main__":
+    rebuild()
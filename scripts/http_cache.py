@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Shared on-disk HTTP cache for the NYRG data scripts.
+
+What it does:
+- Stores response bodies plus their ETag / Last-Modified headers on disk.
+- Sends If-None-Match / If-Modified-Since on the next request.
+- On "304 Not Modified" it returns the stored body (almost no bandwidth).
+- Per-endpoint TTLs: inside the TTL a stored response is reused without any request.
+- The cache has a size bound; least recently used entries are evicted first.
+
+Used by:
+- update_gallery_json.py (Drive listings + external events CSV)
+- update_jobs_json.py    (jobs CSV)
+- luma_scrape.py         (Luma calendar API)
+
+Optional environment variables:
+- NYRG_HTTP_CACHE         ("1" default, set to "0" to disable the cache)
+- NYRG_HTTP_CACHE_DIR     (default: ~/.cache/nyrg/http, keep it OUT of the repo)
+- NYRG_HTTP_CACHE_MAX_MB  (default: 64)
+- NYRG_HTTP_CACHE_TTLS    (extra TTL rules, e.g. "api2.luma.com=600,docs.google.com=60")
+
+Notes:
+- API keys (the "key" query param) are never part of the cache key or the index.
+- Only 200 responses are stored, and only if they carry a validator or a TTL applies.
+- Several processes may share the cache directory: the index is merged with the copy on
+  disk under a file lock when it is written, and body files no index entry refers to
+  (left by a crashed run) are swept at the same time, so the size bound holds.
+- Every network request goes through scripts/rate_limit.py (shared Google rate limit,
+  retries with backoff on 429 / 403 rateLimitExceeded / 5xx).
+- Every request and cache result is recorded in the run's metrics (scripts/run_metrics.py).
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlparse
+
+import run_metrics
+from rate_limit import send_with_retries
+
+try:
+    import fcntl  # POSIX only: the index merge is not locked elsewhere
+except ImportError:
+    fcntl = None
+
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "nyrg", "http")
+DEFAULT_MAX_MB = 64
+
+# (URL substring, seconds) - first match wins.
+# Inside the TTL a stored response is served without contacting the server.
+# TTL 0 means "always revalidate" (a conditional GET every time).
+DEFAULT_TTLS: List[Tuple[str, int]] = [
+    ("googleapis.com/drive", 0),
+    ("docs.google.com", 0),
+    ("api2.luma.com", 300),
+]
+
+# Query params that must never end up in the cache key (secrets).
+SECRET_PARAMS = {"key"}
+
+# Body files without an index entry are only swept once they are this old: another
+# process may have stored them and not written its index yet.
+ORPHAN_GRACE_SECONDS = 6 * 3600
+
+
+class HTTPError(IOError):
+    """Raised by CachedResponse.raise_for_status() for 4xx/5xx responses."""
+
+    def __init__(self, status_code: int, url: str):
+        super().__init__(f"HTTP {status_code} for {url}")
+        self.status_code = status_code
+        self.url = url
+
+
+class CachedResponse:
+    """
+    Small subset of requests.Response, so call sites barely change.
+
+    Extra flags:
+    - from_cache:   served from disk without any request (inside TTL)
+    - not_modified: the server answered 304 and the stored body was used
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        content: bytes,
+        headers: Dict[str, str],
+        url: str,
+        from_cache: bool = False,
+        not_modified: bool = False,
+    ):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.url = url
+        self.from_cache = from_cache
+        self.not_modified = not_modified
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise HTTPError(self.status_code, self.url)
+
+
+def env_ttls() -> List[Tuple[str, int]]:
+    """Parse NYRG_HTTP_CACHE_TTLS ("pattern=seconds,...") and put it before the defaults."""
+    out: List[Tuple[str, int]] = []
+    raw = os.environ.get("NYRG_HTTP_CACHE_TTLS", "")
+    for part in raw.split(","):
+        if "=" not in part:
+            continue
+        pattern, _, seconds = part.rpartition("=")
+        try:
+            out.append((pattern.strip(), int(seconds)))
+        except ValueError:
+            continue
+    return out + DEFAULT_TTLS
+
+
+def cache_key(url: str, params: Optional[dict]) -> str:
+    safe = sorted((k, str(v)) for k, v in (params or {}).items() if k not in SECRET_PARAMS)
+    raw = url + ("?" + urlencode(safe) if safe else "")
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def display_url(url: str, params: Optional[dict]) -> str:
+    safe = [(k, v) for k, v in (params or {}).items() if k not in SECRET_PARAMS]
+    return url + ("?" + urlencode(safe) if safe else "")
+
+
+def urllib_fetch(url: str, params: Optional[dict], headers: dict, timeout: float) -> Tuple[int, Dict[str, str], bytes]:
+    """Plain-stdlib transport (used when the caller has no requests session)."""
+    full = url + ("?" + urlencode(params) if params else "")
+    req = urllib.request.Request(full, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            return r.status, {k.lower(): v for k, v in r.headers.items()}, r.read()
+    except urllib.error.HTTPError as e:
+        # 304 and 4xx/5xx land here with urllib.
+        return e.code, {k.lower(): v for k, v in (e.headers or {}).items()}, e.read() or b""
+
+
+def session_fetch(session, url: str, params: Optional[dict], headers: dict, timeout: float) -> Tuple[int, Dict[str, str], bytes]:
+    """Transport for a requests.Session (or the requests module itself)."""
+    r = session.get(url, params=params, headers=headers, timeout=timeout)
+    return r.status_code, {k.lower(): v for k, v in r.headers.items()}, r.content
+
+
+class HttpCache:
+    """
+    On-disk conditional-GET cache. Thread-safe (the gallery script lists folders in parallel).
+
+    Layout:
+      <cache_dir>/index.json        {key: {url, etag, last_modified, stored_at, last_used, size, headers}}
+      <cache_dir>/index.lock        held while the index is merged and written (flush())
+      <cache_dir>/bodies/<key>      raw response body
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+        ttls: Optional[List[Tuple[str, int]]] = None,
+        enabled: bool = True,
+    ):
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_bytes = max_bytes
+        self.ttls = ttls if ttls is not None else list(DEFAULT_TTLS)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._index: Dict[str, dict] = {}
+        # Keys this process evicted -> when, so flush() does not bring them back from disk.
+        self._removed: Dict[str, float] = {}
+        self._dirty = False
+        if self.enabled:
+            self._load_index()
+
+    # ---------------------------------------------------------
+    # Index persistence
+    # ---------------------------------------------------------
+
+    def _index_path(self) -> str:
+        return os.path.join(self.cache_dir, "index.json")
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, "bodies", key)
+
+    def _read_index_file(self) -> Dict[str, dict]:
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception:
+            # A corrupt index only means a cold cache.
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _load_index(self) -> None:
+        self._index = self._read_index_file()
+
+    def _merge_disk_locked(self) -> None:
+        """Add the entries other processes wrote since we loaded the index (newest body wins)."""
+        for key, entry in self._read_index_file().items():
+            if not isinstance(entry, dict):
+                continue
+            if key in self._removed and entry.get("stored_at", 0) <= self._removed[key]:
+                continue
+            mine = self._index.get(key)
+            if mine is None or entry.get("stored_at", 0) > mine.get("stored_at", 0):
+                merged = dict(entry)
+                if mine is not None:
+                    merged["last_used"] = max(entry.get("last_used", 0), mine.get("last_used", 0))
+                self._index[key] = merged
+            elif entry.get("last_used", 0) > mine.get("last_used", 0):
+                mine["last_used"] = entry["last_used"]
+
+    def _body_names(self) -> List[str]:
+        try:
+            return os.listdir(os.path.join(self.cache_dir, "bodies"))
+        except OSError:
+            return []
+
+    def _sweep_orphans_locked(self, names: List[str]) -> None:
+        """Delete body files no index entry refers to (older than ORPHAN_GRACE_SECONDS)."""
+        cutoff = time.time() - ORPHAN_GRACE_SECONDS
+        for name in names:
+            if name in self._index:
+                continue
+            path = os.path.join(self.cache_dir, "bodies", name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def flush(self) -> None:
+        """
+        Merge the index with the copy on disk and write it (atomic). Called automatically at exit.
+        Holds <cache_dir>/index.lock, so concurrent processes do not drop each other's entries.
+        """
+        with self._lock:
+            if not self.enabled or not self._dirty:
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(os.path.join(self.cache_dir, "index.lock"), "a") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._merge_disk_locked()
+                names = self._body_names()
+                # Entries whose body another process evicted.
+                present = set(names)
+                for key in [k for k in self._index if k not in present]:
+                    del self._index[key]
+                self._evict_locked()
+                tmp = self._index_path() + f".{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self._index, f, separators=(",", ":"))
+                os.replace(tmp, self._index_path())
+                self._sweep_orphans_locked(names)
+            self._dirty = False
+
+    # ---------------------------------------------------------
+    # Lookup / store
+    # ---------------------------------------------------------
+
+    def ttl_for(self, url: str) -> int:
+        for pattern, seconds in self.ttls:
+            if pattern in url:
+                return seconds
+        return 0
+
+    def _read_body(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._body_path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _store(self, key: str, url: str, headers: Dict[str, str], body: bytes) -> None:
+        os.makedirs(os.path.dirname(self._body_path(key)), exist_ok=True)
+        tmp = self._body_path(key) + f".{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(body)
+        os.replace(tmp, self._body_path(key))
+
+        now = time.time()
+        with self._lock:
+            self._index[key] = {
+                "url": url,
+                "etag": headers.get("etag", ""),
+                "last_modified": headers.get("last-modified", ""),
+                "content_type": headers.get("content-type", ""),
+                "stored_at": now,
+                "last_used": now,
+                "size": len(body),
+            }
+            self._dirty = True
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        total = sum(e.get("size", 0) for e in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key in sorted(self._index, key=lambda k: self._index[k].get("last_used", 0)):
+            if total <= self.max_bytes:
+                break
+            total -= self._index.pop(key).get("size", 0)
+            self._removed[key] = time.time()
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+
+    def _touch(self, key: str, revalidated: bool) -> None:
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return
+            entry["last_used"] = time.time()
+            if revalidated:
+                entry["stored_at"] = entry["last_used"]
+            self._dirty = True
+
+    # ---------------------------------------------------------
+    # Public API
+    # ---------------------------------------------------------
+
+    def get(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        timeout: float = 30,
+        session=None,
+        ttl: Optional[int] = None,
+    ) -> CachedResponse:
+        """
+        GET with caching. `session` may be a requests.Session (or the requests module);
+        without it the stdlib (urllib) is used.
+        """
+        headers = dict(headers or {})
+        shown = display_url(url, params)
+        metrics = run_metrics.current()
+        host = urlparse(url).netloc
+
+        def fetch(h: dict) -> Tuple[int, Dict[str, str], bytes]:
+            # Approximate request size: URL + query + headers (bodies are never sent).
+            sent = len(url) + len(urlencode(params or {})) + sum(len(k) + len(str(v)) + 4 for k, v in h.items())
+
+            def send() -> Tuple[int, Dict[str, str], bytes]:
+                t0 = time.perf_counter()
+                try:
+                    if session is not None:
+                        result = session_fetch(session, url, params, h, timeout)
+                    else:
+                        result = urllib_fetch(url, params, h, timeout)
+                except Exception:
+                    metrics.observe_request(host, 0, time.perf_counter() - t0, 0, sent)
+                    raise
+                metrics.observe_request(host, result[0], time.perf_counter() - t0, len(result[2]), sent)
+                return result
+
+            return send_with_retries(url, send)
+
+        if not self.enabled:
+            metrics.observe_cache("bypass")
+            status, resp_headers, body = fetch(headers)
+            return CachedResponse(status, body, resp_headers, shown)
+
+        key = cache_key(url, params)
+        ttl = self.ttl_for(url) if ttl is None else ttl
+        with self._lock:
+            entry = dict(self._index.get(key) or {})
+
+        body = self._read_body(key) if entry else None
+        if entry and body is not None:
+            cached_headers = {"content-type": entry.get("content_type", "")}
+
+            # 1) Fresh enough: no request at all.
+            if ttl > 0 and time.time() - entry.get("stored_at", 0) < ttl:
+                self._touch(key, revalidated=False)
+                metrics.observe_cache("hit")
+                return CachedResponse(200, body, cached_headers, shown, from_cache=True)
+
+            # 2) Otherwise ask the server if it changed.
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        status, resp_headers, resp_body = fetch(headers)
+
+        if status == 304 and body is not None:
+            self._touch(key, revalidated=True)
+            metrics.observe_cache("revalidated")
+            return CachedResponse(200, body, cached_headers, shown, not_modified=True)
+
+        metrics.observe_cache("miss")
+
+        if status == 200 and (resp_headers.get("etag") or resp_headers.get("last-modified") or ttl > 0):
+            self._store(key, shown, resp_headers, resp_body)
+
+        return CachedResponse(status, resp_body, resp_headers, shown)
+
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def shared_session(pool_size: int = 4):
+    """
+    The process-wide requests.Session (created on first use).
+
+    One session means one keep-alive connection pool per host, shared by every
+    script running in this process (see scripts/refresh_all.py), so the TLS
+    handshake is paid once per host. The first caller decides the pool size.
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            import requests  # only the scripts that need a session depend on requests
+
+            size = max(1, pool_size)
+            adapter = requests.adapters.HTTPAdapter(pool_connections=size, pool_maxsize=size)
+            sess = requests.Session()
+            sess.mount("https://", adapter)
+            sess.mount("http://", adapter)
+            _SESSION = sess
+        return _SESSION
+
+
+_DEFAULT: Optional[HttpCache] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def default_cache() -> HttpCache:
+    """The process-wide cache configured from NYRG_HTTP_CACHE* env vars."""
+    global _DEFAULT
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            enabled = os.environ.get("NYRG_HTTP_CACHE", "1").strip() not in ("0", "false", "False", "no", "NO")
+            try:
+                max_mb = float(os.environ.get("NYRG_HTTP_CACHE_MAX_MB", "") or DEFAULT_MAX_MB)
+            except ValueError:
+                max_mb = DEFAULT_MAX_MB
+            _DEFAULT = HttpCache(
+                cache_dir=os.environ.get("NYRG_HTTP_CACHE_DIR", "").strip() or DEFAULT_CACHE_DIR,
+                max_bytes=int(max_mb * 1024 * 1024),
+                ttls=env_ttls(),
+                enabled=enabled,
+            )
+            atexit.register(_DEFAULT.flush)
+        return _DEFAULT
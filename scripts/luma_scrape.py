@@ -3,9 +3,15 @@
 NYRG Luma scraper.
 
 Goal:
-- Fetch upcoming events from the Luma calendar API
+- Fetch upcoming events from the Luma calendar API (all pages, following next_cursor)
 - Write them to data/luma.json
 - If the request fails, do NOT modify the JSON.
+- Add per-event details (end time, description excerpt, ticket status, spots left)
+  from event/get. Details are cached by api_id and only re-fetched when the event
+  changed or starts within 48 hours; a failed event just keeps its cached details.
+- Keep an archive of past events in data/luma_past.json, keyed by api_id.
+  Only new past events are fetched: past pages come newest first, so paging stops
+  at the first page that contains an event already in the archive.
 
 How to run:
 - From repo root:
@@ -13,22 +19,47 @@ How to run:
 
 Optional environment variables:
 - NYRG_LUMA_JSON_PATH  (default: data/luma.json)
+- NYRG_LUMA_PAST_JSON_PATH (default: data/luma_past.json)
+- NYRG_LUMA_ARCHIVE    ("1" default, set to "0" to skip the past-events archive)
+- NYRG_LUMA_ARCHIVE_FULL ("1" re-fetches every past event, e.g. after editing old events on Luma)
+- NYRG_LUMA_DETAILS    ("1" default, set to "0" to skip per-event details)
+- NYRG_LUMA_DETAIL_WORKERS (default: 4, parallel event/get requests)
+- NYRG_LUMA_DETAILS_CACHE  (default: ~/.cache/nyrg/luma_details.json)
 - NYRG_LUMA_DEBUG      ("0" default, set to "1" for extra logs)
+- NYRG_HTTP_CACHE*     (shared HTTP cache settings, see scripts/http_cache.py)
+- NYRG_METRICS_*       (per-run metrics export, see scripts/run_metrics.py)
+- NYRG_FORCE_WRITE     ("1" rewrites luma.json even if only updated_at changed, see scripts/feed_diff.py)
+- NYRG_SEARCH_*        (site search index, see scripts/search_index.py)
+- NYRG_HOME_*          (homepage bundle data/home.json, see scripts/home_bundle.py)
 """
 
+import hashlib
 import json
 import os
 import sys
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Dict, List, Optional
 
-import requests
+import feed_diff
+import home_bundle
+import run_metrics
+import search_index
+from http_cache import default_cache, shared_session
 
 CALENDAR_API_ID = "cal-qOrYkgFc93AqbB1"
-API_URL = (
-    f"https://api2.luma.com/calendar/get-items"
-    f"?calendar_api_id={CALENDAR_API_ID}&pagination_limit=20&period=future"
-)
+API_URL = "https://api2.luma.com/calendar/get-items"
+DETAILS_URL = "https://api2.luma.com/event/get"
+PAGE_SIZE = 20
+# Safety net against a cursor loop (20 x 50 = 1000 events per run).
+MAX_PAGES = 50
+
+# Event details: fetched in a small pool and cached by api_id + change marker.
+DEFAULT_DETAIL_WORKERS = 4
+DEFAULT_DETAILS_CACHE = os.path.join("~", ".cache", "nyrg", "luma_details.json")
+SOON_HOURS = 48             # events starting within this window are always re-fetched
+DESCRIPTION_MAX_CHARS = 300
 LUMA_BASE_URL = "https://lu.ma"
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -39,6 +70,16 @@ def env_str(name: str, default: str) -> str:
     return default if v is None or v.strip() == "" else v.strip()
 
 
+def env_int(name: str, default: int) -> int:
+    v = os.environ.get(name)
+    if v is None or v.strip() == "":
+        return default
+    try:
+        return int(v)
+    except ValueError:
+        return default
+
+
 def env_bool(name: str, default: bool) -> bool:
     v = os.environ.get(name)
     if v is None:
@@ -46,66 +87,316 @@ def env_bool(name: str, default: bool) -> bool:
     return v.strip() in ("1", "true", "True", "yes", "YES")
 
 
-def safe_write_json(path: Path, payload: dict) -> None:
+def safe_write_json(path: Path, payload: dict) -> bool:
+    """Atomic write; returns False (and keeps the file) if only updated_at would change."""
+    if not feed_diff.content_changed(path, payload):
+        return False
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp = path.with_suffix(".tmp")
     tmp.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
     tmp.replace(path)
+    return True
 
 
-def main() -> int:
-    json_path = Path(env_str("NYRG_LUMA_JSON_PATH", str(REPO_ROOT / "data" / "luma.json")))
-    debug = env_bool("NYRG_LUMA_DEBUG", False)
+def event_record(entry: dict) -> Optional[dict]:
+    """One get-items entry -> the event object stored in luma.json (None if it has no URL)."""
+    event = entry.get("event", {}) or {}
+    name = event.get("name", "").strip()
+    url_slug = event.get("url", "").strip()
+    api_id = event.get("api_id", "").strip()
+    start_at = event.get("start_at", "")
+    cover_url = event.get("cover_url", "")
+    geo = event.get("geo_address_info", {}) or {}
 
-    if debug:
-        print("[NYRG][DEBUG] api_url:", API_URL)
-        print("[NYRG][DEBUG] json_path:", json_path)
+    if url_slug:
+        url = f"{LUMA_BASE_URL}/{url_slug}"
+    elif api_id:
+        url = f"{LUMA_BASE_URL}/event/{api_id}"
+    else:
+        return None
+
+    return {
+        "api_id": api_id,
+        "title": name,
+        "url": url,
+        "start_at": start_at,
+        "cover_url": cover_url,
+        "geo_address_info": {
+            "address": geo.get("address", ""),
+            "short_address": geo.get("short_address", ""),
+            "full_address": geo.get("full_address", ""),
+            "city": geo.get("city", ""),
+        },
+    }
+
+
+# -------------------------------------------------------------
+# Per-event details (event/get), cached by api_id
+# -------------------------------------------------------------
+
+def change_marker(entry: dict) -> str:
+    """What tells us an event changed: its update timestamp, else a hash of the list entry."""
+    event = entry.get("event", {}) or {}
+    if event.get("updated_at"):
+        return str(event["updated_at"])
+    body = json.dumps(event, sort_keys=True, separators=(",", ":"))
+    return "sha1:" + hashlib.sha1(body.encode("utf-8")).hexdigest()
+
+
+def mirror_text(node) -> str:
+    """Plain text of a ProseMirror document (Luma's rich-text descriptions)."""
+    if isinstance(node, list):
+        return " ".join(t for t in (mirror_text(n) for n in node) if t)
+    if not isinstance(node, dict):
+        return ""
+    if node.get("type") == "text":
+        return node.get("text", "")
+    return mirror_text(node.get("content") or [])
+
+
+def details_from_response(data: dict) -> dict:
+    """The fields we keep from event/get (only the ones Luma actually returned)."""
+    event = data.get("event", {}) or {}
+    ticket = data.get("ticket_info", {}) or {}
+
+    text = " ".join((mirror_text(data.get("description_mirror")) or event.get("description", "") or "").split())
+    if len(text) > DESCRIPTION_MAX_CHARS:
+        text = text[:DESCRIPTION_MAX_CHARS].rsplit(" ", 1)[0] + "…"
+
+    if ticket.get("is_sold_out"):
+        status = "sold_out"
+    elif ticket.get("require_approval"):
+        status = "approval"
+    elif ticket.get("is_near_capacity"):
+        status = "almost_full"
+    elif ticket:
+        status = "free" if ticket.get("is_free") else "paid"
+    else:
+        status = ""
+
+    details = {
+        "end_at": event.get("end_at", ""),
+        "description": text,
+        "ticket_status": status,
+        "spots_remaining": ticket.get("spots_remaining"),
+    }
+    return {k: v for k, v in details.items() if v not in ("", None)}
+
+
+def load_details_cache(path: str) -> Dict[str, dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_details_cache(path: str, cache: Dict[str, dict]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def starts_soon(start_at: str, now: datetime) -> bool:
+    try:
+        start = datetime.fromisoformat(start_at.replace("Z", "+00:00"))
+    except ValueError:
+        return False
+    return start - now <= timedelta(hours=SOON_HOURS)
+
+
+def fetch_event_details(api_id: str) -> dict:
+    res = default_cache().get(
+        DETAILS_URL, params={"event_api_id": api_id}, headers={"User-Agent": "Mozilla/5.0"},
+        timeout=15, session=shared_session(),
+    )
+    if not res.ok:
+        raise RuntimeError(f"HTTP {res.status_code}")
+    return details_from_response(res.json())
 
+
+def enrich_events(events: List[dict], entries: List[dict], workers: int, debug: bool) -> Dict[str, int]:
+    """
+    Add event/get details to `events` (in place), in a pool of `workers` threads.
+
+    Details are cached by api_id with the event's change marker. Only events that
+    changed since the cached copy, or that start within SOON_HOURS (ticket status
+    moves fast then), are fetched again. A failed event keeps its cached details
+    (or none); it never drops the event or the feed.
+    """
+    cache_path = os.path.expanduser(env_str("NYRG_LUMA_DETAILS_CACHE", DEFAULT_DETAILS_CACHE))
+    cache = load_details_cache(cache_path)
+    markers = {
+        (e.get("event") or {}).get("api_id", ""): change_marker(e) for e in entries
+    }
+    now = datetime.now(timezone.utc)
+
+    todo = [
+        ev["api_id"] for ev in events
+        if ev.get("api_id") and (
+            (cache.get(ev["api_id"]) or {}).get("marker") != markers.get(ev["api_id"])
+            or starts_soon(ev.get("start_at", ""), now)
+        )
+    ]
+    stats = {"fetched": 0, "failed": 0, "cached": len([e for e in events if e.get("api_id")]) - len(todo)}
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=max(1, workers), **run_metrics.pool_kwargs()) as pool:
+            futures = {pool.submit(fetch_event_details, api_id): api_id for api_id in todo}
+            for fut in as_completed(futures):
+                api_id = futures[fut]
+                try:
+                    details = fut.result()
+                except Exception as e:
+                    stats["failed"] += 1
+                    print(f"[NYRG] Could not fetch details for {api_id}: {e}")
+                    continue
+                stats["fetched"] += 1
+                cache[api_id] = {"marker": markers.get(api_id), "fetched_at": now.isoformat(timespec="seconds"),
+                                 "details": details}
+                if debug:
+                    print(f"[NYRG][DEBUG] details {api_id}: {details}")
+
+    for ev in events:
+        ev.update((cache.get(ev.get("api_id", "")) or {}).get("details") or {})
+
+    # Forget events that are no longer upcoming (the archive has what it needs).
+    live = {ev.get("api_id") for ev in events}
     try:
-        res = requests.get(API_URL, headers={"User-Agent": "Mozilla/5.0"}, timeout=15)
+        save_details_cache(cache_path, {k: v for k, v in cache.items() if k in live})
+    except OSError as e:
+        print(f"[NYRG] WARNING: could not save event details cache: {e}")
+    return stats
+
+
+def fetch_entries(period: str, debug: bool, known_ids: Optional[set] = None) -> List[dict]:
+    """
+    All get-items entries for `period` ("future" or "past"), following next_cursor.
 
+    With known_ids (past events only): stop after the first page that contains an
+    event we already have. Past events come newest first, so everything after that
+    page is already archived.
+
+    Raises RuntimeError if a page fails (the caller keeps its old data).
+    """
+    cache = default_cache()
+    session = shared_session()
+    entries: List[dict] = []
+    cursor = ""
+
+    for page in range(1, MAX_PAGES + 1):
+        params = {"calendar_api_id": CALENDAR_API_ID, "pagination_limit": PAGE_SIZE, "period": period}
+        if cursor:
+            params["pagination_cursor"] = cursor
+        res = cache.get(API_URL, params=params, headers={"User-Agent": "Mozilla/5.0"}, timeout=15, session=session)
         if not res.ok:
-            print(f"[NYRG] API returned {res.status_code}. Not updating luma.json.")
-            return 0
+            raise RuntimeError(f"API returned {res.status_code} for {period} page {page}")
 
         data = res.json()
-        entries = data.get("entries", [])
+        page_entries = data.get("entries", []) or []
+        entries.extend(page_entries)
+
+        if debug:
+            print(
+                f"[NYRG][DEBUG] {period} page {page}: {len(page_entries)} entries "
+                f"(from_cache={res.from_cache} not_modified={res.not_modified})"
+            )
+
+        if known_ids is not None and any(
+            ((e.get("event") or {}).get("api_id") or "") in known_ids for e in page_entries
+        ):
+            break
+        cursor = data.get("next_cursor") or ""
+        if not data.get("has_more") or not cursor:
+            break
+    else:
+        print(f"[NYRG] WARNING: stopped after {MAX_PAGES} {period} pages.")
+
+    return entries
+
+
+def update_past_archive(archive_path: Path, debug: bool) -> Optional[int]:
+    """
+    Add new past events to the archive (keyed by api_id). Returns how many were
+    added, or None if the fetch failed (the archive is left as it is).
+    """
+    archive = feed_diff.load_json(archive_path) or {}
+    by_id: Dict[str, dict] = {e["api_id"]: e for e in archive.get("events") or [] if e.get("api_id")}
+
+    # Incremental unless the archive is empty (or a full refetch is requested).
+    full = env_bool("NYRG_LUMA_ARCHIVE_FULL", False) or not by_id
+    try:
+        entries = fetch_entries("past", debug, known_ids=None if full else set(by_id))
+    except Exception as e:
+        print(f"[NYRG] Could not fetch past events ({e}). Not updating the archive.")
+        return None
+
+    added = 0
+    for entry in entries:
+        record = event_record(entry)
+        if record is None or not record["api_id"]:
+            continue
+        if record["api_id"] not in by_id:
+            added += 1
+        by_id[record["api_id"]] = record
+
+    events = sorted(by_id.values(), key=lambda e: e.get("start_at", ""), reverse=True)
+    safe_write_json(archive_path, {
+        "_comment": "THIS FILE IS AUTO-GENERATED. DO NOT EDIT MANUALLY. Past Luma events, kept by scripts/luma_scrape.py.",
+        "source": f"{LUMA_BASE_URL}/nyrg",
+        "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "count": len(events),
+        "events": events,
+    })
+    return added
+
+
+def main(
+    json_path: Optional[Path] = None,
+    archive_path: Optional[Path] = None,
+    home_path: Optional[Path] = None,
+    search_dir: Optional[Path] = None,
+) -> int:
+    json_path = json_path or Path(env_str("NYRG_LUMA_JSON_PATH", str(REPO_ROOT / "data" / "luma.json")))
+    archive_path = archive_path or Path(env_str("NYRG_LUMA_PAST_JSON_PATH", str(REPO_ROOT / "data" / "luma_past.json")))
+    debug = env_bool("NYRG_LUMA_DEBUG", False)
+    metrics = run_metrics.current()
+
+    if debug:
+        print("[NYRG][DEBUG] api_url:", API_URL)
+        print("[NYRG][DEBUG] json_path:", json_path)
+        print("[NYRG][DEBUG] archive_path:", archive_path)
+
+    try:
+        # Shared on-disk cache: conditional GET, plus a short TTL for api2.luma.com.
+        with metrics.phase("fetch"):
+            try:
+                entries = fetch_entries("future", debug)
+            except RuntimeError as e:
+                print(f"[NYRG] {e}. Not updating luma.json.")
+                metrics.set_outcome("skipped")
+                return 0
 
         if debug:
             print(f"[NYRG][DEBUG] Raw entries: {json.dumps(entries, indent=2)}")
 
-        events = []
-        for entry in entries:
-            event = entry.get("event", {})
-            name = event.get("name", "").strip()
-            url_slug = event.get("url", "").strip()
-            api_id = event.get("api_id", "").strip()
-            start_at = event.get("start_at", "")
-            cover_url = event.get("cover_url", "")
-            geo = event.get("geo_address_info", {}) or {}
-
-            if url_slug:
-                url = f"{LUMA_BASE_URL}/{url_slug}"
-            elif api_id:
-                url = f"{LUMA_BASE_URL}/event/{api_id}"
-            else:
-                continue
-
-            events.append({
-                "title": name,
-                "url": url,
-                "start_at": start_at,
-                "cover_url": cover_url,
-                "geo_address_info": {
-                    "address": geo.get("address", ""),
-                    "short_address": geo.get("short_address", ""),
-                    "full_address": geo.get("full_address", ""),
-                    "city": geo.get("city", ""),
-                },
-            })
+        events = [r for r in map(event_record, entries) if r is not None]
 
         print(f"[NYRG] Found {len(events)} upcoming event(s).")
 
+        if env_bool("NYRG_LUMA_DETAILS", True) and events:
+            with metrics.phase("details"):
+                stats = enrich_events(events, entries, env_int("NYRG_LUMA_DETAIL_WORKERS", DEFAULT_DETAIL_WORKERS), debug)
+            for kind, n in stats.items():
+                metrics.set_items(f"details_{kind}", n)
+            print(
+                f"[NYRG] Event details: {stats['fetched']} fetched, {stats['cached']} from cache, "
+                f"{stats['failed']} failed"
+            )
+
         if len(events) == 0:
             print("[NYRG] No upcoming events. Writing empty luma.json.")
 
@@ -117,8 +408,24 @@ def main() -> int:
             "events": events,
         }
 
-        safe_write_json(json_path, payload)
-        print(f"[NYRG] Wrote {len(events)} event(s) to {json_path}")
+        with metrics.phase("write"):
+            written = safe_write_json(json_path, payload)
+        with metrics.phase("search_index"):
+            search_index.update_source("event", [search_index.event_doc(ev) for ev in events], search_dir)
+        with metrics.phase("home_bundle"):
+            home_bundle.update_section("events", home_bundle.events_section(events), home_path)
+        metrics.set_items("events", len(events))
+        metrics.set_items("files_unchanged", 0 if written else 1)
+        if written:
+            print(f"[NYRG] Wrote {len(events)} event(s) to {json_path}")
+
+        # The past-events archive is a bonus: a failure here never fails the run.
+        if env_bool("NYRG_LUMA_ARCHIVE", True):
+            with metrics.phase("archive"):
+                added = update_past_archive(archive_path, debug)
+            if added is not None:
+                metrics.set_items("past_events_added", added)
+                print(f"[NYRG] Past events archive: {added} new -> {archive_path}")
         return 0
 
     except Exception as e:
@@ -128,4 +435,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(run_metrics.run_main("luma", main))
\ No newline at end of file
@@ -47,6 +47,7 @@ fi
 
 # Show if the JSON changed
 git add "$JSON_PATH"
+if [[ -d assets/instagram ]]; then git add -A assets/instagram; fi
 
 if git diff --cached --quiet; then
   echo "[NYRG] No changes detected in $JSON_PATH."
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Process-wide rate limiting and retries for Google (Drive API + Sheets CSV) requests.
+
+Why:
+- Google answers bursts with 429 or 403 "rateLimitExceeded". Before this module, the
+  first such answer aborted the whole gallery run.
+- With parallel listing (update_gallery_json.py --workers) bursts are much more likely.
+
+What it does:
+- A token bucket shared by every thread: at most N requests per second to Google.
+- Retries throttled / transient responses (429, 403 rate limit, 5xx) and network errors
+  (timeouts, dropped connections) with exponential backoff and full jitter, honouring
+  Retry-After (up to RETRY_AFTER_CAP_SECONDS) when Google sends it.
+- Adaptive rate (AIMD): every throttle halves the rate, every success adds a little
+  back, up to the configured maximum.
+
+Used through scripts/http_cache.py, so every cached or uncached GET gets it.
+
+Optional environment variables:
+- NYRG_GOOGLE_RATE         (default: 10 requests/second)
+- NYRG_HTTP_MAX_RETRIES    (default: 5)
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    import requests  # optional: http_cache.py also sends through urllib
+except ImportError:
+    requests = None
+
+DEFAULT_GOOGLE_RATE = 10.0
+DEFAULT_MAX_RETRIES = 5
+
+# Backoff: base * 2^attempt, capped, then "full jitter" (uniform 0..delay).
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_CAP_SECONDS = 60.0
+
+# A Retry-After longer than this is not honoured as-is (a misbehaving server could stall the run).
+RETRY_AFTER_CAP_SECONDS = 120.0
+
+# Hosts that share the "google" limiter (Drive API, Drive thumbnails, published Sheets).
+GOOGLE_HOSTS = ("googleapis.com", "docs.google.com", "drive.google.com")
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = (b"rateLimitExceeded", b"userRateLimitExceeded")
+
+# Exceptions from send() that are retried like a 5xx: timeouts and connection failures,
+# from urllib (URLError, socket timeouts) and from requests when it is installed.
+TRANSIENT_ERRORS: Tuple[type, ...] = (ConnectionError, TimeoutError, urllib.error.URLError)
+if requests is not None:
+    TRANSIENT_ERRORS += (requests.Timeout, requests.ConnectionError)
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket with an adaptive (AIMD) rate.
+
+    acquire() blocks until a request may be sent.
+    on_throttled() / on_success() adjust the rate.
+    pause(seconds) makes every thread wait (used for Retry-After).
+    """
+
+    def __init__(self, rate: float, min_rate: float = 0.5, increase: float = 0.1):
+        self.max_rate = max(min_rate, rate)
+        self.min_rate = min_rate
+        self.increase = increase
+        self.rate = self.max_rate
+        self._tokens = 1.0
+        self._last = time.monotonic()
+        self._not_before = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def burst(self) -> float:
+        return max(1.0, self.rate)
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if now >= self._not_before and self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = max(self._not_before - now, (1.0 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def on_throttled(self) -> None:
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2.0)
+            self._tokens = min(self._tokens, 0.0)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._not_before = max(self._not_before, time.monotonic() + seconds)
+
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, "") or default)
+    except ValueError:
+        return default
+
+
+_LIMITERS: Dict[str, RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def limiter_for_url(url: str) -> Optional[RateLimiter]:
+    """The shared limiter for this URL's service, or None if it is not rate limited."""
+    if not any(host in url for host in GOOGLE_HOSTS):
+        return None
+    with _LIMITERS_LOCK:
+        if "google" not in _LIMITERS:
+            _LIMITERS["google"] = RateLimiter(env_float("NYRG_GOOGLE_RATE", DEFAULT_GOOGLE_RATE))
+        return _LIMITERS["google"]
+
+
+def is_throttled(status: int, body: bytes) -> bool:
+    """429, or Google's 403 flavour of "slow down"."""
+    if status == 429:
+        return True
+    return status == 403 and any(reason in (body or b"") for reason in RATE_LIMIT_REASONS)
+
+
+def retry_after_seconds(headers: Dict[str, str]) -> Optional[float]:
+    """Parse Retry-After (seconds or an HTTP date). Headers are expected lower-cased."""
+    raw = (headers.get("retry-after") or "").strip()
+    if not raw:
+        return None
+    if raw.isdigit():
+        return min(RETRY_AFTER_CAP_SECONDS, float(raw))
+    try:
+        return min(RETRY_AFTER_CAP_SECONDS, max(0.0, parsedate_to_datetime(raw).timestamp() - time.time()))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+
+def send_with_retries(
+    url: str,
+    send: Callable[[], Tuple[int, Dict[str, str], bytes]],
+    max_retries: Optional[int] = None,
+) -> Tuple[int, Dict[str, str], bytes]:
+    """
+    Call send() (returns status, lower-cased headers, body) under the URL's limiter,
+    retrying throttled and transient failures. The last response is returned as-is
+    when retries run out, so the caller's normal error handling still applies; a
+    network error (TRANSIENT_ERRORS) is re-raised once retries run out.
+    """
+    limiter = limiter_for_url(url)
+    if max_retries is None:
+        max_retries = int(env_float("NYRG_HTTP_MAX_RETRIES", DEFAULT_MAX_RETRIES))
+
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire()
+
+        try:
+            status, headers, body = send()
+        except TRANSIENT_ERRORS as e:
+            if attempt >= max_retries:
+                raise
+            delay = backoff_delay(attempt)
+            print(
+                f"[NYRG] {type(e).__name__}: {e}, retry {attempt + 1}/{max_retries} in {delay:.1f}s",
+                file=sys.stderr,
+            )
+            time.sleep(delay)
+            attempt += 1
+            continue
+        throttled = is_throttled(status, body)
+
+        if not throttled and status not in RETRYABLE_STATUSES:
+            if limiter is not None:
+                limiter.on_success()
+            return status, headers, body
+
+        if limiter is not None and throttled:
+            limiter.on_throttled()
+
+        if attempt >= max_retries:
+            return status, headers, body
+
+        delay = retry_after_seconds(headers)
+        if delay is None:
+            delay = backoff_delay(attempt)
+        elif limiter is not None:
+            # Retry-After applies to everyone, not just this thread.
+            limiter.pause(delay)
+
+        print(
+            f"[NYRG] HTTP {status} ({'throttled' if throttled else 'transient'}), "
+            f"retry {attempt + 1}/{max_retries} in {delay:.1f}s",
+            file=sys.stderr,
+        )
+        time.sleep(delay)
+        attempt += 1
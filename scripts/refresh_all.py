@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Refresh every data/*.json feed from ONE process, concurrently.
+
+Feeds:
+- gallery    -> data/gallery.json (+ the Gallery page cards _includes/gallery_cards.html,
+                and the sharded layout if NYRG_GALLERY_SHARDS_DIR is set)
+- jobs       -> data/jobs.json (+ the change feed data/jobs_changes.json)
+- luma       -> data/luma.json (+ the past-events archive data/luma_past.json)
+- instagram  -> data/instagram.json
+
+The homepage bundle data/home.json takes one section from each of gallery, luma and
+instagram: every feed writes a private copy, and only the sections of feeds that
+succeeded are merged into the staged bundle (scripts/home_bundle.py). The site search
+index data/search/ is handled the same way, with one source per feed (gallery, jobs,
+luma; scripts/search_index.py).
+
+Why one process:
+- Interpreter start-up and imports (requests, selenium if needed) are paid once.
+- All feeds share one keep-alive HTTP session, one HTTP cache and one Google rate limiter.
+- Feeds run at the same time, so a refresh takes as long as the slowest feed,
+  not the sum of all four.
+
+How it works:
+1) Every feed runs in its own worker thread and writes into a staging directory
+   (next to its real output, so the final rename stays on one filesystem).
+2) Each feed has its own timeout and its own error handling: a crash, a timeout or
+   "nothing written" (blocked, API error, only updated_at changed) only drops that
+   feed's output. Staged files start as copies of the published ones, so the
+   scripts' change check (scripts/feed_diff.py) works the same as in a normal run.
+3) When all feeds are done, the staged outputs are moved into place in one
+   commit step (os.replace per file). Failed feeds leave the old files untouched.
+
+Usage (from repo root):
+  python3 scripts/refresh_all.py
+  python3 scripts/refresh_all.py --feeds gallery,jobs --timeout gallery=600
+
+Feeds whose required settings are missing are skipped:
+- gallery:   GOOGLE_API_KEY and NYRG_GDRIVE_FOLDER_ID
+- jobs:      NYRG_JOBS_CSV_URL
+(instagram tries plain HTTP first; without selenium it just cannot fall back to a browser)
+
+Optional environment variables:
+- NYRG_REFRESH_FEEDS      (default: gallery,jobs,luma,instagram)
+- NYRG_REFRESH_TIMEOUTS   (e.g. "gallery=600,instagram=180", seconds)
+- NYRG_REFRESH_STATUS_JSON (optional: write every feed's status there, see --status-json)
+- Every variable the individual scripts read (NYRG_GALLERY_*, NYRG_IG_*, ...),
+  and NYRG_METRICS_* (each feed exports its own metrics, plus "refresh_all").
+
+Exit code: 0 if every feed succeeded or was skipped, 1 otherwise.
+
+Notes:
+- Python threads cannot be killed: a feed that times out is abandoned (its output
+  is discarded) and the process exits without waiting for it.
+- Git is NOT touched here. scripts/_update_all_jsons.sh handles the git commit
+  (set NYRG_REFRESH_IN_PROCESS=1 there to use this script).
+"""
+
+from __future__ import annotations
+
+import argparse
+import filecmp
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import gallery_cards
+import home_bundle
+import run_metrics
+import search_index
+from http_cache import default_cache, shared_session
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+ALL_FEEDS = ["gallery", "jobs", "luma", "instagram"]
+
+# Seconds per feed before its output is given up on.
+DEFAULT_TIMEOUTS = {"gallery": 900, "jobs": 120, "luma": 60, "instagram": 300}
+
+# Connection pool size of the shared session (gallery workers + the other feeds).
+SESSION_POOL_EXTRA = 4
+
+# (staged path, final path) pairs a feed produced.
+Outputs = List[Tuple[Path, Path]]
+
+# Section of data/home.json each feed provides.
+HOME_SECTIONS = {"gallery": "rotator", "luma": "events", "instagram": "instagram"}
+
+# Search index source (data/search/sources/<kind>.json) each feed provides.
+SEARCH_KINDS = {"gallery": "gallery", "jobs": "job", "luma": "event"}
+
+# Statuses whose side outputs (homepage bundle section, search source) may be published.
+ACCEPTED = ("ok", "unchanged")
+
+
+def env_str(name: str, default: str) -> str:
+    v = os.environ.get(name)
+    return default if v is None or v.strip() == "" else v.strip()
+
+
+def parse_timeouts(raw: str) -> Dict[str, float]:
+    """Parse "feed=seconds,..." (bad parts are skipped)."""
+    out: Dict[str, float] = {}
+    for part in (raw or "").split(","):
+        feed, _, seconds = part.partition("=")
+        try:
+            out[feed.strip()] = float(seconds)
+        except ValueError:
+            continue
+    return out
+
+
+class Staging:
+    """Per-run staging directories, one per output directory (same filesystem as the target)."""
+
+    def __init__(self) -> None:
+        self.dirs: Dict[Path, Path] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, final: Path) -> Path:
+        parent = final.resolve().parent
+        with self._lock:
+            if parent not in self.dirs:
+                parent.mkdir(parents=True, exist_ok=True)
+                self.dirs[parent] = Path(tempfile.mkdtemp(prefix=".refresh-", dir=parent))
+            return self.dirs[parent] / final.name
+
+    def seeded_path_for(self, final: Path) -> Path:
+        """
+        Like path_for(), but starts from a copy of the current file, so the writers'
+        change check (scripts/feed_diff.py) compares against the published version.
+        """
+        staged = self.path_for(final)
+        if final.is_file():
+            shutil.copy2(final, staged)
+        return staged
+
+    def private_path(self, feed: str, name: str) -> Path:
+        """A file only `feed` writes (empty at start); refresh_all decides later what to keep from it."""
+        return self.path_for(REPO_ROOT / "data" / f"{feed}.{name}")
+
+    def cleanup(self) -> None:
+        for d in self.dirs.values():
+            shutil.rmtree(d, ignore_errors=True)
+
+
+# -------------------------------------------------------------
+# Feeds: each stages its outputs and returns (staged, final) pairs,
+# or None when it is not configured here.
+# -------------------------------------------------------------
+
+def feed_gallery(staging: Staging) -> Optional[Outputs]:
+    folder_id = env_str("NYRG_GDRIVE_FOLDER_ID", "")
+    if not folder_id or not env_str("GOOGLE_API_KEY", ""):
+        return None
+    import update_gallery_json
+
+    final = REPO_ROOT / "data" / "gallery.json"
+    staged = staging.seeded_path_for(final)
+    argv = ["--folder-id", folder_id, "--out", str(staged)]
+    outputs: Outputs = [(staged, final)]
+
+    shards_dir = env_str("NYRG_GALLERY_SHARDS_DIR", "")
+    if shards_dir:
+        final_shards = Path(shards_dir) if os.path.isabs(shards_dir) else REPO_ROOT / shards_dir
+        staged_shards = staging.path_for(final_shards)
+        if final_shards.is_dir():
+            # Start from the current shards so unchanged ones are not rewritten.
+            shutil.copytree(final_shards, staged_shards)
+        argv += ["--shards-dir", str(staged_shards)]
+        outputs.append((staged_shards, final_shards))
+
+    if gallery_cards.enabled():
+        # Published only together with gallery.json (the empty-gallery guard below drops both).
+        final_cards = gallery_cards.default_path()
+        staged_cards = staging.seeded_path_for(final_cards)
+        argv += ["--cards-out", str(staged_cards)]
+        outputs.append((staged_cards, final_cards))
+
+    if home_bundle.enabled():
+        argv += ["--home-out", str(staging.private_path("gallery", "home.json"))]
+    if search_index.enabled():
+        argv += ["--search-dir", str(staging.private_path("gallery", "search"))]
+
+    code = run_metrics.run_main("gallery", lambda: update_gallery_json.main(argv), thread_only=True)
+    if code:
+        raise RuntimeError(f"update_gallery_json.py exited with {code}")
+
+    # Same guard as update_gallery_daily.sh: an empty gallery usually means a network or permission issue.
+    with open(staged, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not data.get("count") and not data.get("events"):
+        raise RuntimeError("gallery.json has 0 images and 0 events; not publishing it")
+    return outputs
+
+
+def feed_jobs(staging: Staging) -> Optional[Outputs]:
+    if not env_str("NYRG_JOBS_CSV_URL", ""):
+        return None
+    import update_jobs_json
+
+    final = Path(update_jobs_json.OUTPUT_PATH)
+    final = final if final.is_absolute() else REPO_ROOT / final
+    final_changes = Path(update_jobs_json.CHANGES_PATH or final.parent / "jobs_changes.json")
+    final_changes = final_changes if final_changes.is_absolute() else REPO_ROOT / final_changes
+    staged = staging.seeded_path_for(final)
+    # The change feed is appended to, so it must start from the published copy.
+    staged_changes = staging.seeded_path_for(final_changes)
+    search = staging.private_path("jobs", "search")
+    run_metrics.run_main(
+        "jobs", lambda: update_jobs_json.main(str(staged), str(staged_changes), search), thread_only=True
+    )
+    return [(staged, final), (staged_changes, final_changes)]
+
+
+def feed_luma(staging: Staging) -> Optional[Outputs]:
+    import luma_scrape
+
+    final = Path(env_str("NYRG_LUMA_JSON_PATH", str(REPO_ROOT / "data" / "luma.json")))
+    final_past = Path(env_str("NYRG_LUMA_PAST_JSON_PATH", str(REPO_ROOT / "data" / "luma_past.json")))
+    staged = staging.seeded_path_for(final)
+    # The archive is updated incrementally, so it must start from the published copy.
+    staged_past = staging.seeded_path_for(final_past)
+    home = staging.private_path("luma", "home.json")
+    search = staging.private_path("luma", "search")
+    code = run_metrics.run_main(
+        "luma", lambda: luma_scrape.main(staged, staged_past, home, search), thread_only=True
+    )
+    if code:
+        raise RuntimeError(f"luma_scrape.py exited with {code}")
+    return [(staged, final), (staged_past, final_past)]
+
+
+def feed_instagram(staging: Staging) -> Optional[Outputs]:
+    import selenium_instagram_scrape
+
+    final = Path(env_str("NYRG_IG_JSON_PATH", str(REPO_ROOT / "data" / "instagram.json")))
+    staged = staging.seeded_path_for(final)
+    home = staging.private_path("instagram", "home.json")
+    code = run_metrics.run_main("instagram", lambda: selenium_instagram_scrape.main(staged, home), thread_only=True)
+    if code:
+        raise RuntimeError(f"selenium_instagram_scrape.py exited with {code}")
+    return [(staged, final)]
+
+
+FEEDS: Dict[str, Callable[[Staging], Optional[Outputs]]] = {
+    "gallery": feed_gallery,
+    "jobs": feed_jobs,
+    "luma": feed_luma,
+    "instagram": feed_instagram,
+}
+
+
+def run_feed(name: str, staging: Staging) -> Tuple[str, Outputs, float]:
+    """Worker thread body: (status, outputs, seconds). Never raises."""
+    t0 = time.perf_counter()
+    try:
+        outputs = FEEDS[name](staging)
+        # The feed's own run (still bound to this thread) says whether it gave up on
+        # its source (Instagram login wall, Luma API error) rather than finding no changes.
+        gave_up = run_metrics.current().outcome == "skipped"
+    except Exception as e:
+        print(f"[NYRG] {name}: FAILED: {e}", file=sys.stderr)
+        return "failed", [], time.perf_counter() - t0
+    finally:
+        run_metrics.bind(None)
+
+    if outputs is None:
+        return "skipped", [], time.perf_counter() - t0
+    # Scripts that decide not to write (blocked, API error, nothing changed) leave the
+    # staged file missing or identical to the published one.
+    produced = [
+        (staged, final) for staged, final in outputs
+        if staged.exists() and (staged.is_dir() or not final.exists() or not filecmp.cmp(staged, final, shallow=False))
+    ]
+    if produced:
+        return "ok", produced, time.perf_counter() - t0
+    return ("blocked" if gave_up else "unchanged"), [], time.perf_counter() - t0
+
+
+def stage_home_bundle(staging: Staging, statuses: Dict[str, str]) -> Outputs:
+    """Merge the homepage bundle sections of the accepted feeds into a staged data/home.json."""
+    if not home_bundle.enabled():
+        return []
+    sources = {
+        HOME_SECTIONS[name]: staging.private_path(name, "home.json")
+        for name, status in statuses.items()
+        if status in ACCEPTED and name in HOME_SECTIONS
+    }
+    final = home_bundle.default_path()
+    staged = staging.seeded_path_for(final)
+    if home_bundle.merge_sections(sources, staged):
+        return [(staged, final)]
+    return []
+
+
+def stage_search_index(staging: Staging, statuses: Dict[str, str]) -> Outputs:
+    """Merge the search sources of the accepted feeds into a staged copy of data/search."""
+    if not search_index.enabled():
+        return []
+    sources = {
+        SEARCH_KINDS[name]: staging.private_path(name, "search") / "sources" / f"{SEARCH_KINDS[name]}.json"
+        for name, status in statuses.items()
+        if status in ACCEPTED and name in SEARCH_KINDS
+    }
+    final = search_index.default_dir()
+    staged = staging.path_for(final)
+    if final.is_dir():
+        # Start from the published index so the other feeds' sources are kept.
+        shutil.copytree(final, staged)
+    if search_index.merge_sources(sources, staged):
+        return [(staged, final)]
+    return []
+
+
+def publish(outputs: Outputs) -> int:
+    """Commit step: move every staged output into place. Returns how many were published."""
+    published = 0
+    for staged, final in outputs:
+        if staged.is_dir():
+            # Directories cannot be replaced atomically: swap them with a quick double rename.
+            old = final.with_name(final.name + ".old")
+            shutil.rmtree(old, ignore_errors=True)
+            if final.exists():
+                os.replace(final, old)
+            os.replace(staged, final)
+            shutil.rmtree(old, ignore_errors=True)
+        else:
+            os.replace(staged, final)
+        published += 1
+    return published
+
+
+def write_status(path: str, statuses: Dict[str, str], seconds: Dict[str, float]) -> None:
+    """{"finished_at": unix time, "feeds": {name: {"status": ..., "seconds": ...}}}, written atomically."""
+    payload = {
+        "finished_at": round(time.time(), 3),
+        "feeds": {
+            name: {"status": status, "seconds": round(seconds.get(name, 0.0), 3)}
+            for name, status in statuses.items()
+        },
+    }
+    try:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+            f.write("\n")
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[NYRG] WARNING: could not write {path}: {e}", file=sys.stderr)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Refresh all data/*.json feeds concurrently in one process.")
+    ap.add_argument(
+        "--feeds",
+        default=env_str("NYRG_REFRESH_FEEDS", ",".join(ALL_FEEDS)),
+        help="Comma-separated feeds to refresh (default: all). If not set, uses NYRG_REFRESH_FEEDS env var.",
+    )
+    ap.add_argument(
+        "--timeout",
+        action="append",
+        default=[],
+        help="Per-feed timeout, e.g. --timeout gallery=600 (repeatable). Also NYRG_REFRESH_TIMEOUTS.",
+    )
+    ap.add_argument(
+        "--status-json",
+        default=env_str("NYRG_REFRESH_STATUS_JSON", ""),
+        help="Also write each feed's status to this JSON file (used by scripts/refresh_daemon.py).",
+    )
+    args = ap.parse_args()
+
+    feeds = [f.strip() for f in args.feeds.split(",") if f.strip()]
+    unknown = [f for f in feeds if f not in FEEDS]
+    if unknown:
+        print(f"ERROR: unknown feed(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    timeouts = dict(DEFAULT_TIMEOUTS)
+    timeouts.update(parse_timeouts(os.environ.get("NYRG_REFRESH_TIMEOUTS", "")))
+    timeouts.update(parse_timeouts(",".join(args.timeout)))
+
+    # The first caller sizes the shared connection pool.
+    workers = int(os.environ.get("NYRG_GALLERY_WORKERS", "") or 1)
+    shared_session(pool_size=workers + SESSION_POOL_EXTRA)
+
+    metrics = run_metrics.current()
+    staging = Staging()
+    statuses: Dict[str, str] = {}
+    seconds_by_feed: Dict[str, float] = {}
+    to_publish: Outputs = []
+    abandoned = False
+
+    pool = ThreadPoolExecutor(max_workers=len(feeds), thread_name_prefix="feed")
+    try:
+        started = time.monotonic()
+        futures = {name: pool.submit(run_feed, name, staging) for name in feeds}
+
+        # Wait for every feed, each up to its own deadline (measured from the common start).
+        for name in sorted(feeds, key=lambda f: timeouts.get(f, 0)):
+            remaining = started + timeouts.get(name, 0) - time.monotonic()
+            done, _ = wait([futures[name]], timeout=max(0.0, remaining))
+            if not done:
+                statuses[name] = "timeout"
+                abandoned = True
+                print(f"[NYRG] {name}: TIMEOUT after {timeouts.get(name, 0):.0f}s; keeping the old output.",
+                      file=sys.stderr)
+                continue
+            status, outputs, seconds = futures[name].result()
+            statuses[name] = status
+            seconds_by_feed[name] = seconds
+            metrics.add_phase(f"feed_{name}", seconds)
+            print(f"[NYRG] {name}: {status} in {seconds:.1f}s")
+            to_publish.extend(outputs)
+
+        to_publish.extend(stage_home_bundle(staging, statuses))
+        to_publish.extend(stage_search_index(staging, statuses))
+
+        with metrics.phase("publish"):
+            published = publish(to_publish)
+        print(f"[NYRG] Published {published} output(s): " +
+              ", ".join(str(final.relative_to(REPO_ROOT)) if final.is_relative_to(REPO_ROOT) else str(final)
+                        for _, final in to_publish))
+    finally:
+        staging.cleanup()
+        pool.shutdown(wait=not abandoned, cancel_futures=True)
+
+    if args.status_json:
+        write_status(args.status_json, statuses, seconds_by_feed)
+
+    failed = [name for name, status in statuses.items() if status in ("failed", "timeout")]
+    metrics.set_items("feeds_failed", len(failed))
+    metrics.set_items("outputs_published", published)
+    code = 1 if failed else 0
+
+    if abandoned:
+        # A stuck feed thread would keep the interpreter alive: finish up and leave now.
+        metrics.finish("failure")
+        default_cache().flush()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+    return code
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_metrics.run_main("refresh_all", main))
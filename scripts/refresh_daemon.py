@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Long-running refresh scheduler: refresh each feed when it can actually have changed,
+instead of on fixed systemd timers.
+
+For every feed it computes the next useful refresh time:
+- jobs:      the moment the nearest deadline_iso in data/jobs.json passes (jobs are
+             hidden the day after their deadline, UTC), else a regular sheet poll
+             (an unchanged sheet costs one 304, see scripts/update_jobs_json.py).
+- luma:      shortly after the next upcoming event in data/luma.json ends (end_at,
+             else start_at + 3h), hourly while an event starts within 48h (ticket
+             status moves fast), else every few hours.
+- gallery:   a cheap Drive probe runs every 15 minutes: one files.list of the event
+             folders, then the child set (id + modifiedTime of every file) of each
+             event folder, 40 folders per request (update_gallery_json.list_child_signatures).
+             The gallery is refreshed only when that signature changed, plus a daily
+             safety refresh (nested folders, the external events CSV).
+- instagram: every 6 hours; when it looks blocked (login wall, too few posts) the
+             interval doubles per blocked run, up to 48 hours.
+Any feed that fails is retried with its own back-off (10 min, 20 min, ... up to its interval).
+
+Due feeds are refreshed together through scripts/refresh_all.py, by default via
+scripts/_update_all_jsons.sh so the usual stash / commit / push rules apply.
+Between refreshes the daemon sleeps (at most 15 minutes at a time). Idle feeds cost
+nothing but the gallery probe.
+
+Usage (from repo root):
+  python3 scripts/refresh_daemon.py            # run until stopped (SIGTERM / Ctrl-C)
+  python3 scripts/refresh_daemon.py --once     # refresh whatever is due now, then exit
+  python3 scripts/refresh_daemon.py --plan     # print the schedule from the saved state
+                                               # (no Drive probe, no refresh, state untouched)
+
+Optional environment variables:
+- NYRG_DAEMON_FEEDS      (default: gallery,jobs,luma,instagram; feeds without their
+                          settings are skipped by refresh_all.py as usual)
+- NYRG_DAEMON_INTERVALS  (regular intervals in seconds, e.g. "jobs=1800,instagram=43200")
+- NYRG_DAEMON_GALLERY_PROBE (seconds between Drive probes, default 900)
+- NYRG_DAEMON_GIT        ("1" default: refresh through _update_all_jsons.sh and commit;
+                          "0": only run refresh_all.py, git is not touched)
+- NYRG_DAEMON_STATE      (default: ~/.cache/nyrg/refresh_daemon.json)
+- Everything scripts/refresh_all.py and the feed scripts read.
+
+Notes:
+- Replace the per-feed timers with one service running this script (see
+  docs/automation/automation-systemd.md). Do not run both.
+- The Drive changes API (change tokens) needs OAuth; the gallery only has an API key,
+  so the probe compares the event folders' child sets instead. A folder's own
+  modifiedTime is not enough: Drive does not reliably bump it when photos are added.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import refresh_all
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Regular refresh interval per feed (seconds), when nothing more specific applies.
+DEFAULT_INTERVALS = {"gallery": 86400, "jobs": 3600, "luma": 6 * 3600, "instagram": 6 * 3600}
+
+DEFAULT_GALLERY_PROBE = 900
+DEFAULT_STATE_PATH = os.path.join("~", ".cache", "nyrg", "refresh_daemon.json")
+
+# Luma: refresh this long after an event ends; assume this length without end_at.
+LUMA_END_GRACE = 300
+LUMA_DEFAULT_EVENT_HOURS = 3
+# Luma: poll this often while an event starts within LUMA_SOON_HOURS.
+LUMA_SOON_HOURS = 48
+LUMA_SOON_INTERVAL = 3600
+
+# Jobs: refresh this long after a deadline day ends (UTC midnight).
+JOBS_EXPIRY_GRACE = 60
+
+# Instagram: longest back-off while it looks blocked.
+INSTAGRAM_MAX_BACKOFF = 48 * 3600
+
+# Retry after a failed refresh: RETRY_BASE doubled per consecutive failure, up to the interval.
+RETRY_BASE = 600
+
+# Sleep bounds between scheduling rounds (seconds).
+MIN_SLEEP = 30
+MAX_SLEEP = 900
+
+# refresh_all statuses that count as "the source did not answer".
+FAILED_STATUSES = ("failed", "timeout", "blocked")
+
+# (when as unix time, reason)
+Plan = Tuple[float, str]
+
+
+def env_str(name: str, default: str) -> str:
+    v = os.environ.get(name)
+    return default if v is None or v.strip() == "" else v.strip()
+
+
+def fmt_time(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def fmt_delay(seconds: float) -> str:
+    seconds = max(0, int(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m"
+    return f"{seconds // 3600}h{(seconds % 3600) // 60:02d}m"
+
+
+def parse_iso(value: str) -> Optional[datetime]:
+    try:
+        dt = datetime.fromisoformat((value or "").replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def data_path(env_name: str, default_name: str) -> Path:
+    p = Path(env_str(env_name, str(REPO_ROOT / "data" / default_name)))
+    return p if p.is_absolute() else REPO_ROOT / p
+
+
+def load_json(path) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else None
+    except (OSError, ValueError):
+        return None
+
+
+# -------------------------------------------------------------
+# State (survives restarts)
+# -------------------------------------------------------------
+
+def load_state(path: str) -> dict:
+    state = load_json(path) or {}
+    state.setdefault("feeds", {})
+    state.setdefault("gallery", {})
+    return state
+
+
+def save_state(path: str, state: dict) -> None:
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+            f.write("\n")
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[NYRG] WARNING: could not save daemon state: {e}", file=sys.stderr)
+
+
+def record_result(state: dict, feed: str, status: str, now: float) -> None:
+    entry = state["feeds"].setdefault(feed, {})
+    entry["last_run"] = now
+    entry["last_status"] = status
+    entry["failures"] = entry.get("failures", 0) + 1 if status in FAILED_STATUSES else 0
+
+
+# -------------------------------------------------------------
+# Next useful refresh per feed
+# -------------------------------------------------------------
+
+def next_jobs(last_run: float, interval: int, now: float) -> Plan:
+    plan: Plan = (last_run + interval, "sheet poll")
+    data = load_json(data_path("NYRG_JOBS_JSON_PATH", "jobs.json")) or {}
+    today = datetime.fromtimestamp(now, timezone.utc).date()
+    deadlines = []
+    for job in data.get("jobs") or []:
+        try:
+            deadline = date.fromisoformat(job.get("deadline_iso") or "")
+        except ValueError:
+            continue
+        if deadline >= today:
+            deadlines.append(deadline)
+    if deadlines:
+        nearest = min(deadlines)
+        # Visible through its deadline day: hidden from the next UTC midnight on.
+        expires = datetime.combine(nearest + timedelta(days=1), datetime.min.time(), timezone.utc).timestamp()
+        # Already refreshed after that moment (the job may have stayed: different sheet data).
+        if last_run < expires and expires + JOBS_EXPIRY_GRACE < plan[0]:
+            plan = (expires + JOBS_EXPIRY_GRACE, f"deadline {nearest.isoformat()} passes")
+    return plan
+
+
+def next_luma(last_run: float, interval: int, now: float) -> Plan:
+    plan: Plan = (last_run + interval, "regular refresh")
+    data = load_json(data_path("NYRG_LUMA_JSON_PATH", "luma.json")) or {}
+    for ev in data.get("events") or []:
+        start = parse_iso(ev.get("start_at", ""))
+        if start is None:
+            continue
+        end = parse_iso(ev.get("end_at", "")) or start + timedelta(hours=LUMA_DEFAULT_EVENT_HOURS)
+        ends = end.timestamp() + LUMA_END_GRACE
+        if last_run < ends < plan[0]:
+            plan = (ends, f"{ev.get('title') or ev.get('api_id') or 'event'} ends")
+        if 0 <= start.timestamp() - now <= LUMA_SOON_HOURS * 3600 and last_run + LUMA_SOON_INTERVAL < plan[0]:
+            plan = (last_run + LUMA_SOON_INTERVAL, "event starts within 48h")
+    return plan
+
+
+def next_gallery(last_run: float, interval: int, gallery_state: dict) -> Plan:
+    probed, seen = gallery_state.get("probed"), gallery_state.get("seen")
+    if probed and probed != seen:
+        return (0.0, "Drive folders changed")
+    return (last_run + interval, "daily safety refresh")
+
+
+def next_instagram(last_run: float, interval: int, failures: int) -> Plan:
+    if failures:
+        delay = min(INSTAGRAM_MAX_BACKOFF, interval * 2 ** failures)
+        return (last_run + delay, f"looked blocked {failures}x, backing off")
+    return (last_run + interval, "regular refresh")
+
+
+def plan_feed(feed: str, state: dict, intervals: Dict[str, int], now: float) -> Plan:
+    entry = state["feeds"].get(feed, {})
+    last_run = entry.get("last_run", 0.0)
+    failures = entry.get("failures", 0)
+    interval = intervals[feed]
+
+    if not last_run:
+        return (now, "first run")
+    if feed == "jobs":
+        plan = next_jobs(last_run, interval, now)
+    elif feed == "luma":
+        plan = next_luma(last_run, interval, now)
+    elif feed == "gallery":
+        plan = next_gallery(last_run, interval, state["gallery"])
+    else:
+        return next_instagram(last_run, interval, failures)
+
+    if failures:
+        # Sooner than the regular refresh, but not before the back-off (even if data changed).
+        return (last_run + min(interval, RETRY_BASE * 2 ** (failures - 1)), f"retry after {failures} failure(s)")
+    return plan
+
+
+# -------------------------------------------------------------
+# Gallery probe (one Drive request)
+# -------------------------------------------------------------
+
+def probe_gallery() -> Optional[str]:
+    """
+    Signature of the event folders and of each one's child set, or None if unavailable.
+    Costs one listing of the root plus one batched listing per 40 event folders.
+    """
+    api_key = env_str("GOOGLE_API_KEY", "")
+    folder_id = env_str("NYRG_GDRIVE_FOLDER_ID", "")
+    if not api_key or not folder_id:
+        return None
+    import update_gallery_json
+
+    # The folder's own modifiedTime still catches renames and description edits.
+    folders: Dict[str, str] = {}
+    token = None
+    try:
+        while True:
+            files, token = update_gallery_json.drive_files_list(
+                api_key,
+                q=f"'{folder_id}' in parents and mimeType='{update_gallery_json.FOLDER_MIME}' and trashed=false",
+                fields="nextPageToken, files(id, modifiedTime)",
+                page_token=token,
+            )
+            folders.update((f["id"], f.get("modifiedTime", "")) for f in files if f.get("id"))
+            if not token:
+                break
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            children = update_gallery_json.list_child_signatures(api_key, list(folders), pool)
+    except Exception as e:
+        print(f"[NYRG] Gallery probe failed: {e}", file=sys.stderr)
+        return None
+    parts = sorted(f"{fid}:{mt}:{children.get(fid, '')}" for fid, mt in folders.items())
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+# -------------------------------------------------------------
+# Running a refresh
+# -------------------------------------------------------------
+
+def run_refresh(feeds: List[str], use_git: bool) -> Dict[str, str]:
+    """Refresh `feeds` in a child process; returns {feed: status} from refresh_all."""
+    fd, status_path = tempfile.mkstemp(prefix="nyrg-refresh-", suffix=".json")
+    os.close(fd)
+    args = ["--feeds", ",".join(feeds), "--status-json", status_path]
+    if use_git:
+        cmd = [str(REPO_ROOT / "scripts" / "_update_all_jsons.sh")] + args
+        env = dict(os.environ, NYRG_REFRESH_IN_PROCESS="1")
+    else:
+        cmd = [sys.executable, str(REPO_ROOT / "scripts" / "refresh_all.py")] + args
+        env = dict(os.environ)
+
+    # refresh_all enforces per-feed timeouts; this only guards against a stuck git step.
+    limit = max(refresh_all.DEFAULT_TIMEOUTS.values()) + 600
+    try:
+        subprocess.run(cmd, cwd=REPO_ROOT, env=env, timeout=limit)
+        data = load_json(status_path) or {}
+    except subprocess.TimeoutExpired:
+        print(f"[NYRG] Refresh did not finish within {limit}s.", file=sys.stderr)
+        data = {}
+    finally:
+        try:
+            os.remove(status_path)
+        except OSError:
+            pass
+
+    reported = {name: (info or {}).get("status", "failed") for name, info in (data.get("feeds") or {}).items()}
+    # No status at all (crash, timeout, shell mode): count the attempt as failed.
+    return {feed: reported.get(feed, "failed") for feed in feeds}
+
+
+# -------------------------------------------------------------
+# Main loop
+# -------------------------------------------------------------
+
+def schedule(state: dict, feeds: List[str], intervals: Dict[str, int], now: float) -> Dict[str, Plan]:
+    return {feed: plan_feed(feed, state, intervals, now) for feed in feeds}
+
+
+def print_plan(plans: Dict[str, Plan], now: float) -> None:
+    for feed, (when, reason) in sorted(plans.items(), key=lambda kv: kv[1][0]):
+        when_s = "now" if when <= now else f"in {fmt_delay(when - now)} ({fmt_time(when)})"
+        print(f"[NYRG]   {feed:<10} {when_s}: {reason}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Refresh each feed when it can have changed (long-running).")
+    ap.add_argument("--once", action="store_true", help="Refresh whatever is due now, then exit")
+    ap.add_argument("--plan", action="store_true", help="Print the schedule and exit (no refresh)")
+    args = ap.parse_args()
+
+    feeds = [f.strip() for f in env_str("NYRG_DAEMON_FEEDS", ",".join(refresh_all.ALL_FEEDS)).split(",") if f.strip()]
+    unknown = [f for f in feeds if f not in refresh_all.FEEDS]
+    if unknown:
+        print(f"ERROR: unknown feed(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    intervals = dict(DEFAULT_INTERVALS)
+    intervals.update({k: int(v) for k, v in refresh_all.parse_timeouts(env_str("NYRG_DAEMON_INTERVALS", "")).items()
+                      if k in intervals and v > 0})
+    probe_every = int(env_str("NYRG_DAEMON_GALLERY_PROBE", str(DEFAULT_GALLERY_PROBE)))
+    use_git = env_str("NYRG_DAEMON_GIT", "1") == "1"
+    state_path = os.path.expanduser(env_str("NYRG_DAEMON_STATE", DEFAULT_STATE_PATH))
+    state = load_state(state_path)
+
+    if args.plan:
+        # Read-only: no Drive probe and no state write, so it is safe next to a running daemon.
+        now = time.time()
+        print_plan(schedule(state, feeds, intervals, now), now)
+        if "gallery" in feeds:
+            probe_at = state["gallery"].get("probed_at", 0) + probe_every
+            print(f"[NYRG]   gallery probe {'due now' if probe_at <= now else 'in ' + fmt_delay(probe_at - now)}")
+        return 0
+
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+
+    print(f"[NYRG] Refresh daemon: feeds {', '.join(feeds)}; git {'on' if use_git else 'off'}; state {state_path}")
+    while not stop.is_set():
+        now = time.time()
+
+        if "gallery" in feeds and now >= state["gallery"].get("probed_at", 0) + probe_every:
+            signature = probe_gallery()
+            state["gallery"]["probed_at"] = now
+            if signature is not None:
+                if state["gallery"].get("seen") is None:
+                    # First probe: the last refresh (if any) is the baseline.
+                    state["gallery"]["seen"] = signature
+                state["gallery"]["probed"] = signature
+            save_state(state_path, state)
+
+        plans = schedule(state, feeds, intervals, now)
+        due = [feed for feed, (when, _) in plans.items() if when <= now]
+
+        if due:
+            print("[NYRG] Refreshing: " + ", ".join(f"{f} ({plans[f][1]})" for f in due))
+            probed = state["gallery"].get("probed")
+            statuses = run_refresh(due, use_git)
+            finished = time.time()
+            for feed, status in statuses.items():
+                record_result(state, feed, status, finished)
+                if feed == "gallery" and status not in FAILED_STATUSES:
+                    state["gallery"]["seen"] = probed
+            save_state(state_path, state)
+            print("[NYRG] Results: " + ", ".join(f"{f} {s}" for f, s in statuses.items()))
+            if args.once:
+                return 1 if any(s in ("failed", "timeout") for s in statuses.values()) else 0
+            continue
+
+        if args.once:
+            print("[NYRG] Nothing due.")
+            return 0
+
+        wake = min(when for when, _ in plans.values())
+        if "gallery" in feeds:
+            wake = min(wake, state["gallery"].get("probed_at", 0) + probe_every)
+        print("[NYRG] Next refreshes:")
+        print_plan(plans, now)
+        stop.wait(min(MAX_SLEEP, max(MIN_SLEEP, wake - now)))
+
+    print("[NYRG] Refresh daemon stopped.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Structured per-run metrics for the NYRG data scripts.
+
+Each script run records:
+- phase durations (list folders, download sheet, write JSON, ...)
+- HTTP requests by host and status, a latency histogram, bytes in / out
+  (recorded automatically by scripts/http_cache.py)
+- cache results (hit = no request, revalidated = 304, miss = full download)
+- items produced (images, events, jobs, posts, ...)
+- the outcome (success, skipped, failure, error) and total duration
+
+At the end of the run they are exported to either or both of:
+- a Prometheus textfile (node_exporter "textfile" collector): <dir>/nyrg_<job>.prom
+- a JSON lines file: one JSON object appended per run
+
+Used by:
+- update_gallery_json.py, update_jobs_json.py, luma_scrape.py, selenium_instagram_scrape.py
+- refresh_all.py (one run per feed thread, plus its own "refresh_all" run)
+
+Optional environment variables:
+- NYRG_METRICS_TEXTFILE_DIR   (e.g. /var/lib/node_exporter/textfile_collector)
+- NYRG_METRICS_JSONL          (e.g. ~/.local/state/nyrg/metrics.jsonl)
+Nothing is written when neither is set.
+
+Usage in a script:
+  import run_metrics
+  ...
+  with run_metrics.current().phase("download"):
+      ...
+  run_metrics.current().set_items("jobs", len(jobs))
+  ...
+  if __name__ == "__main__":
+      raise SystemExit(run_metrics.run_main("jobs", main))
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Request latency histogram buckets (seconds), Prometheus style (cumulative "le").
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+OUTCOMES = ("success", "skipped", "failure", "error")
+
+
+class RunMetrics:
+    """Metrics for one script run. Thread-safe (HTTP requests come from worker threads)."""
+
+    def __init__(self, job: str):
+        self.job = job
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.duration: Optional[float] = None
+        self.outcome: Optional[str] = None
+        self.phases: Dict[str, float] = {}
+        self.items: Dict[str, int] = {}
+        self.requests: Dict[Tuple[str, int], int] = {}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # last one is +Inf
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.cache: Dict[str, int] = {}
+
+    # ---------------------------------------------------------
+    # Recording
+    # ---------------------------------------------------------
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block; repeated phases with the same name add up."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - t0)
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def observe_request(self, host: str, status: int, seconds: float, bytes_in: int, bytes_out: int) -> None:
+        """One HTTP attempt (retries count separately)."""
+        with self._lock:
+            key = (host, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.latency_sum += seconds
+            self.latency_count += 1
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    self.latency_buckets[i] += 1
+                    break
+            else:
+                self.latency_buckets[-1] += 1
+
+    def observe_cache(self, result: str) -> None:
+        """result: "hit", "revalidated", "miss" or "bypass" (cache disabled)."""
+        with self._lock:
+            self.cache[result] = self.cache.get(result, 0) + 1
+
+    def set_items(self, kind: str, count: int) -> None:
+        with self._lock:
+            self.items[kind] = int(count)
+
+    def set_outcome(self, outcome: str) -> None:
+        """Mark a run that exits 0 without writing anything (blocked, unchanged, ...) as "skipped"."""
+        if outcome not in OUTCOMES:
+            raise ValueError(f"unknown outcome {outcome!r}")
+        self.outcome = outcome
+
+    # ---------------------------------------------------------
+    # Export
+    # ---------------------------------------------------------
+
+    @property
+    def cache_hit_rate(self) -> Optional[float]:
+        """Share of cached GETs answered without a full download (hit or 304)."""
+        total = sum(self.cache.values())
+        if not total:
+            return None
+        return (self.cache.get("hit", 0) + self.cache.get("revalidated", 0)) / total
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            cumulative: List[int] = []
+            running = 0
+            for n in self.latency_buckets:
+                running += n
+                cumulative.append(running)
+            return {
+                "job": self.job,
+                "host": socket.gethostname(),
+                "started_at": datetime.fromtimestamp(self.started_at, timezone.utc)
+                .replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+                "duration_s": round(self.duration if self.duration is not None else time.perf_counter() - self._t0, 3),
+                "outcome": self.outcome or "success",
+                "phases_s": {k: round(v, 3) for k, v in self.phases.items()},
+                "items": dict(self.items),
+                "http": {
+                    "requests": sum(self.requests.values()),
+                    "by_status": {
+                        f"{host} {status}": n for (host, status), n in sorted(self.requests.items())
+                    },
+                    "bytes_in": self.bytes_in,
+                    "bytes_out": self.bytes_out,
+                    "latency_s": {
+                        "buckets": {str(b): c for b, c in zip(LATENCY_BUCKETS + ["+Inf"], cumulative)},
+                        "sum": round(self.latency_sum, 3),
+                        "count": self.latency_count,
+                    },
+                },
+                "cache": dict(self.cache),
+                "cache_hit_rate": None if self.cache_hit_rate is None else round(self.cache_hit_rate, 3),
+            }
+
+    def to_prometheus(self) -> str:
+        d = self.to_dict()
+        job = _label(self.job)
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[Tuple[str, object]]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{{job=\"{job}\"{labels}}} {value}")
+
+        metric("nyrg_run_last_start_timestamp_seconds", "gauge", "Start of the last run (unix time).",
+               [("", int(self.started_at))])
+        metric("nyrg_run_duration_seconds", "gauge", "Wall time of the last run.", [("", d["duration_s"])])
+        metric("nyrg_run_success", "gauge", "1 if the last run succeeded or was skipped, else 0.",
+               [("", 1 if d["outcome"] in ("success", "skipped") else 0)])
+        metric("nyrg_run_outcome", "gauge", "Outcome of the last run (1 for the current outcome).",
+               [(f",outcome=\"{o}\"", 1 if d["outcome"] == o else 0) for o in OUTCOMES])
+        metric("nyrg_run_phase_seconds", "gauge", "Time spent per phase in the last run.",
+               [(f",phase=\"{_label(k)}\"", v) for k, v in d["phases_s"].items()])
+        metric("nyrg_run_items", "gauge", "Items produced by the last run.",
+               [(f",kind=\"{_label(k)}\"", v) for k, v in d["items"].items()])
+        metric("nyrg_http_requests", "gauge", "HTTP requests (attempts) in the last run, by host and status.",
+               [(f",host=\"{_label(h)}\",status=\"{s}\"", n) for (h, s), n in sorted(self.requests.items())])
+        metric("nyrg_http_bytes", "gauge", "HTTP bytes transferred in the last run.",
+               [(",direction=\"in\"", d["http"]["bytes_in"]), (",direction=\"out\"", d["http"]["bytes_out"])])
+
+        hist = "nyrg_http_request_duration_seconds"
+        lines.append(f"# HELP {hist} HTTP request latency in the last run.")
+        lines.append(f"# TYPE {hist} histogram")
+        for bound, count in d["http"]["latency_s"]["buckets"].items():
+            lines.append(f"{hist}_bucket{{job=\"{job}\",le=\"{bound}\"}} {count}")
+        lines.append(f"{hist}_sum{{job=\"{job}\"}} {d['http']['latency_s']['sum']}")
+        lines.append(f"{hist}_count{{job=\"{job}\"}} {d['http']['latency_s']['count']}")
+
+        metric("nyrg_http_cache_results", "gauge", "HTTP cache results in the last run.",
+               [(f",result=\"{_label(k)}\"", v) for k, v in sorted(d["cache"].items())])
+        return "\n".join(lines) + "\n"
+
+    def export(self) -> None:
+        """Write to the configured sinks. Export problems never fail the run."""
+        textfile_dir = os.path.expanduser(os.environ.get("NYRG_METRICS_TEXTFILE_DIR", "").strip())
+        jsonl_path = os.path.expanduser(os.environ.get("NYRG_METRICS_JSONL", "").strip())
+
+        if textfile_dir:
+            try:
+                os.makedirs(textfile_dir, exist_ok=True)
+                path = os.path.join(textfile_dir, f"nyrg_{self.job}.prom")
+                # node_exporter may read at any time: write a temp file, then rename.
+                tmp = path + f".{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(self.to_prometheus())
+                os.replace(tmp, path)
+            except OSError as e:
+                print(f"[NYRG] WARNING: could not write metrics textfile: {e}", file=sys.stderr)
+
+        if jsonl_path:
+            try:
+                os.makedirs(os.path.dirname(jsonl_path) or ".", exist_ok=True)
+                with open(jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(self.to_dict(), separators=(",", ":")) + "\n")
+            except OSError as e:
+                print(f"[NYRG] WARNING: could not append metrics: {e}", file=sys.stderr)
+
+    def finish(self, outcome: Optional[str] = None) -> None:
+        if outcome is not None and (self.outcome is None or outcome in ("failure", "error")):
+            self.outcome = outcome
+        self.duration = time.perf_counter() - self._t0
+        self.export()
+
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+_CURRENT: Optional[RunMetrics] = None
+_CURRENT_LOCK = threading.Lock()
+
+# Per-thread runs: scripts/refresh_all.py runs several scripts in one process.
+_LOCAL = threading.local()
+
+
+def current() -> RunMetrics:
+    """
+    The metrics of the running script: the run bound to this thread (see bind()),
+    else the process-wide run (a throwaway instance if no run was started).
+    """
+    bound = getattr(_LOCAL, "metrics", None)
+    if bound is not None:
+        return bound
+    global _CURRENT
+    with _CURRENT_LOCK:
+        if _CURRENT is None:
+            _CURRENT = RunMetrics("unknown")
+        return _CURRENT
+
+
+def bind(metrics: Optional[RunMetrics]) -> None:
+    """Attribute everything recorded on this thread to `metrics` (None = process-wide run)."""
+    _LOCAL.metrics = metrics
+
+
+def pool_kwargs() -> dict:
+    """ThreadPoolExecutor kwargs so worker threads record into the caller's run."""
+    return {"initializer": bind, "initargs": (current(),)}
+
+
+def start_run(job: str, thread_only: bool = False) -> RunMetrics:
+    """Start a run for the whole process, or (thread_only) just for this thread."""
+    global _CURRENT
+    metrics = RunMetrics(job)
+    if thread_only:
+        bind(metrics)
+        return metrics
+    with _CURRENT_LOCK:
+        _CURRENT = metrics
+    return metrics
+
+
+def run_main(job: str, main: Callable[[], Optional[int]], thread_only: bool = False) -> int:
+    """
+    Run a script's main() with metrics. The outcome comes from main():
+    exception -> "error", non-zero exit code -> "failure", otherwise "success"
+    (unless main() called set_outcome("skipped")). Exceptions are re-raised.
+    """
+    metrics = start_run(job, thread_only)
+    try:
+        code = main() or 0
+    except BaseException:
+        metrics.finish("error")
+        raise
+    metrics.finish("failure" if code else "success")
+    return code
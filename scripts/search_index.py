@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Prebuilt client-side search index for the site (gallery events, jobs, Luma events).
+
+The browser should not download every feed to answer "ioana", "brooklyn" or "iunie".
+Instead, each generator hands its documents to this module after writing its feed,
+and a small inverted index is rebuilt under data/search/:
+
+  data/search/index.json         manifest: settings + a digest per file (cache busting)
+  data/search/docs/<n>.json      document table, DOCS_PER_SHARD docs per file:
+                                 [kind, title, subtitle, url] for doc ids n*50 .. n*50+49
+  data/search/terms/<xx>.json    posting lists for every term starting with "xx"
+  data/search/sources/<kind>.json  the documents each generator provided last time
+
+Tokens are diacritic-folded and lowercased ("Ștefan" -> "stefan", "Brașov" -> "brasov"),
+so visitors find Romanian names with or without diacritics. Posting lists are sorted doc
+ids, delta-encoded ([3, 1, 4] = docs 3, 4, 8). Shards are keyed by the first two letters
+of a term, so a lookup downloads one small file per query word; a prefix query ("bra")
+is answered from the same shard by scanning its terms. The document table is chunked
+too, so showing the top results downloads only the chunks that hold them.
+
+Sources are kept separately, so refreshing one feed (e.g. jobs) rebuilds the index with
+the other feeds' last documents. Unchanged files are not rewritten.
+
+The generators write to the directory their caller gives them (update_gallery_json.py
+--search-dir, same defaults as its other outputs). refresh_all.py gives each feed a
+private directory and merges only the sources of the feeds it publishes into a staged
+copy of data/search (merge_sources()), so a rejected run never changes the index.
+
+Used by:
+- update_gallery_json.py (kind "gallery"), update_jobs_json.py ("job"), luma_scrape.py ("event")
+- assets/site.js (site search box in the header)
+
+Optional environment variables:
+- NYRG_SEARCH_INDEX=0   do not update the index
+- NYRG_SEARCH_DIR       output directory (default: data/search)
+
+Usage in a script:
+  import search_index
+  search_index.update_source("job", [search_index.job_doc(j) for j in jobs])
+
+Standalone (rebuild every source from the current data/*.json feeds, e.g. to seed the
+index or after changing the tokenizer):
+  python3 scripts/search_index.py
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import feed_diff
+import gallery_cards
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+INDEX_VERSION = 2
+
+# Shards are keyed by this many leading characters of a term.
+SHARD_PREFIX_LEN = 2
+
+# Shorter tokens are not indexed (and ignored in queries).
+MIN_TOKEN_LEN = 2
+
+# Rows per document table file (docs/<n>.json).
+DOCS_PER_SHARD = 50
+
+# Document order (= doc ids = result order on the site): upcoming events first.
+KINDS = ("event", "job", "gallery")
+
+MONTH_NAMES = [
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+]
+# Romanian month names, so "iunie" finds June albums too.
+MONTH_NAMES_RO = [
+    "ianuarie", "februarie", "martie", "aprilie", "mai", "iunie",
+    "iulie", "august", "septembrie", "octombrie", "noiembrie", "decembrie",
+]
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# refresh_all.py runs the generators in threads of one process.
+_LOCK = threading.Lock()
+
+
+def enabled() -> bool:
+    return os.environ.get("NYRG_SEARCH_INDEX", "1").strip() not in ("0", "false", "no")
+
+
+def iso_utc_now() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def default_dir() -> Path:
+    raw = os.environ.get("NYRG_SEARCH_DIR", "").strip()
+    if not raw:
+        return REPO_ROOT / "data" / "search"
+    p = Path(raw)
+    return p if p.is_absolute() else REPO_ROOT / p
+
+
+# -------------------------------------------------------------
+# Tokens (keep in sync with _searchTokens() in assets/site.js)
+# -------------------------------------------------------------
+
+def fold(text: str) -> str:
+    """Lowercase and strip diacritics: "Ștefan Ţară" -> "stefan tara"."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(fold(text)) if len(t) >= MIN_TOKEN_LEN]
+
+
+def month_words(yyyy_mm: str) -> str:
+    """"2026-06" -> "2026 june iunie" (empty for anything else)."""
+    m = re.match(r"^(\d{4})-(\d{2})", yyyy_mm or "")
+    if not m or not 1 <= int(m.group(2)) <= 12:
+        return ""
+    i = int(m.group(2)) - 1
+    return f"{m.group(1)} {MONTH_NAMES[i]} {MONTH_NAMES_RO[i]}"
+
+
+def month_label(yyyy_mm: str) -> str:
+    m = re.match(r"^(\d{4})-(\d{2})", yyyy_mm or "")
+    if not m or not 1 <= int(m.group(2)) <= 12:
+        return ""
+    return f"{MONTH_NAMES[int(m.group(2)) - 1].title()} {m.group(1)}"
+
+
+# -------------------------------------------------------------
+# Documents per source
+# -------------------------------------------------------------
+
+def make_doc(title: str, sub: str, url: str, *texts: str) -> dict:
+    return {"title": title or "", "sub": sub or "", "url": url or "", "text": " ".join(t for t in texts if t)}
+
+
+def gallery_doc(ev: dict) -> dict:
+    """A gallery event (Drive album or external album)."""
+    month = ev.get("month", "")
+    photographer = ev.get("photographer", "")
+    sub = " · ".join(p for p in (month_label(month), photographer) if p)
+    return make_doc(
+        ev.get("title", ""), sub, ev.get("folder_url") or ev.get("url", ""),
+        ev.get("title", ""), photographer, month_words(month),
+    )
+
+
+def job_doc(job: dict) -> dict:
+    sub = " · ".join(p for p in (job.get("company", ""), job.get("location", "")) if p)
+    url = "jobs.html" + (f"#job-{job['id']}" if job.get("id") else "")
+    return make_doc(
+        job.get("title", ""), sub, url,
+        job.get("title", ""), job.get("company", ""), job.get("location", ""),
+    )
+
+
+def event_doc(ev: dict) -> dict:
+    """An upcoming Luma event."""
+    geo = ev.get("geo_address_info") or {}
+    start = ev.get("start_at", "")
+    sub = " · ".join(p for p in (start[:10], geo.get("city", "")) if p)
+    return make_doc(
+        ev.get("title", ""), sub, ev.get("url", ""),
+        ev.get("title", ""), geo.get("address", ""), geo.get("city", ""), month_words(start[:7]),
+    )
+
+
+# -------------------------------------------------------------
+# Build
+# -------------------------------------------------------------
+
+def digest(body: bytes) -> str:
+    return hashlib.sha1(body).hexdigest()[:10]
+
+
+def dumps_compact(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_source(source: dict) -> bytes:
+    """sources/<kind>.json: indented, so a refresh shows up as a readable git diff."""
+    return (json.dumps(source, ensure_ascii=False, indent=1) + "\n").encode("utf-8")
+
+
+def write_if_changed(path: Path, body: bytes) -> bool:
+    try:
+        if path.read_bytes() == body:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(body)
+    os.replace(tmp, path)
+    return True
+
+
+def build_postings(docs: List[dict]) -> Dict[str, List[int]]:
+    """term -> sorted doc ids."""
+    postings: Dict[str, List[int]] = {}
+    for doc_id, doc in enumerate(docs):
+        for term in sorted(set(tokenize(doc["text"]))):
+            postings.setdefault(term, []).append(doc_id)
+    return postings
+
+
+def delta_encode(ids: List[int]) -> List[int]:
+    out, prev = [], 0
+    for i in ids:
+        out.append(i - prev)
+        prev = i
+    return out
+
+
+def shard_key(term: str) -> str:
+    return term[:SHARD_PREFIX_LEN]
+
+
+def load_sources(out_dir: Path) -> Dict[str, List[dict]]:
+    sources: Dict[str, List[dict]] = {}
+    for kind in KINDS:
+        data = feed_diff.load_json(out_dir / "sources" / f"{kind}.json")
+        if isinstance(data, dict) and isinstance(data.get("docs"), list):
+            sources[kind] = data["docs"]
+    return sources
+
+
+def remove_stale(directory: Path, keep: Iterable[str]) -> int:
+    """Delete the *.json files of `directory` whose stem is not in `keep`. Returns files removed."""
+    keep = set(keep)
+    removed = 0
+    if directory.is_dir():
+        for path in directory.glob("*.json"):
+            if path.stem not in keep:
+                path.unlink()
+                removed += 1
+    return removed
+
+
+def build(out_dir: Path) -> int:
+    """Rebuild the document table, the term shards and index.json from the sources. Returns files written."""
+    sources = load_sources(out_dir)
+    docs: List[dict] = []
+    table: List[list] = []
+    for kind in KINDS:
+        for doc in sources.get(kind, []):
+            docs.append(doc)
+            table.append([kind, doc.get("title", ""), doc.get("sub", ""), doc.get("url", "")])
+
+    shards: Dict[str, Dict[str, List[int]]] = {}
+    for term, ids in sorted(build_postings(docs).items()):
+        shards.setdefault(shard_key(term), {})[term] = delta_encode(ids)
+
+    written = 0
+    files: Dict[str, str] = {}
+
+    docs_dir = out_dir / "docs"
+    chunks = [str(n) for n in range((len(table) + DOCS_PER_SHARD - 1) // DOCS_PER_SHARD)]
+    for n in chunks:
+        start = int(n) * DOCS_PER_SHARD
+        body = dumps_compact(table[start:start + DOCS_PER_SHARD])
+        written += write_if_changed(docs_dir / f"{n}.json", body)
+        files[f"docs/{n}"] = digest(body)
+
+    terms_dir = out_dir / "terms"
+    for key, terms in shards.items():
+        body = dumps_compact(terms)
+        written += write_if_changed(terms_dir / f"{key}.json", body)
+        files[f"terms/{key}"] = digest(body)
+
+    # Chunks and shards that are gone, and the single docs.json of version 1.
+    written += remove_stale(docs_dir, chunks)
+    written += remove_stale(terms_dir, shards)
+    if (out_dir / "docs.json").exists():
+        (out_dir / "docs.json").unlink()
+        written += 1
+
+    manifest = {
+        "_comment": "THIS FILE IS AUTO-GENERATED. DO NOT EDIT MANUALLY. Built by scripts/search_index.py.",
+        "updated_at": iso_utc_now(),
+        "version": INDEX_VERSION,
+        "prefix_len": SHARD_PREFIX_LEN,
+        "min_token": MIN_TOKEN_LEN,
+        "docs_per_shard": DOCS_PER_SHARD,
+        "count": len(table),
+        "files": files,
+    }
+    manifest_path = out_dir / "index.json"
+    if feed_diff.content_changed(str(manifest_path), manifest):
+        write_if_changed(manifest_path, (json.dumps(manifest, indent=2) + "\n").encode("utf-8"))
+        written += 1
+    return written
+
+
+def update_source(kind: str, docs: Iterable[dict], out_dir: Optional[Path] = None) -> None:
+    """
+    Replace the documents of one source and rebuild the index. Never fails the caller:
+    the search index is a convenience, the feed itself is already written.
+    """
+    if not enabled():
+        return
+    if kind not in KINDS:
+        raise ValueError(f"unknown search source {kind!r}")
+    out_dir = Path(out_dir) if out_dir is not None else default_dir()
+    try:
+        with _LOCK:
+            source = {"docs": list(docs)}
+            source_path = out_dir / "sources" / f"{kind}.json"
+            old = feed_diff.load_json(source_path)
+            if old == source and (out_dir / "index.json").exists():
+                return
+            write_if_changed(source_path, dumps_source(source))
+            written = build(out_dir)
+        print(f"[NYRG] Search index: {len(source['docs'])} {kind} doc(s), {written} file(s) updated -> {out_dir}")
+    except (OSError, ValueError) as e:
+        print(f"[NYRG] WARNING: could not update the search index: {e}")
+
+
+def merge_sources(sources: Dict[str, Path], out_dir: Path) -> bool:
+    """
+    Copy source files ({kind: sources/<kind>.json of another index}) into the index at
+    `out_dir` and rebuild it. Used by refresh_all.py with the private indexes of the feeds
+    it publishes. Returns True if anything in `out_dir` changed.
+    """
+    changed = False
+    with _LOCK:
+        for kind, source_path in sources.items():
+            source = feed_diff.load_json(source_path)
+            if not isinstance(source, dict) or not isinstance(source.get("docs"), list):
+                continue
+            changed |= write_if_changed(out_dir / "sources" / f"{kind}.json", dumps_source(source))
+        manifest = feed_diff.load_json(out_dir / "index.json")
+        current = isinstance(manifest, dict) and manifest.get("version") == INDEX_VERSION
+        if changed or (sources and not current):
+            changed |= build(out_dir) > 0
+    return changed
+
+
+def feed_sources() -> Dict[str, List[dict]]:
+    """Documents of every source, from the feeds in data/ (the ones that exist)."""
+    data_dir = REPO_ROOT / "data"
+    sources: Dict[str, List[dict]] = {}
+
+    gallery = feed_diff.load_json(data_dir / "gallery.json")
+    if isinstance(gallery, dict):
+        sources["gallery"] = [gallery_doc(ev) for ev in gallery_cards.iter_gallery_events(gallery)]
+
+    jobs = feed_diff.load_json(data_dir / "jobs.json")
+    if isinstance(jobs, dict):
+        sources["job"] = [job_doc(j) for j in jobs.get("jobs") or []]
+
+    luma = feed_diff.load_json(data_dir / "luma.json")
+    if isinstance(luma, dict):
+        sources["event"] = [event_doc(ev) for ev in luma.get("events") or []]
+    return sources
+
+
+def rebuild(out_dir: Optional[Path] = None) -> None:
+    """Rebuild every source from the feeds in data/ (a feed that is missing keeps its stored source)."""
+    out_dir = Path(out_dir) if out_dir is not None else default_dir()
+    sources = feed_sources()
+    with _LOCK:
+        for kind, docs in sources.items():
+            write_if_changed(out_dir / "sources" / f"{kind}.json", dumps_source({"docs": docs}))
+        written = build(out_dir)
+    print(f"[NYRG] Search index rebuilt: {', '.join(sources) or 'no sources'}, {written} file(s) updated -> {out_dir}")
+
+
+if __name__ == "__main__":
+    rebuild()
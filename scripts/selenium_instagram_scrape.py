@@ -3,11 +3,23 @@
 NYRG Instagram scraper (Selenium).
 
 Goal:
-- Open the public profile page
-- Extract the latest N post URLs (default 4)
+- Get the latest N post URLs (default 4) of the public profile
 - Write them to data/instagram.json
 - If extraction fails (blocked, changed markup, rate limit), do NOT modify the JSON.
 
+How it gets the posts:
+1) Fast path, plain HTTP (no browser, well under a second):
+   - the JSON endpoint instagram.com's own web app uses for profiles (web_profile_info)
+   - else the post shortcodes embedded in the profile page's HTML
+2) Only if that finds too few posts: headless Chrome via Selenium. Images, video and
+   fonts are blocked over the DevTools Protocol and pages load "eager" (DOM only).
+   selenium is imported only in this case, so it is optional for the fast path.
+
+Each post also gets card metadata (media type, timestamp, caption excerpt) and a
+thumbnail downloaded once into assets/instagram/<shortcode>.jpg, so the homepage can
+show static cards instead of loading Instagram's embed script. The browser path only
+sees links: metadata already known from an earlier run is kept.
+
 This file is heavily commented because collaborators may be new to coding.
 
 How to run:
@@ -16,7 +28,8 @@ How to run:
 
 MAINTAINERS:
 - If scraping stops working, Instagram likely changed markup or added a new login wall.
-- In that case, run with NYRG_IG_HEADLESS=0 and NYRG_IG_DEBUG=1 to inspect.
+- In that case, run with NYRG_IG_DEBUG=1 (and NYRG_IG_MODE=selenium NYRG_IG_HEADLESS=0
+  to watch the browser) to inspect.
 - This script is designed to NOT overwrite data/instagram.json on failure.
 
 Optional environment variables:
@@ -25,22 +38,32 @@ Optional environment variables:
 - NYRG_IG_JSON_PATH     (default: data/instagram.json)
 - NYRG_IG_HEADLESS      ("1" default, set to "0" to see the browser)
 - NYRG_IG_DEBUG         ("0" default, set to "1" for extra logs + screenshots)
+- NYRG_IG_MODE          ("auto" default: HTTP first, browser as fallback;
+                         "http" = never start a browser, "selenium" = browser only)
+- NYRG_IG_WAIT_SECONDS  (default: 15, how long the browser waits for enough posts)
+- NYRG_IG_THUMBS_DIR    (default: assets/instagram, cached post thumbnails <shortcode>.jpg)
+- NYRG_METRICS_*        (per-run metrics export, see scripts/run_metrics.py)
+- NYRG_FORCE_WRITE     ("1" rewrites instagram.json even if only updated_at changed)
+- NYRG_HOME_*           (homepage bundle data/home.json, see scripts/home_bundle.py)
 """
 
 import json
 import os
+import re
 import sys
 import time
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
+import feed_diff
+import home_bundle
+import run_metrics
+from http_cache import default_cache, shared_session
+
+# selenium is imported lazily (only when the HTTP fast path fails), so the
+# fast path works on machines without selenium or Chrome.
 
 
 DEFAULT_PROFILE_URL = "https://www.instagram.com/newyorkromaniangroup/"
@@ -52,7 +75,81 @@ REPO_ROOT = Path(__file__).resolve().parents[1]
 # - /p/<code>/
 # - /reel/<code>/
 # Sometimes links also appear as /<username>/p/<code>/, so we normalize.
-POST_RE = r"^/(?:[^/]+/)?(p|reel)/[^/]+/?$"
+POST_RE = re.compile(r"^/(?:[^/]+/)?(p|reel)/([^/]+)/?$")
+
+# Browser path. Both scripts filter the anchors inside the page (same pattern as
+# POST_RE), so a whole page costs one WebDriver round trip instead of one per anchor.
+COLLECT_POSTS_JS = r"""
+const re = /^\/(?:[^\/]+\/)?(p|reel)\/([^\/]+)\/?$/;
+return Array.from(document.querySelectorAll('a[href]'), a => a.href)
+  .filter(href => re.test(new URL(href, location.href).pathname));
+"""
+
+# execute_async_script: (limit, timeout_ms, scroll_ms, callback). Resolves as soon
+# as `limit` distinct posts are linked, or at the deadline with whatever is there.
+WAIT_FOR_POSTS_JS = r"""
+const [limit, timeoutMs, scrollMs] = arguments;
+const done = arguments[arguments.length - 1];
+const re = /^\/(?:[^\/]+\/)?(p|reel)\/([^\/]+)\/?$/;
+let scrolls = 0, mutations = 0, pending = false, finished = false, observer, timer, scroller;
+
+const postHrefs = () => Array.from(document.querySelectorAll('a[href]'), a => a.href)
+  .filter(href => re.test(new URL(href, location.href).pathname));
+const distinct = hrefs => new Set(hrefs.map(h => re.exec(new URL(h, location.href).pathname)[2])).size;
+
+const finish = () => {
+  if (finished) return;
+  finished = true;
+  if (observer) observer.disconnect();
+  clearTimeout(timer);
+  clearInterval(scroller);
+  done({hrefs: postHrefs(), scrolls, mutations});
+};
+// Count at most every 50 ms: a grid render fires many mutations at once.
+const check = () => {
+  if (pending || finished) return;
+  pending = true;
+  setTimeout(() => { pending = false; if (distinct(postHrefs()) >= limit) finish(); }, 50);
+};
+
+if (distinct(postHrefs()) >= limit) { finish(); return; }
+observer = new MutationObserver(() => { mutations++; check(); });
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, attributeFilter: ['href']});
+scroller = setInterval(() => { window.scrollTo(0, document.body.scrollHeight); scrolls++; check(); }, scrollMs);
+timer = setTimeout(finish, timeoutMs);
+"""
+
+# How often the page is scrolled down while waiting for more grid items.
+SCROLL_INTERVAL_MS = 1500
+DEFAULT_WAIT_SECONDS = 15
+
+# Fast path (plain HTTP). The app ID is the public one instagram.com's own web app
+# sends; web_profile_info answers with the profile and its latest posts as JSON.
+PROFILE_INFO_URL = "https://www.instagram.com/api/v1/users/web_profile_info/"
+IG_APP_ID = "936619743392459"
+# Post links and shortcodes embedded in the profile page's HTML / JSON blobs.
+EMBEDDED_POST_RE = re.compile(r"\\?/(p|reel)\\?/([A-Za-z0-9_-]{5,})\\?/")
+EMBEDDED_SHORTCODE_RE = re.compile(r'"shortcode"\s*:\s*"([A-Za-z0-9_-]{5,})"')
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/122 Safari/537.36"
+)
+
+# Post cards (assets/site.js renders them without Instagram's embed script).
+DEFAULT_THUMBS_DIR = REPO_ROOT / "assets" / "instagram"
+THUMB_MIN_WIDTH = 320       # px, smallest rendition that still looks sharp on a card
+THUMB_KEEP_DAYS = 30        # unused thumbnails are deleted after this many days
+CAPTION_MAX_CHARS = 200
+MEDIA_TYPES = {"GraphImage": "image", "GraphVideo": "video", "GraphSidecar": "carousel"}
+
+# Browser fallback: resources Chrome is told not to download (DevTools Network.setBlockedURLs).
+BLOCKED_URL_PATTERNS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.heic", "*.avif",
+    "*.mp4", "*.m4v", "*.webm", "*.m3u8", "*.mpd", "*.m4s",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*scontent*.cdninstagram.com*", "*scontent*.fbcdn.net*",
+]
 
 
 def env_str(name: str, default: str) -> str:
@@ -77,17 +174,21 @@ def env_bool(name: str, default: bool) -> bool:
     return v.strip() in ("1", "true", "True", "yes", "YES")
 
 
-def safe_write_json(path: Path, payload: dict) -> None:
+def safe_write_json(path: Path, payload: dict) -> bool:
     """
     Write JSON atomically:
     - write to a .tmp file
     - replace the destination
     This avoids partially-written files if the script crashes.
+    Returns False (and keeps the file) if only updated_at would change.
     """
+    if not feed_diff.content_changed(path, payload):
+        return False
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp = path.with_suffix(".tmp")
     tmp.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
     tmp.replace(path)
+    return True
 
 
 def debug_screenshot(driver, path: Path, debug: bool, label: str) -> None:
@@ -100,40 +201,248 @@ def debug_screenshot(driver, path: Path, debug: bool, label: str) -> None:
         print(f"[NYRG][DEBUG] Screenshot failed ({label}): {e}")
 
 
-def collect_post_urls(driver, limit: int, debug: bool) -> list:
-    """
-    Collect candidate post URLs by scanning all anchors on the page.
-    Then normalize to canonical URLs: https://www.instagram.com/p/<code>/
-    """
-    anchors = driver.find_elements(By.CSS_SELECTOR, "a[href]")
-    found = []
-
-    for a in anchors:
-        href = a.get_attribute("href")
-        if not href:
-            continue
-
-        parsed = urlparse(href)
-        path = parsed.path  # ignore query and fragment
+def post_url(kind: str, code: str) -> str:
+    """Canonical post URL: https://www.instagram.com/<p|reel>/<code>/"""
+    return f"https://www.instagram.com/{kind}/{code}/"
 
-        if not __import__("re").match(POST_RE, path):
-            continue
 
-        # Normalize:
-        # - If path is /<username>/p/<code>/ convert to /p/<code>/
-        parts = [p for p in path.split("/") if p]  # remove empty
-        if len(parts) >= 2 and parts[-2] in ("p", "reel"):
-            kind = parts[-2]
-            code = parts[-1]
-            found.append(f"https://www.instagram.com/{kind}/{code}/")
-
-    # De-dupe in order
+def dedupe(urls: List[str]) -> List[str]:
     out = []
     seen = set()
-    for u in found:
+    for u in urls:
         if u not in seen:
             seen.add(u)
             out.append(u)
+    return out
+
+
+# -------------------------------------------------------------
+# Fast path: plain HTTP, no browser
+# -------------------------------------------------------------
+
+def profile_username(profile_url: str) -> str:
+    parts = [p for p in urlparse(profile_url).path.split("/") if p]
+    return parts[0] if parts else ""
+
+
+def post_meta_from_node(node: dict) -> dict:
+    """Card metadata for one web_profile_info post node (thumbnail source URL in "_thumb_src")."""
+    if node.get("product_type") == "clips":
+        media_type = "reel"
+    else:
+        media_type = MEDIA_TYPES.get(node.get("__typename", ""), "video" if node.get("is_video") else "image")
+
+    caption_edges = (node.get("edge_media_to_caption") or {}).get("edges") or []
+    caption = ((caption_edges[0].get("node") or {}).get("text") or "") if caption_edges else ""
+
+    taken_at = ""
+    if node.get("taken_at_timestamp"):
+        taken_at = datetime.fromtimestamp(int(node["taken_at_timestamp"]), timezone.utc).isoformat()
+
+    # Smallest rendition that is still sharp on a card; the CDN URLs are signed and
+    # change every time, so only the downloaded copy ends up in the JSON.
+    resources = sorted(node.get("thumbnail_resources") or [], key=lambda r: r.get("config_width") or 0)
+    thumb_src = next((r.get("src") for r in resources if (r.get("config_width") or 0) >= THUMB_MIN_WIDTH), None)
+    thumb_src = thumb_src or node.get("thumbnail_src") or node.get("display_url") or ""
+
+    return {
+        "media_type": media_type,
+        "taken_at": taken_at,
+        "caption": caption_excerpt(caption),
+        "_thumb_src": thumb_src,
+    }
+
+
+def posts_from_profile_info(data: dict, meta: Optional[Dict[str, dict]] = None) -> List[str]:
+    """
+    Post URLs from the web_profile_info JSON (newest first, pinned posts included).
+    If `meta` is given it is filled with shortcode -> post_meta_from_node().
+    """
+    user = ((data or {}).get("data") or {}).get("user") or {}
+    edges = (user.get("edge_owner_to_timeline_media") or {}).get("edges") or []
+    urls = []
+    for edge in edges:
+        node = edge.get("node") or {}
+        code = node.get("shortcode")
+        if code:
+            # Reels are "clips"; everything else (photos, carousels, videos) lives under /p/.
+            urls.append(post_url("reel" if node.get("product_type") == "clips" else "p", code))
+            if meta is not None:
+                meta[code] = post_meta_from_node(node)
+    return urls
+
+
+def posts_from_profile_html(html: str) -> List[str]:
+    """Post URLs from the profile page's embedded data (links first, then bare shortcodes)."""
+    urls = [post_url(kind, code) for kind, code in EMBEDDED_POST_RE.findall(html)]
+    urls += [post_url("p", code) for code in EMBEDDED_SHORTCODE_RE.findall(html)]
+    # The same post can show up as /p/ and /reel/: keep the first form seen.
+    by_code: Dict[str, str] = {}
+    for u in urls:
+        by_code.setdefault(u.rstrip("/").rsplit("/", 1)[-1], u)
+    return list(by_code.values())
+
+
+def fetch_posts_http(profile_url: str, limit: int, debug: bool, meta: Optional[Dict[str, dict]] = None) -> List[str]:
+    """
+    Try to get the latest post URLs without a browser:
+    1) the JSON endpoint Instagram's own web app uses for profile pages
+       (also fills `meta` with each post's card metadata)
+    2) the profile HTML, which embeds the first posts' shortcodes
+    Returns fewer than `limit` URLs (often none) when Instagram blocks or changed things.
+    """
+    cache = default_cache()
+    session = shared_session()
+    username = profile_username(profile_url)
+    urls: List[str] = []
+
+    if username:
+        try:
+            resp = cache.get(
+                PROFILE_INFO_URL,
+                params={"username": username},
+                headers={"User-Agent": USER_AGENT, "X-IG-App-ID": IG_APP_ID, "Accept": "application/json"},
+                timeout=15,
+                session=session,
+                ttl=0,
+            )
+            if resp.ok:
+                urls = dedupe(posts_from_profile_info(resp.json(), meta))
+            if debug:
+                print(f"[NYRG][DEBUG] web_profile_info: HTTP {resp.status_code}, {len(urls)} post URLs")
+        except Exception as e:  # bad JSON, network errors: fall through to the HTML
+            if debug:
+                print(f"[NYRG][DEBUG] web_profile_info failed: {e}")
+
+    if len(urls) < limit:
+        try:
+            resp = cache.get(
+                profile_url,
+                headers={"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"},
+                timeout=15,
+                session=session,
+                ttl=0,
+            )
+            html_urls = posts_from_profile_html(resp.text) if resp.ok else []
+            if debug:
+                print(f"[NYRG][DEBUG] profile HTML: HTTP {resp.status_code}, {len(html_urls)} post URLs")
+            if len(html_urls) > len(urls):
+                urls = html_urls
+        except Exception as e:
+            if debug:
+                print(f"[NYRG][DEBUG] profile HTML failed: {e}")
+
+    return urls[:limit]
+
+
+# -------------------------------------------------------------
+# Post cards: metadata + locally cached thumbnails
+# -------------------------------------------------------------
+
+def shortcode_of(url: str) -> str:
+    return url.rstrip("/").rsplit("/", 1)[-1]
+
+
+def caption_excerpt(text: str) -> str:
+    text = " ".join((text or "").split())
+    if len(text) <= CAPTION_MAX_CHARS:
+        return text
+    return text[:CAPTION_MAX_CHARS].rsplit(" ", 1)[0] + "…"
+
+
+def download_thumbnail(src: str, path: Path) -> bool:
+    """Download one thumbnail (atomic write). Returns False on any failure."""
+    metrics = run_metrics.current()
+    t0 = time.perf_counter()
+    try:
+        resp = shared_session().get(src, headers={"User-Agent": USER_AGENT}, timeout=20)
+    except Exception as e:
+        metrics.observe_request(urlparse(src).netloc, 0, time.perf_counter() - t0, 0, len(src))
+        print(f"[NYRG] Thumbnail download failed: {e}")
+        return False
+    metrics.observe_request(urlparse(src).netloc, resp.status_code, time.perf_counter() - t0, len(resp.content), len(src))
+    if resp.status_code != 200 or not resp.headers.get("content-type", "").startswith("image/"):
+        print(f"[NYRG] Thumbnail download failed: HTTP {resp.status_code}")
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(resp.content)
+    tmp.replace(path)
+    return True
+
+
+def prune_thumbnails(thumbs_dir: Path, keep: set) -> int:
+    """
+    Delete cached thumbnails no post uses any more. Recent files are kept for a while,
+    so a JSON that is still published (e.g. a run that failed later) never points at
+    a deleted file.
+    """
+    removed = 0
+    cutoff = time.time() - THUMB_KEEP_DAYS * 86400
+    for path in thumbs_dir.glob("*.jpg"):
+        if path.name not in keep and path.stat().st_mtime < cutoff:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def build_posts(urls: List[str], meta: Dict[str, dict], previous: List[dict], thumbs_dir: Path) -> List[dict]:
+    """
+    Post records for instagram.json: url, shortcode, media_type, taken_at, caption,
+    thumbnail (path relative to the site root). Metadata comes from this run when the
+    fast path had it, else from the previous instagram.json (browser runs only see
+    links). Each thumbnail is downloaded once, keyed by shortcode.
+    """
+    old_by_code = {p.get("shortcode") or shortcode_of(p.get("url", "")): p for p in previous if isinstance(p, dict)}
+    metrics = run_metrics.current()
+    downloaded = 0
+    posts = []
+
+    for url in urls:
+        code = shortcode_of(url)
+        info = dict(meta.get(code) or {})
+        old = old_by_code.get(code) or {}
+        post = {"url": url, "shortcode": code}
+        for key in ("media_type", "taken_at", "caption"):
+            if info.get(key) or old.get(key):
+                post[key] = info.get(key) or old.get(key)
+
+        thumb = thumbs_dir / f"{code}.jpg"
+        if not thumb.exists() and info.get("_thumb_src"):
+            if download_thumbnail(info["_thumb_src"], thumb):
+                downloaded += 1
+        if thumb.exists():
+            try:
+                post["thumbnail"] = thumb.resolve().relative_to(REPO_ROOT).as_posix()
+            except ValueError:
+                post["thumbnail"] = thumb.as_posix()  # outside the site: only useful for testing
+        posts.append(post)
+
+    metrics.set_items("thumbnails_downloaded", downloaded)
+    if thumbs_dir.is_dir():
+        prune_thumbnails(thumbs_dir, {f"{p['shortcode']}.jpg" for p in posts})
+    return posts
+
+
+# -------------------------------------------------------------
+# Fallback: headless Chrome (selenium is imported only here)
+# -------------------------------------------------------------
+
+def normalize_post_href(href: Optional[str]) -> Optional[str]:
+    """
+    Canonical post URL for an anchor href, or None if it is not a post link.
+    /<username>/p/<code>/, query strings and fragments are normalized away.
+    """
+    if not href:
+        return None
+    m = POST_RE.match(urlparse(href).path)  # ignore query and fragment
+    if not m:
+        return None
+    return post_url(m.group(1), m.group(2))
+
+
+def post_urls_from_hrefs(hrefs: List[str], limit: int, debug: bool) -> List[str]:
+    out = dedupe([u for u in map(normalize_post_href, hrefs or []) if u])
 
     if debug:
         print(f"[NYRG][DEBUG] Found {len(out)} unique post-like URLs (pre-limit).")
@@ -141,7 +450,41 @@ def collect_post_urls(driver, limit: int, debug: bool) -> list:
     return out[:limit]
 
 
-def build_driver(headless: bool) -> webdriver.Chrome:
+def collect_post_urls(driver, limit: int, debug: bool) -> list:
+    """
+    Collect post URLs from the page's anchors in ONE WebDriver call (the page
+    filters its own anchors), then normalize to https://www.instagram.com/p/<code>/
+    """
+    return post_urls_from_hrefs(driver.execute_script(COLLECT_POSTS_JS), limit, debug)
+
+
+def wait_for_post_urls(driver, limit: int, timeout: float, debug: bool) -> Tuple[List[str], dict]:
+    """
+    Wait in the page (MutationObserver) until `limit` posts are linked or `timeout`
+    seconds pass, scrolling to make the grid load more. Returns as soon as there are
+    enough, in one WebDriver call. Returns (post URLs, {"scrolls", "mutations"}).
+    """
+    driver.set_script_timeout(timeout + 5)
+    result = driver.execute_async_script(WAIT_FOR_POSTS_JS, limit, int(timeout * 1000), SCROLL_INTERVAL_MS) or {}
+    return post_urls_from_hrefs(result.get("hrefs") or [], limit, debug), result
+
+
+def block_heavy_resources(driver) -> None:
+    """
+    Ask Chrome (over the DevTools Protocol) not to download images, video or fonts.
+    Only the post links are needed, and the media is most of the page's weight.
+    """
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except Exception as e:  # not Chrome / CDP unavailable: slower, but still works
+        print(f"[NYRG] Could not block media via CDP: {e}")
+
+
+def build_driver(headless: bool):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
     opts = Options()
 
     # If you ever need to log in manually, a persistent user data dir can help.
@@ -154,15 +497,20 @@ def build_driver(headless: bool) -> webdriver.Chrome:
     if headless:
         opts.add_argument("--headless=new")
 
+    # driver.get() returns once the HTML is parsed, without waiting for every image and video.
+    opts.page_load_strategy = "eager"
+    # No images, and none of the extras a scraper never uses.
+    opts.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    opts.add_argument("--blink-settings=imagesEnabled=false")
+    opts.add_argument("--mute-audio")
+    opts.add_argument("--disable-extensions")
+
     # Reduce noise and popups
     opts.add_argument("--disable-notifications")
     opts.add_argument("--lang=en-US")
 
     # Slightly more "real browser" feel (may help in some cases)
-    opts.add_argument(
-        "--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
-        "(KHTML, like Gecko) Chrome/122 Safari/537.36"
-    )
+    opts.add_argument(f"--user-agent={USER_AGENT}")
 
     # Linux stability flags
     opts.add_argument("--no-sandbox")
@@ -172,6 +520,7 @@ def build_driver(headless: bool) -> webdriver.Chrome:
 
     driver = webdriver.Chrome(options=opts)
     driver.set_window_size(1200, 900)
+    block_heavy_resources(driver)
     return driver
 
 
@@ -180,6 +529,9 @@ def try_click(driver, by, value, timeout: int = 2) -> bool:
     Best-effort click helper for cookie banners / overlays.
     It is fine if this does nothing.
     """
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
     try:
         el = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((by, value)))
         el.click()
@@ -188,31 +540,33 @@ def try_click(driver, by, value, timeout: int = 2) -> bool:
         return False
 
 
-def main() -> int:
-    profile_url = env_str("NYRG_IG_PROFILE_URL", DEFAULT_PROFILE_URL)
-    limit = max(1, env_int("NYRG_IG_LIMIT", DEFAULT_LIMIT))
-    json_path = Path(env_str("NYRG_IG_JSON_PATH", str(REPO_ROOT / "data" / "instagram.json")))
-    headless = env_bool("NYRG_IG_HEADLESS", True)
-    debug = env_bool("NYRG_IG_DEBUG", False)
-
-    # Do not create or overwrite JSON on startup. Only write after success.
-    if debug:
-        print("[NYRG][DEBUG] profile_url:", profile_url)
-        print("[NYRG][DEBUG] limit:", limit)
-        print("[NYRG][DEBUG] json_path:", json_path)
-        print("[NYRG][DEBUG] headless:", headless)
+def scrape_with_selenium(
+    profile_url: str, limit: int, headless: bool, debug: bool, wait_seconds: float = DEFAULT_WAIT_SECONDS
+) -> Optional[List[str]]:
+    """
+    Load the profile in Chrome and collect post URLs from the grid.
+    Returns None if the page is blocked (login wall in headless mode, no selenium).
+    """
+    try:
+        from selenium.webdriver.common.by import By
+    except ImportError as e:
+        print(f"[NYRG] Selenium is not installed ({e}); cannot fall back to the browser.")
+        return None
 
-    driver = build_driver(headless=headless)
+    metrics = run_metrics.current()
+    with metrics.phase("start_browser"):
+        driver = build_driver(headless=headless)
 
     try:
-        driver.get(profile_url)
+        with metrics.phase("load_profile"):
+            driver.get(profile_url)
 
         # If IG shows a login page, we cannot scrape reliably without auth.
         # In headed mode, you might log in manually. In headless mode, treat as blocked.
         if "accounts/login" in driver.current_url:
             if headless:
                 print("[NYRG] Login wall detected in headless mode. Not updating JSON.")
-                return 0
+                return None
             print("[NYRG] Login page detected. Log in manually in the browser window.")
             print("[NYRG] After logging in, leave the window open for ~60 seconds.")
             time.sleep(60)
@@ -223,8 +577,6 @@ def main() -> int:
 
         debug_screenshot(driver, REPO_ROOT / "scripts" / "debug_instagram.png", debug, "initial")
 
-        wait = WebDriverWait(driver, 15)
-
         # Cookie / consent popups vary. Best-effort.
         try_click(driver, By.XPATH, "//button[contains(., 'Allow all')]", timeout=3)
         try_click(driver, By.XPATH, "//button[contains(., 'Accept all')]", timeout=3)
@@ -233,45 +585,88 @@ def main() -> int:
         # Sometimes there is a close button on overlays
         try_click(driver, By.CSS_SELECTOR, "svg[aria-label='Close']", timeout=2)
 
-        # Wait until anchors exist. Even blocked pages have anchors, but this prevents early scraping.
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "a[href]")))
+        # Wait (inside the page) until the grid links enough posts, scrolling to load more.
+        # Returns as soon as there are `limit` posts; gives up after wait_seconds.
+        with metrics.phase("collect_posts"):
+            urls, stats = wait_for_post_urls(driver, limit, wait_seconds, debug)
+        print(f"[NYRG] Found {len(urls)} post URLs ({stats.get('scrolls', 0)} scrolls)")
+        metrics.set_items("scroll_passes", stats.get("scrolls", 0))
+        metrics.set_items("dom_mutations", stats.get("mutations", 0))
 
-        urls = []
+        debug_screenshot(driver, REPO_ROOT / "scripts" / "debug_instagram_after_scroll.png", debug, "after_scroll")
+        return urls
 
-        # Scroll a few times to encourage the grid to load.
-        for i in range(5):
-            time.sleep(2)
-            urls = collect_post_urls(driver, limit=limit, debug=debug)
-            print(f"[NYRG] Pass {i + 1}: found {len(urls)} post URLs")
-            if len(urls) >= limit:
-                break
-            driver.find_element(By.TAG_NAME, "body").send_keys(Keys.END)
+    finally:
+        # Keep this short. If you want to watch the browser, set NYRG_IG_HEADLESS=0.
+        time.sleep(1)
+        driver.quit()
 
-        debug_screenshot(driver, REPO_ROOT / "scripts" / "debug_instagram_after_scroll.png", debug, "after_scroll")
 
-        # If we did not find enough URLs, do not update JSON.
-        if len(urls) < limit:
-            print(f"[NYRG] Found only {len(urls)} post URLs. Likely blocked or page did not load posts.")
-            print("[NYRG] Not updating instagram.json.")
+def main(json_path: Optional[Path] = None, home_path: Optional[Path] = None) -> int:
+    profile_url = env_str("NYRG_IG_PROFILE_URL", DEFAULT_PROFILE_URL)
+    limit = max(1, env_int("NYRG_IG_LIMIT", DEFAULT_LIMIT))
+    json_path = json_path or Path(env_str("NYRG_IG_JSON_PATH", str(REPO_ROOT / "data" / "instagram.json")))
+    headless = env_bool("NYRG_IG_HEADLESS", True)
+    debug = env_bool("NYRG_IG_DEBUG", False)
+    mode = env_str("NYRG_IG_MODE", "auto").lower()
+    wait_seconds = max(1, env_int("NYRG_IG_WAIT_SECONDS", DEFAULT_WAIT_SECONDS))
+    thumbs_dir = Path(env_str("NYRG_IG_THUMBS_DIR", str(DEFAULT_THUMBS_DIR)))
+
+    # Do not create or overwrite JSON on startup. Only write after success.
+    if debug:
+        print("[NYRG][DEBUG] profile_url:", profile_url)
+        print("[NYRG][DEBUG] limit:", limit)
+        print("[NYRG][DEBUG] json_path:", json_path)
+        print("[NYRG][DEBUG] headless:", headless)
+        print("[NYRG][DEBUG] mode:", mode)
+
+    metrics = run_metrics.current()
+    urls: List[str] = []
+    meta: Dict[str, dict] = {}
+
+    if mode in ("auto", "http"):
+        with metrics.phase("http_fast_path"):
+            urls = fetch_posts_http(profile_url, limit, debug, meta)
+        metrics.set_items("fast_path_hit", 1 if len(urls) >= limit else 0)
+        print(f"[NYRG] HTTP fast path: found {len(urls)} post URLs")
+
+    if len(urls) < limit and mode in ("auto", "selenium"):
+        if mode == "auto":
+            print("[NYRG] Falling back to the browser.")
+        browser_urls = scrape_with_selenium(profile_url, limit, headless, debug, wait_seconds)
+        if browser_urls is None:
+            metrics.set_outcome("skipped")
             return 0
+        urls = browser_urls
+
+    # If we did not find enough URLs, do not update JSON.
+    if len(urls) < limit:
+        print(f"[NYRG] Found only {len(urls)} post URLs. Likely blocked or page did not load posts.")
+        print("[NYRG] Not updating instagram.json.")
+        metrics.set_items("posts", len(urls))
+        metrics.set_outcome("skipped")
+        return 0
 
-        payload = {
-            "_comment": "THIS FILE IS AUTO-GENERATED. DO NOT EDIT MANUALLY. Edit the source or run the generator script instead.",
-            "source": profile_url,
-            "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
-            "count": len(urls),
-            "posts": [{"url": u} for u in urls],
-        }
+    previous = feed_diff.load_json(json_path) or {}
+    with metrics.phase("thumbnails"):
+        posts = build_posts(urls, meta, previous.get("posts") or [], thumbs_dir)
 
-        safe_write_json(json_path, payload)
-        print(f"[NYRG] Wrote {len(urls)} URLs to {json_path}")
-        return 0
+    payload = {
+        "_comment": "THIS FILE IS AUTO-GENERATED. DO NOT EDIT MANUALLY. Edit the source or run the generator script instead.",
+        "source": profile_url,
+        "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "count": len(posts),
+        "posts": posts,
+    }
 
-    finally:
-        # Keep this short. If you want to watch the browser, set NYRG_IG_HEADLESS=0.
-        time.sleep(1)
-        driver.quit()
+    written = safe_write_json(json_path, payload)
+    home_bundle.update_section("instagram", home_bundle.instagram_section(posts), home_path)
+    metrics.set_items("posts", len(urls))
+    metrics.set_items("files_unchanged", 0 if written else 1)
+    if written:
+        print(f"[NYRG] Wrote {len(posts)} posts to {json_path}")
+    return 0
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(run_metrics.run_main("instagram", main))
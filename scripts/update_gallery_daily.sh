@@ -38,6 +38,9 @@ fi
 # Required env vars (provided by systemd EnvironmentFile):
 # - GOOGLE_API_KEY
 # - NYRG_GDRIVE_FOLDER_ID
+#
+# Optional:
+# - NYRG_GALLERY_SHARDS_DIR (e.g. data/gallery) to also write/commit the sharded layout
 # ============================================================
 REPO_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 cd "$REPO_DIR"
@@ -58,11 +61,12 @@ fi
 
 if [[ "$SKIP_GIT" == "0" ]]; then
   # Safety: do not run if there are unrelated uncommitted changes
-  # Allow ONLY data/gallery.json to change (everything else must be clean).
+  # Allow ONLY data/gallery.json, its page cards, the homepage bundle and the search index to change
+  # (everything else must be clean).
   if git status --porcelain --untracked-files=no \
-    | grep -vqE "^[ MARC?]{1,2}[[:space:]]+$JSON_PATH$"
+    | grep -vqE "^[ MARC?]{1,2}[[:space:]]+($JSON_PATH|_includes/gallery_cards\.html|data/home\.json|data/search/.*)$"
   then
-    echo "[NYRG] Working tree has unrelated changes (not $JSON_PATH). Commit or stash them first."
+    echo "[NYRG] Working tree has unrelated changes (not $JSON_PATH / gallery cards / data/home.json / data/search). Commit or stash them first."
     git status --porcelain
     exit 1
   fi
@@ -77,12 +81,25 @@ fi
 
 if [[ "$SKIP_GIT" == "0" ]]; then
   # Safety: do not commit empty results (usually means network or permissions issue)
-  if python3 -c 'import json; d=json.load(open("data/gallery.json")); print(len(d.get("images", [])), len(d.get("events", [])))' | awk '{exit !($1==0 && $2==0)}'; then
+  if python3 -c 'import json; d=json.load(open("data/gallery.json")); print(d.get("count", len(d.get("images", []))), len(d.get("events", [])))' | awk '{exit !($1==0 && $2==0)}'; then
     echo "[NYRG] gallery.json contains 0 images and 0 events. Aborting commit."
     exit 1
   fi
 
   git add "$JSON_PATH"
+  # Pre-rendered Gallery page cards (scripts/gallery_cards.py).
+  if [[ -f _includes/gallery_cards.html ]]; then git add _includes/gallery_cards.html; fi
+  # Homepage bundle (scripts/home_bundle.py): the rotator sample comes from the gallery.
+  if [[ -f data/home.json ]]; then git add data/home.json; fi
+
+  # Optional sharded layout (update_gallery_json.py --shards-dir / NYRG_GALLERY_SHARDS_DIR).
+  # -A so that deleted (outdated) shards are committed too.
+  if [[ -n "${NYRG_GALLERY_SHARDS_DIR:-}" && -d "$NYRG_GALLERY_SHARDS_DIR" ]]; then
+    git add -A "$NYRG_GALLERY_SHARDS_DIR"
+  fi
+
+  # Site search index (scripts/search_index.py). -A also stages deleted term shards.
+  if [[ -d data/search ]]; then git add -A data/search; fi
 
   if git diff --cached --quiet; then
     echo "[NYRG] No changes to commit."
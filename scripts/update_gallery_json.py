@@ -14,6 +14,22 @@ Optional external events (Google Sheet published as CSV):
 or:
   python3 update_gallery_json.py ... --external-events-csv "https://...output=csv"
 
+Options (flag or env var, all optional):
+  --workers N / NYRG_GALLERY_WORKERS            list folders in parallel
+  --manifest PATH / NYRG_GALLERY_MANIFEST       incremental runs (re-list changed folders only)
+  --batch-parents N / NYRG_GALLERY_BATCH_PARENTS  folders listed per Drive request
+  --shards-dir DIR / NYRG_GALLERY_SHARDS_DIR    also write per-event shards + manifest
+  --schema 2 / NYRG_GALLERY_SCHEMA              compact column layout (1 is the default)
+  --variant-widths 400,800 / NYRG_GALLERY_VARIANT_WIDTHS  responsive thumbnail URLs
+  --placeholders / NYRG_GALLERY_PLACEHOLDERS    dominant-colour placeholders (numpy + Pillow)
+  --cards-out, --home-out, --search-dir         side outputs (default: next to --out)
+  NYRG_FORCE_WRITE=1                            write even when only updated_at changed
+  NYRG_DRIVE_FILES_ENDPOINT                     another files API (e.g. benchmarks/mock_drive.py)
+
+Details: docs/automation/scripts-overview.md, and the shared helpers this script uses
+(http_cache.py, rate_limit.py, run_metrics.py, feed_diff.py, gallery_cards.py,
+home_bundle.py, search_index.py).
+
 Notes:
 - Uses Google Drive v3 REST API via an API key.
 - Works for publicly accessible folders/files.
@@ -24,18 +40,40 @@ from __future__ import annotations
 
 import argparse
 import csv
+import hashlib
+import heapq
 import json
 import os
 import re
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from io import StringIO
-from typing import List, Optional, Tuple
+from io import BytesIO, StringIO
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import requests
 
+import feed_diff
+import gallery_cards
+import home_bundle
+import run_metrics
+import search_index
+from http_cache import default_cache, shared_session
+
+try:
+    import orjson  # optional: faster JSON encoding/decoding for big galleries
+except ImportError:
+    orjson = None
+
 
-DRIVE_FILES_ENDPOINT = "https://www.googleapis.com/drive/v3/files"
+# Override with NYRG_DRIVE_FILES_ENDPOINT to run against a local stand-in
+# (see scripts/benchmarks/mock_drive.py).
+DRIVE_FILES_ENDPOINT = (
+    os.environ.get("NYRG_DRIVE_FILES_ENDPOINT", "").strip().rstrip("/")
+    or "https://www.googleapis.com/drive/v3/files"
+)
 
 # High caps are fine for you right now (few folders, ~10-20 images per folder).
 MAX_IMAGES_PER_EVENT = 200
@@ -44,6 +82,35 @@ MAX_EVENTS_FROM_DRIVE = 50
 # Exclusion rule: anything starting with this prefix is not included on the website.
 EXCLUDE_PREFIXES = ["(not for website)"]
 
+# Parallel Drive listing (1 = sequential, the original behavior).
+DEFAULT_WORKERS = 1
+
+# Batched Drive listing: folders per files.list query (0 = one query per folder).
+# Each parent adds ~50 characters to the URL, so keep this well under ~100.
+DEFAULT_BATCH_PARENTS = 0
+
+# Incremental mode checks cached folders for changes this many at a time (one light
+# OR'ed listing each), even when --batch-parents is off.
+SIGNATURE_BATCH_PARENTS = 40
+
+# Fields requested for every child in a folder listing.
+DRIVE_CHILD_FIELDS = (
+    "id, name, mimeType, webViewLink, description, modifiedTime, "
+    "shortcutDetails(targetId,targetMimeType), imageMediaMetadata(width,height,rotation,time)"
+)
+
+# The published gallery.json. Companion outputs (page cards) default to their place in the
+# repo only when --out is this file; any other --out gets them next to it instead.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PUBLISHED_GALLERY_JSON = os.path.join(REPO_ROOT, "data", "gallery.json")
+
+# Placeholder colours (optional stage, needs numpy + Pillow).
+DEFAULT_PLACEHOLDER_CACHE = os.path.join("~", ".cache", "nyrg", "gallery_placeholders.json")
+PLACEHOLDER_SAMPLE_WIDTH = 32
+
+FOLDER_MIME = "application/vnd.google-apps.folder"
+SHORTCUT_MIME = "application/vnd.google-apps.shortcut"
+
 # -------------------------------------------------------------
 # Collaborator tips (content maintainers)
 # -------------------------------------------------------------
@@ -58,10 +125,33 @@ EXCLUDE_PREFIXES = ["(not for website)"]
 
 
 
+def companion_path(out: str, published_default: str, name: str) -> str:
+    """
+    Default path of an output written together with gallery.json: published_default when
+    --out is the published data/gallery.json, else `name` next to --out (so test and
+    benchmark runs never touch the site).
+    """
+    if os.path.abspath(out) == PUBLISHED_GALLERY_JSON:
+        return published_default
+    return os.path.join(os.path.dirname(os.path.abspath(out)), name)
+
+
 def iso_utc_now() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
+def http_session(pool_size: int = DEFAULT_WORKERS) -> requests.Session:
+    """
+    Return the process-wide HTTP session (created on first use, shared with the
+    other scripts when they run in the same process; see http_cache.shared_session).
+
+    One session means one keep-alive connection pool, so we pay the TLS handshake
+    once per host instead of once per request. The pool is sized for the worker
+    count requested by the first caller.
+    """
+    return shared_session(pool_size)
+
+
 def drive_list_children(
     api_key: str,
     parent_id: str,
@@ -76,16 +166,31 @@ def drive_list_children(
       those params can trigger hard 400s in some setups when using API-key access.
     - If you later need Shared Drive support, we can add an opt-in switch.
     """
+    return drive_files_list(
+        api_key,
+        q=f"'{parent_id}' in parents and trashed=false",
+        fields=f"nextPageToken, files({DRIVE_CHILD_FIELDS})",
+        page_token=page_token,
+    )
+
+
+def drive_files_list(
+    api_key: str,
+    q: str,
+    fields: str,
+    page_token: str | None = None,
+) -> Tuple[List[dict], str | None]:
+    """One files.list call (one page). Returns (files, nextPageToken)."""
     params = {
         "key": api_key,
-        "q": f"'{parent_id}' in parents and trashed=false",
-        "fields": "nextPageToken, files(id, name, mimeType, webViewLink, description, shortcutDetails(targetId,targetMimeType))",
+        "q": q,
+        "fields": fields,
         "pageSize": 1000,
     }
     if page_token:
         params["pageToken"] = page_token
 
-    r = requests.get(DRIVE_FILES_ENDPOINT, params=params, timeout=30)
+    r = default_cache().get(DRIVE_FILES_ENDPOINT, params=params, timeout=30, session=http_session())
 
     # If Google returns a helpful JSON error, print it.
     if r.status_code >= 400:
@@ -98,6 +203,282 @@ def drive_list_children(
     data = r.json()
     return data.get("files", []), data.get("nextPageToken")
 
+
+def drive_list_all_children(api_key: str, parent_id: str) -> List[dict]:
+    """List direct children of a Drive folder, following every page."""
+    out: List[dict] = []
+    token = None
+    while True:
+        files, token = drive_list_children(api_key, parent_id, token)
+        out.extend(files)
+        if not token:
+            return out
+
+
+def drive_list_children_batched(
+    api_key: str,
+    parent_ids: List[str],
+    child_fields: str = DRIVE_CHILD_FIELDS,
+) -> Dict[str, List[dict]]:
+    """
+    List the direct children of several folders with one OR'ed query:
+      ('a' in parents or 'b' in parents ...) and trashed=false
+
+    Every child comes back with its `parents`, which we use to route it to the
+    folder(s) we asked about. Returns {parent_id: children} for every requested ID
+    (empty list if a folder has no children). `child_fields` narrows the listing
+    (see list_child_signatures).
+    """
+    wanted = list(dict.fromkeys(parent_ids))
+    out: Dict[str, List[dict]] = {pid: [] for pid in wanted}
+    if not wanted:
+        return out
+
+    clause = " or ".join(f"'{pid}' in parents" for pid in wanted)
+    q = f"({clause}) and trashed=false"
+    token = None
+    while True:
+        files, token = drive_files_list(
+            api_key,
+            q=q,
+            fields=f"nextPageToken, files({child_fields}, parents)",
+            page_token=token,
+        )
+        for f in files:
+            # Strip `parents` so children look exactly like a single-folder listing.
+            child = {k: v for k, v in f.items() if k != "parents"}
+            for pid in f.get("parents") or []:
+                if pid in out:
+                    out[pid].append(child)
+        if not token:
+            return out
+
+
+def list_folders(
+    api_key: str,
+    folder_ids: List[str],
+    pool: ThreadPoolExecutor,
+    batch_parents: int = DEFAULT_BATCH_PARENTS,
+) -> Dict[str, List[dict]]:
+    """
+    List the children of many folders at once (one depth level of a traversal).
+
+    - batch_parents > 1: chunks of folders per OR'ed query (see drive_list_children_batched)
+    - otherwise: one listing per folder
+    Requests run concurrently on `pool` either way.
+    """
+    if batch_parents > 1:
+        chunks = [folder_ids[i:i + batch_parents] for i in range(0, len(folder_ids), batch_parents)]
+        out: Dict[str, List[dict]] = {}
+        for part in pool.map(lambda chunk: drive_list_children_batched(api_key, chunk), chunks):
+            out.update(part)
+        return out
+
+    return dict(zip(folder_ids, pool.map(lambda fid: drive_list_all_children(api_key, fid), folder_ids)))
+
+
+def child_folder_ids(files: Iterable[dict]) -> List[str]:
+    """Folder IDs a walk would descend into: normal folders plus shortcut targets."""
+    out: List[str] = []
+    for f in files:
+        mime = f.get("mimeType", "")
+        if mime == FOLDER_MIME and f.get("id"):
+            out.append(f["id"])
+        elif mime == SHORTCUT_MIME:
+            sd = f.get("shortcutDetails") or {}
+            if sd.get("targetMimeType") == FOLDER_MIME and sd.get("targetId"):
+                out.append(sd["targetId"])
+    return out
+
+
+def prefetch_drive_listings(
+    api_key: str,
+    root_folder_ids: List[str],
+    workers: int,
+    batch_parents: int = DEFAULT_BATCH_PARENTS,
+) -> Dict[str, List[dict]]:
+    """
+    List every folder reachable from root_folder_ids, one depth level at a time,
+    with up to `workers` listings in flight (and `batch_parents` folders per
+    request when batching is on, so a level costs a handful of requests).
+
+    Returns {folder_id: children}. Feed it to walk_drive_folder_collect_images()
+    so the walk itself makes no API calls. The walk replays the exact sequential
+    traversal order, so the collected images are identical to the sequential mode.
+
+    Trade-off: the sequential walk stops listing once an event hits max_images;
+    the prefetch always lists the whole tree. That only costs extra requests for
+    events above MAX_IMAGES_PER_EVENT.
+    """
+    listings: Dict[str, List[dict]] = {}
+    level = list(dict.fromkeys(root_folder_ids))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), **run_metrics.pool_kwargs()) as pool:
+        while level:
+            results = list_folders(api_key, level, pool, batch_parents)
+            next_level: List[str] = []
+            queued = set()
+            for folder_id in level:
+                files = results[folder_id]
+                listings[folder_id] = files
+                for child_id in child_folder_ids(files):
+                    if child_id not in listings and child_id not in queued:
+                        queued.add(child_id)
+                        next_level.append(child_id)
+            level = [fid for fid in next_level if fid not in listings]
+
+    return listings
+
+
+# -------------------------------------------------------------
+# Incremental mode: persistent per-folder manifest
+# -------------------------------------------------------------
+# The manifest is a local cache (keep it OUT of the repo, e.g. ~/.cache/nyrg/).
+# Shape:
+#   {
+#     "version": 3,
+#     "max_images": 200,
+#     "folders": {folder_id: {"signature": "...", "children": [...]}},
+#     "events":  {event_folder_id: {"folders": [subtree folder ids], "images": [...]}}
+#   }
+# -------------------------------------------------------------
+
+# Bump when the cached listings/images change shape (2: imageMediaMetadata, 3: child signatures).
+MANIFEST_VERSION = 3
+
+
+def load_gallery_manifest(path: str) -> dict:
+    """Load the incremental manifest. Missing, unreadable or outdated files start empty."""
+    empty = {"version": MANIFEST_VERSION, "max_images": MAX_IMAGES_PER_EVENT, "folders": {}, "events": {}}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return empty
+    except Exception as e:
+        print(f"[NYRG] WARNING: ignoring unreadable manifest {path}: {e}", file=sys.stderr)
+        return empty
+
+    if data.get("version") != MANIFEST_VERSION:
+        return empty
+    if data.get("max_images") != MAX_IMAGES_PER_EVENT:
+        # Cached images were capped differently; folder listings are still valid.
+        data["events"] = {}
+        data["max_images"] = MAX_IMAGES_PER_EVENT
+    data.setdefault("folders", {})
+    data.setdefault("events", {})
+    return data
+
+
+def save_gallery_manifest(path: str, manifest: dict) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def child_signature(children: Iterable[dict]) -> str:
+    """Digest of a folder's child set: every child's ID and modifiedTime."""
+    parts = sorted(f"{c.get('id', '')}:{c.get('modifiedTime', '')}" for c in children)
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def list_child_signatures(
+    api_key: str,
+    folder_ids: List[str],
+    pool: ThreadPoolExecutor,
+    batch_parents: int = DEFAULT_BATCH_PARENTS,
+) -> Dict[str, str]:
+    """
+    child_signature() of many folders, from batched listings that only ask for the
+    children's IDs and modifiedTimes (much smaller than a full listing).
+
+    A folder's own modifiedTime is not enough: Drive does not reliably bump it when
+    files are added, so the child set itself is compared.
+    """
+    size = batch_parents if batch_parents > 1 else SIGNATURE_BATCH_PARENTS
+    chunks = [folder_ids[i:i + size] for i in range(0, len(folder_ids), size)]
+    out: Dict[str, str] = {}
+    for part in pool.map(lambda chunk: drive_list_children_batched(api_key, chunk, "id, modifiedTime"), chunks):
+        out.update({fid: child_signature(children) for fid, children in part.items()})
+    return out
+
+
+def refresh_drive_listings_incremental(
+    api_key: str,
+    event_folders: List[dict],
+    cached_folders: Dict[str, dict],
+    workers: int,
+    batch_parents: int = DEFAULT_BATCH_PARENTS,
+) -> Tuple[Dict[str, dict], set]:
+    """
+    Walk the Drive tree level by level, re-listing only folders whose child set
+    differs from the manifest (or that are new).
+
+    Per level:
+    - Cached folders: one light batched listing per SIGNATURE_BATCH_PARENTS folders
+      gives their current child signatures (list_child_signatures).
+    - Folders that are new or whose signature changed get a full listing.
+
+    Returns (folders, changed):
+    - folders: new manifest "folders" section (only folders reachable this run)
+    - changed: IDs whose child listing differs from the manifest (new or edited)
+    """
+    folders: Dict[str, dict] = {}
+    changed: set = set()
+
+    level: List[str] = list(dict.fromkeys(f["id"] for f in event_folders))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), **run_metrics.pool_kwargs()) as pool:
+        while level:
+            cached = [fid for fid in level if (cached_folders.get(fid) or {}).get("signature")]
+            signatures = list_child_signatures(api_key, cached, pool, batch_parents)
+
+            # Re-list only what changed.
+            stale = [
+                fid for fid in level
+                if fid not in signatures or signatures[fid] != cached_folders[fid]["signature"]
+            ]
+            fresh = list_folders(api_key, stale, pool, batch_parents)
+
+            next_level: List[str] = []
+            queued = set()
+            for fid in level:
+                if fid in fresh:
+                    children = fresh[fid]
+                    if children != (cached_folders.get(fid) or {}).get("children"):
+                        changed.add(fid)
+                    signature = child_signature(children)
+                else:
+                    children = cached_folders[fid]["children"]
+                    signature = signatures[fid]
+                folders[fid] = {"signature": signature, "children": children}
+
+                for child_id in child_folder_ids(children):
+                    if child_id in folders or child_id in queued:
+                        continue
+                    queued.add(child_id)
+                    next_level.append(child_id)
+
+            level = [fid for fid in next_level if fid not in folders]
+
+    return folders, changed
+
+
+def subtree_folder_ids(root_folder_id: str, listings: Dict[str, List[dict]]) -> List[str]:
+    """All folder IDs reachable from root_folder_id in `listings` (root included), sorted."""
+    seen = set()
+    stack = [root_folder_id]
+    while stack:
+        fid = stack.pop()
+        if fid in seen:
+            continue
+        seen.add(fid)
+        stack.extend(child_folder_ids(listings.get(fid, [])))
+    return sorted(seen)
+
+
 def is_excluded_folder(name: str) -> bool:
     n = (name or "").strip().lower()
     return any(n.startswith(p.lower()) for p in EXCLUDE_PREFIXES)
@@ -202,16 +583,176 @@ def parse_month_from_name(name: str) -> Optional[str]:
     return None
 
 
+THUMBNAIL_MAX_WIDTH = 2000
+THUMBNAIL_URL_TEMPLATE = "https://drive.google.com/thumbnail?id={id}&sz=w2000"
+THUMBNAIL_VARIANT_TEMPLATE = "https://drive.google.com/thumbnail?id={id}&sz=w{w}"
+
+# webViewLink shapes we can rebuild from the ID (schema 2 stores the index instead).
+# 0: what the Drive API returns for files, 1: what we build for shortcuts.
+VIEW_LINK_TEMPLATES = [
+    "https://drive.google.com/file/d/{id}/view?usp=drivesdk",
+    "https://drive.google.com/file/d/{id}/view",
+]
+
+
 def drive_thumbnail_url(file_id: str) -> str:
-    return f"https://drive.google.com/thumbnail?id={file_id}&sz=w2000"
+    return THUMBNAIL_URL_TEMPLATE.format(id=file_id)
+
+
+def parse_variant_widths(raw: str) -> List[int]:
+    """Parse "400,800,1200" into sorted unique widths below the full size (bad parts are skipped)."""
+    widths = set()
+    for part in (raw or "").split(","):
+        part = part.strip()
+        if part.isdigit() and 0 < int(part) < THUMBNAIL_MAX_WIDTH:
+            widths.add(int(part))
+    return sorted(widths)
+
+
+def drive_thumbnail_variants(file_id: str, widths: List[int]) -> List[dict]:
+    """Thumbnail URLs for each width, smallest first, ending with the full-size URL."""
+    out = [{"w": w, "url": THUMBNAIL_VARIANT_TEMPLATE.format(id=file_id, w=w)} for w in widths]
+    out.append({"w": THUMBNAIL_MAX_WIDTH, "url": drive_thumbnail_url(file_id)})
+    return out
+
+
+def add_image_variants(events: List[dict], widths: List[int]) -> None:
+    """
+    Pipeline stage: record responsive variants on every Drive image (in place).
+
+    Drive renders any width on demand, so this costs no requests here; the browser
+    downloads only the size it picks.
+    """
+    for ev in events:
+        for img in ev.get("images") or []:
+            img["variants"] = drive_thumbnail_variants(img["id"], widths)
+
+
+def image_media_fields(meta: Optional[dict]) -> dict:
+    """
+    width/height/taken_at from Drive's imageMediaMetadata (only the keys Drive knows).
+
+    Drive reports the stored pixel size; rotation 1 or 3 (90/270 degrees) means the
+    displayed image is the other way round, so we swap.
+    """
+    meta = meta or {}
+    out: dict = {}
+    w, h = meta.get("width"), meta.get("height")
+    if w and h:
+        if meta.get("rotation") in (1, 3):
+            w, h = h, w
+        out["width"] = w
+        out["height"] = h
+
+    # EXIF style "2024:05:01 18:22:11" -> "2024-05-01T18:22:11"
+    m = re.match(r"^(\d{4}):(\d{2}):(\d{2})[ T](\d{2}:\d{2}:\d{2})", meta.get("time") or "")
+    if m:
+        out["taken_at"] = f"{m.group(1)}-{m.group(2)}-{m.group(3)}T{m.group(4)}"
+    return out
+
+
+def dominant_color(content: bytes) -> str:
+    """
+    Dominant colour of an image as "#rrggbb" (vectorized with NumPy).
+
+    Pixels are bucketed into 8x8x8 colour bins; the result is the mean colour of
+    the most populated bin, which avoids the muddy grey a plain average gives.
+    """
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(BytesIO(content)) as im:
+        rgb = im.convert("RGB")
+        rgb.thumbnail((PLACEHOLDER_SAMPLE_WIDTH, PLACEHOLDER_SAMPLE_WIDTH))
+        px = np.asarray(rgb, dtype=np.uint8).reshape(-1, 3)
+
+    bins = (px >> 5).astype(np.int32)
+    keys = bins[:, 0] * 64 + bins[:, 1] * 8 + bins[:, 2]
+    top = np.bincount(keys, minlength=512).argmax()
+    r, g, b = px[keys == top].mean(axis=0).round().astype(int)
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def fetch_placeholder(file_id: str) -> str:
+    """Download a tiny Drive thumbnail and return its dominant colour."""
+    url = THUMBNAIL_VARIANT_TEMPLATE.format(id=file_id, w=PLACEHOLDER_SAMPLE_WIDTH)
+    r = default_cache().get(url, timeout=30, session=http_session())
+    r.raise_for_status()
+    return dominant_color(r.content)
+
+
+def placeholders_available() -> bool:
+    try:
+        import numpy  # noqa: F401
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def load_placeholder_cache(path: str) -> Dict[str, str]:
+    """{file_id: "#rrggbb"}; a missing or unreadable cache starts empty."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"[NYRG] WARNING: ignoring unreadable placeholder cache {path}: {e}", file=sys.stderr)
+        return {}
+
+
+def save_placeholder_cache(path: str, cache: Dict[str, str]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def add_image_placeholders(events: List[dict], cache: Dict[str, str], pool: ThreadPoolExecutor) -> int:
+    """
+    Optional pipeline stage: set img["placeholder"] on every Drive image (in place).
+
+    Colours are cached by file ID in `cache` (a Drive file's pixels never change under
+    the same ID), so each image is downloaded once, ever. Failures are skipped, not
+    cached. Returns how many new colours were computed.
+    """
+    all_ids = {img["id"] for ev in events for img in ev.get("images") or []}
+    missing = sorted(all_ids - set(cache))
+
+    def compute(file_id: str) -> Tuple[str, str]:
+        try:
+            return file_id, fetch_placeholder(file_id)
+        except Exception as e:
+            print(f"[NYRG] WARNING: placeholder failed for {file_id}: {e}", file=sys.stderr)
+            return file_id, ""
+
+    computed = 0
+    for file_id, color in pool.map(compute, missing):
+        if color:
+            cache[file_id] = color
+            computed += 1
+
+    for ev in events:
+        for img in ev.get("images") or []:
+            if img["id"] in cache:
+                img["placeholder"] = cache[img["id"]]
+    return computed
 
 
 def walk_drive_folder_collect_images(
     api_key: str,
     root_folder_id: str,
     max_images: int,
+    listings: Optional[Dict[str, List[dict]]] = None,
 ) -> List[dict]:
-    """Recursively walk a Drive folder and collect up to max_images image files."""
+    """
+    Recursively walk a Drive folder and collect up to max_images image files.
+
+    If `listings` is given (see prefetch_drive_listings), children are read from it
+    instead of calling the Drive API.
+    """
     stack = [root_folder_id]
     seen_folders = set()
     images: List[dict] = []
@@ -224,7 +765,10 @@ def walk_drive_folder_collect_images(
         token = None
 
         while True:
-            files, token = drive_list_children(api_key, folder_id, token)
+            if listings is not None:
+                files, token = listings.get(folder_id, []), None
+            else:
+                files, token = drive_list_children(api_key, folder_id, token)
 
             for f in files:
                 mime = f.get("mimeType", "")
@@ -249,7 +793,7 @@ def walk_drive_folder_collect_images(
                             "name": f.get("name", "") or target_id,
                             "mimeType": target_mime,
                             "url": drive_thumbnail_url(target_id),
-                            "webViewLink": f"https://drive.google.com/file/d/{target_id}/view",
+                            "webViewLink": VIEW_LINK_TEMPLATES[1].format(id=target_id),
                         })
                         if len(images) >= max_images:
                             break
@@ -266,13 +810,15 @@ def walk_drive_folder_collect_images(
                 # Normal image file: include it
                 if mime.startswith("image/"):
                     file_id = f["id"]
-                    images.append({
+                    img = {
                         "id": file_id,
                         "name": f.get("name", ""),
                         "mimeType": mime,
                         "url": drive_thumbnail_url(file_id),
                         "webViewLink": f.get("webViewLink", ""),
-                    })
+                    }
+                    img.update(image_media_fields(f.get("imageMediaMetadata")))
+                    images.append(img)
 
                     if len(images) >= max_images:
                         break
@@ -326,7 +872,7 @@ def fetch_external_events_from_csv(csv_url: str) -> List[dict]:
     if not csv_url:
         return []
 
-    r = requests.get(csv_url, timeout=30, allow_redirects=True)
+    r = default_cache().get(csv_url, timeout=30, session=http_session())
     r.raise_for_status()
 
     buf = StringIO(r.text)
@@ -371,7 +917,408 @@ def month_sort_key(month: str) -> str:
     return "0000-00"
 
 
-def main() -> int:
+# -------------------------------------------------------------
+# Schema 2 (compact) gallery.json
+# -------------------------------------------------------------
+# {
+#   "schema": 2,
+#   "thumb_url": "https://drive.google.com/thumbnail?id={id}&sz=w2000",
+#   "view_links": [...VIEW_LINK_TEMPLATES],
+#   "mime_types": ["image/jpeg", ...],
+#   "variant_url": ".../thumbnail?id={id}&sz=w{w}", "variant_widths": [400, ..., 2000],  (if --variant-widths)
+#   "images": {"id": [...], "name": [...], "mime": [0, ...], "link": [0, 1, "https://literal", ...],
+#              plus optional columns "width", "height", "taken_at", "placeholder" (null = unknown)
+#              and "url", "variants" (null = rebuilt from the templates, else the image's own value)},
+#   "events": [{..., "images": [image indexes]}],
+#   ... same top-level metadata as schema 1 ...
+# }
+# Each distinct image is stored once. The flat schema-1 "images" list is not stored:
+# it is every Drive event's images, stably sorted by lower-cased name.
+# assets/site.js (expandGalleryData) turns this back into the schema-1 shape.
+# -------------------------------------------------------------
+
+GALLERY_SCHEMA_COMPACT = 2
+
+# Per-image fields stored as optional columns in schema 2 (only if any image has them).
+COMPACT_OPTIONAL_FIELDS = ["width", "height", "taken_at", "placeholder"]
+
+
+def encode_compact_gallery(payload: dict) -> dict:
+    """Convert a schema-1 payload into the compact schema-2 layout."""
+    columns: Dict[str, list] = {"id": [], "name": [], "mime": [], "link": []}
+    mime_types: List[str] = []
+    index: Dict[tuple, int] = {}
+
+    # Variants are rebuilt from the ID, so only the width list is stored (once).
+    variant_widths: List[int] = []
+    for ev in payload["events"]:
+        for img in ev.get("images") or []:
+            if img.get("variants"):
+                variant_widths = [v["w"] for v in img["variants"] if v["w"] < THUMBNAIL_MAX_WIDTH]
+                break
+        if variant_widths:
+            break
+
+    all_images = [img for ev in payload["events"] for img in ev.get("images") or []]
+    optional = [name for name in COMPACT_OPTIONAL_FIELDS if any(name in img for img in all_images)]
+    for name in optional:
+        columns[name] = []
+
+    # Images whose url / variants are not the templated ones keep them explicitly (null = templated).
+    urls: List[Optional[str]] = []
+    variant_lists: List[Optional[list]] = []
+
+    def image_index(img: dict) -> int:
+        key = (
+            img.get("id", ""), img.get("name", ""), img.get("mimeType", ""), img.get("webViewLink", ""),
+            img.get("url", ""),
+        )
+        if key in index:
+            return index[key]
+
+        file_id, name, mime, link, url = key
+        urls.append(None if url == THUMBNAIL_URL_TEMPLATE.format(id=file_id) else url)
+        if mime not in mime_types:
+            mime_types.append(mime)
+
+        link_ref: object = link
+        for i, template in enumerate(VIEW_LINK_TEMPLATES):
+            if link == template.format(id=file_id):
+                link_ref = i
+                break
+
+        variants = img.get("variants") or []
+        if variant_widths:
+            standard = variants == drive_thumbnail_variants(file_id, variant_widths)
+        else:
+            standard = not variants
+        variant_lists.append(None if standard else variants)
+
+        columns["id"].append(file_id)
+        columns["name"].append(name)
+        columns["mime"].append(mime_types.index(mime))
+        columns["link"].append(link_ref)
+        for name in optional:
+            columns[name].append(img.get(name))
+        index[key] = len(columns["id"]) - 1
+        return index[key]
+
+    events: List[dict] = []
+    for ev in payload["events"]:
+        out = dict(ev)
+        if "images" in ev:
+            out["images"] = [image_index(img) for img in ev["images"]]
+        events.append(out)
+
+    compact = {k: v for k, v in payload.items() if k not in ("images", "events")}
+    compact["schema"] = GALLERY_SCHEMA_COMPACT
+    compact["thumb_url"] = THUMBNAIL_URL_TEMPLATE
+    compact["view_links"] = VIEW_LINK_TEMPLATES
+    compact["mime_types"] = mime_types
+    if any("variants" in img for ev in payload["events"] for img in ev.get("images") or []):
+        compact["variant_url"] = THUMBNAIL_VARIANT_TEMPLATE
+        compact["variant_widths"] = variant_widths + [THUMBNAIL_MAX_WIDTH]
+    if any(u is not None for u in urls):
+        columns["url"] = urls
+    if any(v is not None for v in variant_lists):
+        columns["variants"] = variant_lists
+    compact["images"] = columns
+    compact["events"] = events
+    return compact
+
+
+class GalleryShardWriter:
+    """
+    Write the sharded gallery layout one event at a time:
+      <shards_dir>/manifest.json           small index the site loads first
+      <shards_dir>/events/<hash>.json      one event (with its images) per file
+
+    Shard names are a hash of their bytes, so an unchanged event keeps its URL.
+    close() writes the manifest and deletes shards it no longer references.
+    """
+
+    def __init__(self, shards_dir: str):
+        self.shards_dir = shards_dir
+        self.events_dir = os.path.join(shards_dir, "events")
+        os.makedirs(self.events_dir, exist_ok=True)
+        self.written = 0
+        self.keep: set = set()
+        self.entries: List[dict] = []
+
+    def add(self, ev: dict) -> None:
+        body = json.dumps(ev, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        name = hashlib.sha256(body).hexdigest()[:16] + ".json"
+        self.keep.add(name)
+
+        path = os.path.join(self.events_dir, name)
+        if not os.path.exists(path):
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+            self.written += 1
+
+        # Everything except the image list, so the site can render titles and the
+        # past-events list without downloading any shard.
+        entry = {k: v for k, v in ev.items() if k != "images"}
+        entry["image_count"] = len(ev.get("images") or [])
+        entry["shard"] = f"events/{name}"
+        self.entries.append(entry)
+
+    def close(self, header: dict, count: int) -> int:
+        """Write manifest.json (header = the gallery.json metadata). Returns shards written."""
+        for name in os.listdir(self.events_dir):
+            if name.endswith(".json") and name not in self.keep:
+                os.remove(os.path.join(self.events_dir, name))
+
+        months = sorted({e.get("month", "") for e in self.entries if e.get("month")}, reverse=True)
+        manifest = {
+            "_comment": header["_comment"],
+            "updated_at": header["updated_at"],
+            "folder_id": header["folder_id"],
+            "root_folder": header["root_folder"],
+            "count": count,
+            "months": months,
+            "events": self.entries,
+        }
+
+        path = os.path.join(self.shards_dir, "manifest.json")
+        if feed_diff.content_changed(path, manifest):
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, path)
+        return self.written
+
+
+# -------------------------------------------------------------
+# Streaming pipeline
+# -------------------------------------------------------------
+# plan events -> walk Drive (per event) -> enrich (variants, placeholders) -> write
+#
+# Every stage is a generator, so only a handful of events are in memory at a time.
+# Finished events are spooled to a temp file; the final gallery.json is then
+# streamed from the spool. The flat "images" list is a k-way merge of the
+# per-event lists (each already sorted by name), which gives exactly the same
+# order as sorting everything in memory.
+# -------------------------------------------------------------
+
+# Events whose Drive trees are listed together when listing concurrently or batched.
+STREAM_CHUNK_EVENTS = 16
+
+
+def json_dumps_indented(obj) -> str:
+    """json.dumps(obj, indent=2, ensure_ascii=False), via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+def json_dumps_line(obj) -> str:
+    """One-line JSON for the spool files."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def json_loads(raw):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def plan_events(folders: List[dict], external_events: List[dict]) -> List[dict]:
+    """
+    Event skeletons in final output order (month desc, Drive before external within
+    a month, as the old "sort everything at the end" did). Drive events get their
+    images later, in iter_walked_events(); "_folder" is the Drive folder entry.
+    """
+    planned: List[dict] = []
+    for f in folders:
+        folder_id = f["id"]
+        folder_name = f.get("name", "")
+        folder_desc = (f.get("description") or "").strip()
+        photographer, note = parse_event_meta_from_description(folder_desc)
+        planned.append({
+            "type": "drive",
+            "id": folder_id,
+            "month": parse_month_from_name(folder_name) or "0000-00",
+            "title": prettify_title(folder_name) or folder_name,
+            "folder_url": drive_folder_url(folder_id),
+            "photographer": photographer,
+            "note": note,
+            "_folder": f,
+        })
+    planned.extend(external_events)
+    planned.sort(key=lambda ev: month_sort_key(ev.get("month", "")), reverse=True)
+    return planned
+
+
+def iter_walked_events(
+    api_key: str,
+    planned: List[dict],
+    collect_images,
+    workers: int,
+    batch_parents: int,
+) -> Iterable[dict]:
+    """
+    Pipeline stage: yield each planned event with its "images" filled in.
+
+    collect_images(folder_id, listings) walks one Drive event. With workers > 1 or
+    batching, the Drive trees of STREAM_CHUNK_EVENTS events are prefetched together
+    (so requests stay concurrent / batched) and dropped once those events are done.
+    """
+    prefetch = workers > 1 or batch_parents > 1
+    chunk_size = STREAM_CHUNK_EVENTS if prefetch else max(1, len(planned))
+    for start in range(0, len(planned), chunk_size):
+        chunk = planned[start:start + chunk_size]
+        listings = None
+        if prefetch:
+            roots = [ev["id"] for ev in chunk if ev.get("type") == "drive"]
+            listings = prefetch_drive_listings(api_key, roots, workers, batch_parents)
+
+        for ev in chunk:
+            if ev.get("type") != "drive":
+                yield ev
+                continue
+            out = {k: v for k, v in ev.items() if k != "_folder"}
+            out["images"] = collect_images(ev["id"], listings)
+            yield out
+
+
+def iter_enriched_events(
+    events: Iterable[dict],
+    variant_widths: List[int],
+    placeholder_cache: Optional[Dict[str, str]],
+    pool: ThreadPoolExecutor,
+    stats: Dict[str, int],
+) -> Iterable[dict]:
+    """Pipeline stage: optional responsive variants and placeholder colours, per event."""
+    for ev in events:
+        if variant_widths:
+            add_image_variants([ev], variant_widths)
+        if placeholder_cache is not None:
+            stats["placeholders"] = stats.get("placeholders", 0) + add_image_placeholders([ev], placeholder_cache, pool)
+        yield ev
+
+
+def _indent_block(text: str, level: int) -> str:
+    return text.replace("\n", "\n" + "  " * level)
+
+
+def write_gallery_json_streaming(
+    out_path: str,
+    header: dict,
+    events: Iterable[dict],
+    footer: dict,
+    on_event=None,
+) -> Tuple[int, int, bool]:
+    """
+    Stream a schema-1 gallery.json. The bytes are identical to
+    json.dump(payload, f, indent=2, ensure_ascii=False) of the in-memory payload
+    {**header, "count", "images", "events", **footer}.
+
+    Events are spooled (one JSON line each) as they arrive, and so are their Drive
+    images (one line each, a blank line after every event's run), so memory use
+    does not grow with the gallery. on_event(ev) is called for every event (used
+    for shards). The file is replaced atomically, and only if more than updated_at
+    changed (see scripts/feed_diff.py). Returns (image count, event count, written).
+    """
+    out_dir = os.path.dirname(out_path) or "."
+    os.makedirs(out_dir, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(prefix=".gallery-", dir=out_dir) as spool_dir:
+        events_spool = os.path.join(spool_dir, "events.jsonl")
+        images_spool = os.path.join(spool_dir, "images.jsonl")
+
+        runs: List[int] = []  # byte offset where each Drive event's image run starts
+        image_count = event_count = 0
+        # Identity -> content digest, for the change report (a few bytes per item).
+        digests: Dict[str, Dict[str, str]] = {"events": {}, "images": {}}
+        with open(events_spool, "wb") as ef, open(images_spool, "wb") as imf:
+            for ev in events:
+                if on_event is not None:
+                    on_event(ev)
+                ef.write(json_dumps_line(ev).encode("utf-8") + b"\n")
+                event_count += 1
+                feed_diff.digest_items([ev], into=digests["events"])
+                if ev.get("type") != "drive" or not ev.get("images"):
+                    continue
+                runs.append(imf.tell())
+                for img in ev["images"][:MAX_IMAGES_PER_EVENT]:
+                    imf.write(json_dumps_line(img).encode("utf-8") + b"\n")
+                    image_count += 1
+                    feed_diff.digest_items([img], into=digests["images"])
+                imf.write(b"\n")
+
+        def iter_run(f, pos: int) -> Iterable[dict]:
+            # One shared handle for every run: heapq.merge pulls from them one at a time.
+            while True:
+                f.seek(pos)
+                line = f.readline()
+                if line in (b"", b"\n"):
+                    return
+                pos = f.tell()
+                yield json_loads(line)
+
+        def iter_lines(path: str) -> Iterable[dict]:
+            with open(path, "rb") as f:
+                for line in f:
+                    yield json_loads(line)
+
+        def write_list(out, items: Iterable[dict]) -> None:
+            first = True
+            for item in items:
+                out.write(("[\n    " if first else ",\n    ") + _indent_block(json_dumps_indented(item), 2))
+                first = False
+            out.write("[]" if first else "\n  ]")
+
+        tmp = out_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as out, open(images_spool, "rb") as imf:
+            out.write("{")
+            for key, value in header.items():
+                out.write(f"\n  {json.dumps(key)}: {_indent_block(json_dumps_indented(value), 1)},")
+            out.write(f'\n  "count": {image_count},\n  "images": ')
+            sort_key = lambda img: (img.get("name", "") or "").lower()  # noqa: E731
+            # Stable across runs (ties keep event order), like one big stable sort.
+            write_list(out, heapq.merge(*(iter_run(imf, pos) for pos in runs), key=sort_key))
+            out.write(',\n  "events": ')
+            write_list(out, iter_lines(events_spool))
+            for key, value in footer.items():
+                out.write(f",\n  {json.dumps(key)}: {_indent_block(json_dumps_indented(value), 1)}")
+            out.write("\n}")
+
+        if not gallery_json_changed(out_path, tmp, digests, {**header, "count": image_count, **footer}):
+            os.remove(tmp)
+            return image_count, event_count, False
+        os.replace(tmp, out_path)
+
+    return image_count, event_count, True
+
+
+def gallery_json_changed(out_path: str, new_path: str, digests: Dict[str, Dict[str, str]], scalars: dict) -> bool:
+    """
+    Compare a freshly streamed gallery.json with the existing one, ignoring updated_at.
+    The bytes are compared line by line; the old file is only parsed (to print the
+    structural diff) when something actually changed.
+    """
+    if feed_diff.force_write() or not os.path.exists(out_path):
+        return True
+    if feed_diff.files_equal_ignoring(out_path, new_path):
+        print(f"[NYRG] {out_path} unchanged (ignoring updated_at); not rewriting it.")
+        return False
+
+    old = feed_diff.load_json(out_path)
+    if not isinstance(old, dict):
+        return True
+    diff = {
+        key: feed_diff.digest_diff(feed_diff.digest_items(old.get(key) or []), digests[key])
+        for key in ("events", "images")
+    }
+    diff.update(feed_diff.structural_diff({k: old.get(k) for k in scalars}, scalars))
+    print(f"[NYRG] {out_path} changed: {feed_diff.format_diff(diff)}")
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--folder-id", required=True, help="Google Drive root folder ID")
     ap.add_argument("--out", default="data/gallery.json", help="Output JSON path")
@@ -383,7 +1330,93 @@ def main() -> int:
             "If not set, uses NYRG_EXTERNAL_EVENTS_CSV_URL env var."
         ),
     )
-    args = ap.parse_args()
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("NYRG_GALLERY_WORKERS", "") or DEFAULT_WORKERS),
+        help=(
+            "Number of parallel Drive listings (default 1 = sequential). "
+            "If not set, uses NYRG_GALLERY_WORKERS env var."
+        ),
+    )
+    ap.add_argument(
+        "--manifest",
+        default="",
+        help=(
+            "Optional path to a local manifest file. Enables incremental mode: only changed "
+            "folders are re-listed. If not set, uses NYRG_GALLERY_MANIFEST env var."
+        ),
+    )
+    ap.add_argument(
+        "--batch-parents",
+        type=int,
+        default=int(os.environ.get("NYRG_GALLERY_BATCH_PARENTS", "") or DEFAULT_BATCH_PARENTS),
+        help=(
+            "List up to N folders per Drive request (default 0 = one request per folder). "
+            "If not set, uses NYRG_GALLERY_BATCH_PARENTS env var."
+        ),
+    )
+    ap.add_argument(
+        "--shards-dir",
+        default="",
+        help=(
+            "Optional directory for the sharded layout (manifest.json + events/<hash>.json), "
+            "written in addition to --out. If not set, uses NYRG_GALLERY_SHARDS_DIR env var."
+        ),
+    )
+    ap.add_argument(
+        "--schema",
+        choices=["1", "2"],
+        default=os.environ.get("NYRG_GALLERY_SCHEMA", "").strip() or "1",
+        help=(
+            "gallery.json layout: 1 = original (default), 2 = compact, de-duplicated. "
+            "If not set, uses NYRG_GALLERY_SCHEMA env var."
+        ),
+    )
+    ap.add_argument(
+        "--variant-widths",
+        default=os.environ.get("NYRG_GALLERY_VARIANT_WIDTHS", ""),
+        help=(
+            "Comma-separated image widths for responsive variants, e.g. 400,800,1200 "
+            "(default: none). If not set, uses NYRG_GALLERY_VARIANT_WIDTHS env var."
+        ),
+    )
+    ap.add_argument(
+        "--placeholders",
+        action="store_true",
+        default=os.environ.get("NYRG_GALLERY_PLACEHOLDERS", "").strip() in ("1", "true", "yes"),
+        help="Add a dominant-colour placeholder per image (needs numpy + Pillow). Env: NYRG_GALLERY_PLACEHOLDERS=1",
+    )
+    ap.add_argument(
+        "--placeholder-cache",
+        default=os.environ.get("NYRG_GALLERY_PLACEHOLDER_CACHE", "") or DEFAULT_PLACEHOLDER_CACHE,
+        help="Where placeholder colours are cached by file ID (keep it outside the repo).",
+    )
+    ap.add_argument(
+        "--cards-out",
+        default="",
+        help=(
+            "Where to write the pre-rendered Gallery page cards (default: _includes/gallery_cards.html "
+            "when --out is data/gallery.json, else gallery_cards.html next to --out)."
+        ),
+    )
+    ap.add_argument(
+        "--home-out",
+        default="",
+        help=(
+            "Homepage bundle whose rotator sample to update (default: data/home.json "
+            "when --out is data/gallery.json, else home.json next to --out)."
+        ),
+    )
+    ap.add_argument(
+        "--search-dir",
+        default="",
+        help=(
+            "Site search index to update (default: data/search when --out is data/gallery.json, "
+            "else search/ next to --out)."
+        ),
+    )
+    args = ap.parse_args(argv)
 
     api_key = os.environ.get("GOOGLE_API_KEY", "").strip()
     if not api_key:
@@ -391,73 +1424,194 @@ def main() -> int:
         return 2
 
     external_csv = (args.external_events_csv or os.environ.get("NYRG_EXTERNAL_EVENTS_CSV_URL", "")).strip()
+    manifest_path = os.path.expanduser(
+        (args.manifest or os.environ.get("NYRG_GALLERY_MANIFEST", "")).strip()
+    )
 
-    # 1) Internal Drive events: each top-level folder is an event.
-    folders = list_drive_event_folders(api_key, args.folder_id)
-    drive_events: List[dict] = []
-
-    for f in folders:
-        folder_id = f["id"]
-        folder_name = f.get("name", "")
-        month = parse_month_from_name(folder_name) or "0000-00"
-
-        images = walk_drive_folder_collect_images(api_key, folder_id, MAX_IMAGES_PER_EVENT)
-
-        folder_desc = (f.get("description") or "").strip()
-        photographer, note = parse_event_meta_from_description(folder_desc)
+    workers = max(1, args.workers)
+    batch_parents = max(0, args.batch_parents)
+    http_session(pool_size=workers)
+    metrics = run_metrics.current()
 
-        drive_events.append({
-            "type": "drive",
-            "id": folder_id,
-            "month": month,
-            "title": prettify_title(folder_name) or folder_name,
-            "folder_url": drive_folder_url(folder_id),
-            "photographer": photographer,
-            "note": note,
-            "images": images,
-        })
+    # 1) Internal Drive events: each top-level folder is an event.
+    with metrics.phase("list_event_folders"):
+        folders = list_drive_event_folders(api_key, args.folder_id)
+    metrics.set_items("drive_events", len(folders))
 
     # 2) External events from Google Sheet (published as CSV)
     external_events: List[dict] = []
     if external_csv:
         try:
-            external_events = fetch_external_events_from_csv(external_csv)
+            with metrics.phase("external_csv"):
+                external_events = fetch_external_events_from_csv(external_csv)
         except Exception as e:
             print(f"[NYRG] WARNING: failed to fetch external events CSV: {e}", file=sys.stderr)
             external_events = []
 
-    # 3) Merge and sort events by month desc
-    all_events = drive_events + external_events
-    all_events.sort(key=lambda ev: month_sort_key(ev.get("month", "")), reverse=True)
-
-    # 4) Backward-compatible flat images array for the homepage rotator
-    flat_images: List[dict] = []
-    for ev in all_events:
-        if ev.get("type") != "drive":
-            continue
-        for img in ev.get("images", [])[:MAX_IMAGES_PER_EVENT]:
-            flat_images.append(img)
-
-    flat_images.sort(key=lambda x: (x.get("name", "") or "").lower())
+    # 3) Merge and sort events by month desc (images are filled in while streaming)
+    planned = plan_events(folders, external_events)
+
+    # With a manifest, the whole tree's listings come from (and go back to) the manifest.
+    manifest: Optional[dict] = None
+    manifest_listings: Optional[Dict[str, List[dict]]] = None
+    changed_folders: set = set()
+    if manifest_path:
+        manifest = load_gallery_manifest(manifest_path)
+        with metrics.phase("incremental_refresh"):
+            manifest["folders"], changed_folders = refresh_drive_listings_incremental(
+                api_key, folders, manifest["folders"], workers, batch_parents
+            )
+        metrics.set_items("changed_folders", len(changed_folders))
+        manifest_listings = {fid: entry["children"] for fid, entry in manifest["folders"].items()}
+
+    cached_events = manifest["events"] if manifest is not None else {}
+    new_events: Dict[str, dict] = {}
+    reused = 0
+
+    def collect_images(folder_id: str, listings: Optional[Dict[str, List[dict]]]) -> List[dict]:
+        nonlocal reused
+        if manifest is None:
+            return walk_drive_folder_collect_images(api_key, folder_id, MAX_IMAGES_PER_EVENT, listings)
+
+        subtree = subtree_folder_ids(folder_id, manifest_listings)
+        cached = cached_events.get(folder_id)
+        if cached and cached.get("folders") == subtree and not changed_folders.intersection(subtree):
+            images = cached["images"]
+            reused += 1
+        else:
+            images = walk_drive_folder_collect_images(api_key, folder_id, MAX_IMAGES_PER_EVENT, manifest_listings)
+        # Stored before the enrich stage adds variants/placeholders (those are not cached here).
+        new_events[folder_id] = {"folders": subtree, "images": [dict(img) for img in images]}
+        return images
+
+    # Listings already come from the manifest; otherwise prefetch per chunk of events.
+    events = iter_walked_events(
+        api_key,
+        planned,
+        collect_images,
+        1 if manifest is not None else workers,
+        0 if manifest is not None else batch_parents,
+    )
 
-    payload = {
+    # 3b/3c) Optional: responsive image variants and placeholder colours (cached by file ID)
+    variant_widths = parse_variant_widths(args.variant_widths)
+    placeholder_cache: Optional[Dict[str, str]] = None
+    placeholder_path = os.path.expanduser(args.placeholder_cache)
+    if args.placeholders:
+        if placeholders_available():
+            placeholder_cache = load_placeholder_cache(placeholder_path)
+        else:
+            print("[NYRG] WARNING: --placeholders needs numpy and Pillow; skipping.", file=sys.stderr)
+
+    header = {
         "_comment": "THIS FILE IS AUTO-GENERATED. DO NOT EDIT MANUALLY. Run scripts/update_gallery_json.py instead.",
         "updated_at": iso_utc_now(),
         "folder_id": args.folder_id,
         "root_folder": {"id": args.folder_id, "url": drive_folder_url(args.folder_id)},
-        "count": len(flat_images),
-        "images": flat_images,
-        "events": all_events,
-        "external_events_csv": external_csv,
     }
-    
-    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
-    with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(payload, f, indent=2, ensure_ascii=False)
-
-    print(f"Wrote {len(flat_images)} images and {len(all_events)} events -> {args.out}")
+    footer = {"external_events_csv": external_csv}
+
+    shards_dir = (args.shards_dir or os.environ.get("NYRG_GALLERY_SHARDS_DIR", "")).strip()
+    shards = GalleryShardWriter(shards_dir) if shards_dir else None
+
+    # Search documents and page cards are collected as events stream by (they are not all kept in memory).
+    search_docs: List[dict] = []
+    cards = gallery_cards.CardCollector(header["root_folder"]["url"])
+    rotator = home_bundle.RotatorSampler()
+
+    def on_event(ev: dict) -> None:
+        if shards is not None:
+            shards.add(ev)
+        search_docs.append(search_index.gallery_doc(ev))
+        cards.add(ev)
+        rotator.add(ev)
+
+    stats: Dict[str, int] = {}
+    # "build" covers walking, enriching and writing: they are interleaved per event.
+    with metrics.phase("build"), ThreadPoolExecutor(max_workers=workers, **run_metrics.pool_kwargs()) as pool:
+        events = iter_enriched_events(events, variant_widths, placeholder_cache, pool, stats)
+
+        if args.schema == str(GALLERY_SCHEMA_COMPACT):
+            # The compact encoder de-duplicates across events, so it needs them all in memory.
+            all_events = list(events)
+            for ev in all_events:
+                on_event(ev)
+
+            # 4) Backward-compatible flat images array for the homepage rotator
+            flat_images: List[dict] = []
+            for ev in all_events:
+                if ev.get("type") != "drive":
+                    continue
+                for img in ev.get("images", [])[:MAX_IMAGES_PER_EVENT]:
+                    flat_images.append(img)
+            flat_images.sort(key=lambda x: (x.get("name", "") or "").lower())
+
+            payload = {**header, "count": len(flat_images), "images": flat_images, "events": all_events, **footer}
+            compact = encode_compact_gallery(payload)
+            written = feed_diff.content_changed(args.out, compact)
+            if written:
+                os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+                tmp = args.out + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    # No indentation: this layout is meant to be small and fast to parse.
+                    json.dump(compact, f, ensure_ascii=False, separators=(",", ":"))
+                os.replace(tmp, args.out)
+            image_count, event_count = len(flat_images), len(all_events)
+        else:
+            image_count, event_count, written = write_gallery_json_streaming(
+                args.out, header, events, footer, on_event=on_event
+            )
+
+    if written:
+        print(f"Wrote {image_count} images and {event_count} events -> {args.out}")
+    metrics.set_items("files_unchanged", 0 if written else 1)
+    metrics.set_items("images", image_count)
+    metrics.set_items("events", event_count)
+
+    # Not from an empty gallery either: that would drop every album from the search.
+    if image_count or event_count:
+        with metrics.phase("search_index"):
+            search_dir = args.search_dir or companion_path(args.out, str(search_index.default_dir()), "search")
+            search_index.update_source("gallery", search_docs, Path(search_dir))
+
+    # Pre-rendered Gallery page cards (_includes/gallery_cards.html), see gallery_cards.py.
+    # An empty gallery usually means a network or permission issue: keep the old cards.
+    if gallery_cards.enabled() and (image_count or event_count):
+        with metrics.phase("gallery_cards"):
+            cards_path = args.cards_out or companion_path(
+                args.out, str(gallery_cards.default_path()), "gallery_cards.html"
+            )
+            if gallery_cards.write(cards.entries, header["root_folder"]["url"], cards_path):
+                print(f"Wrote gallery cards for {len(cards.entries)} events -> {cards_path}")
+
+    # Homepage rotator sample in data/home.json, see home_bundle.py (not from an empty gallery either).
+    if image_count or event_count:
+        with metrics.phase("home_bundle"):
+            home_path = args.home_out or companion_path(args.out, str(home_bundle.default_path()), "home.json")
+            home_bundle.update_section("rotator", rotator.section(), Path(home_path))
+
+    if placeholder_cache is not None:
+        if stats.get("placeholders"):
+            save_placeholder_cache(placeholder_path, placeholder_cache)
+        print(f"[NYRG] Placeholders: {stats.get('placeholders', 0)} new")
+        metrics.set_items("placeholders_new", stats.get("placeholders", 0))
+
+    if shards is not None:
+        with metrics.phase("shards"):
+            written = shards.close(header, image_count)
+        metrics.set_items("shards_written", written)
+        print(f"Wrote {event_count} event shards ({written} new) -> {shards_dir}")
+
+    if manifest is not None:
+        manifest["events"] = new_events
+        with metrics.phase("save_manifest"):
+            save_gallery_manifest(manifest_path, manifest)
+        metrics.set_items("reused_events", reused)
+        print(
+            f"[NYRG] Incremental: {len(changed_folders)} of {len(manifest['folders'])} folders changed, "
+            f"{reused} of {len(folders)} events reused -> {manifest_path}"
+        )
     return 0
 
-
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_metrics.run_main("gallery", main))
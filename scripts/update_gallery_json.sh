@@ -6,6 +6,7 @@ echo "[NYRG] external CSV url (env) = ${NYRG_EXTERNAL_EVENTS_CSV_URL:-<unset>}"
 # ---------------- COLLABORATOR NOTE -------------------------
 # This script is a thin wrapper around update_gallery_json.py.
 # It writes the output to: data/gallery.json (repo root)
+# and the Gallery page cards to: _includes/gallery_cards.html
 #
 # External events are optional and come from a Google Sheet published as CSV.
 # If you do not use external events, leave NYRG_EXTERNAL_EVENTS_CSV_URL unset.
@@ -5,7 +5,8 @@ set -euo pipefail
 # NYRG: Daily Jobs JSON updater (systemd)
 #
 # 1) Runs scripts/update_jobs_json.py to refresh data/jobs.json
-# 2) Commits ONLY if jobs.json changed
+#    (and data/jobs_changes.json, the added/updated/removed feed)
+# 2) Commits ONLY if jobs.json or jobs_changes.json changed
 # 3) Pushes ONLY on main
 #
 # Required env vars (recommended via systemd EnvironmentFile):
@@ -37,6 +38,7 @@ REPO_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 cd "$REPO_DIR"
 
 JSON_PATH="data/jobs.json"
+CHANGES_PATH="data/jobs_changes.json"
 GENERATOR="scripts/update_jobs_json.py"
 
 : "${NYRG_JOBS_CSV_URL:?Missing NYRG_JOBS_CSV_URL env var}"
@@ -68,17 +70,20 @@ fi
 # ------------------------------------------------------------
 
 # Safety: do not run if there are unrelated uncommitted changes.
-# Allow ONLY data/jobs.json to change (matches gallery pattern).
+# Allow ONLY data/jobs.json, its change feed and the search index to change (matches gallery pattern).
 if git status --porcelain --untracked-files=no \
-  | grep -vqE "^[ MARC?]{1,2}[[:space:]]+$JSON_PATH$"
+  | grep -vqE "^[ MARC?]{1,2}[[:space:]]+($JSON_PATH|$CHANGES_PATH|data/search/.*)$"
 then
-  echo "[NYRG] Working tree has unrelated changes (not $JSON_PATH). Commit or stash them first."
+  echo "[NYRG] Working tree has unrelated changes (not $JSON_PATH / $CHANGES_PATH / data/search). Commit or stash them first."
   git status --porcelain
   exit 1
 fi
 
-# Stage just jobs.json
+# Stage just jobs.json (+ the change feed once it exists)
 git add "$JSON_PATH"
+if [[ -f "$CHANGES_PATH" ]]; then git add "$CHANGES_PATH"; fi
+# Site search index (scripts/search_index.py). -A also stages deleted term shards.
+if [[ -d data/search ]]; then git add -A data/search; fi
 
 # If nothing changed, exit cleanly
 if git diff --cached --quiet; then
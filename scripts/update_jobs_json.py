@@ -12,28 +12,58 @@ IMPORTANT:
 
 Environment:
 - NYRG_JOBS_CSV_URL (required): published CSV link for the "For Show" sheet/tab.
+- NYRG_JOBS_JSON_PATH (optional): output path (default: data/jobs.json).
+- NYRG_JOBS_CHANGES_PATH (optional): change feed path (default: jobs_changes.json next to jobs.json).
+- NYRG_JOBS_INDEX_PATH (optional): row index (default: ~/.cache/nyrg/jobs_index.json).
+- NYRG_HTTP_CACHE* (optional): shared HTTP cache settings, see scripts/http_cache.py.
+- NYRG_METRICS_* (optional): per-run metrics export, see scripts/run_metrics.py.
+- NYRG_SEARCH_* (optional): site search index, see scripts/search_index.py.
+- NYRG_FORCE_WRITE=1 (optional): rewrite jobs.json even if only updated_at would change
+  (by default an unchanged file is left alone, see scripts/feed_diff.py).
 
 Output:
 - data/jobs.json
+- data/jobs_changes.json: recent added / updated / removed postings, newest first
+  (only rewritten when the visible jobs changed)
 
 Filtering rules (website display):
 - If Deadline parses as a date and is in the past, the job is hidden.
 - Otherwise, the job is shown only if the "Show?" column is truthy.
 
+Row index:
+- Every CSV row is fingerprinted (hash of its cells). The index remembers, per
+  fingerprint, the parsed job, its deadline_iso and Show? flag, so only new or edited
+  rows are parsed again. Expiry is re-checked every run from the stored deadline_iso.
+- If the sheet is unchanged (HTTP 304), the CSV is not read at all.
+- If the header row changes, the index is rebuilt.
+- Each job gets a stable "id" (from title + company) used by the change feed.
+
 """
 
 import csv
+import hashlib
 import json
 import os
-from datetime import datetime, timezone
-import urllib.request
+from datetime import date, datetime, timezone
 import re
 
+import feed_diff
+import run_metrics
+import search_index
+from http_cache import default_cache
+
 CSV_URL = os.environ.get("NYRG_JOBS_CSV_URL")
-OUTPUT_PATH = "data/jobs.json"
+OUTPUT_PATH = os.environ.get("NYRG_JOBS_JSON_PATH", "").strip() or "data/jobs.json"
+CHANGES_PATH = os.environ.get("NYRG_JOBS_CHANGES_PATH", "").strip()
+INDEX_PATH = os.path.expanduser(
+    os.environ.get("NYRG_JOBS_INDEX_PATH", "").strip() or os.path.join("~", ".cache", "nyrg", "jobs_index.json")
+)
 
+# Bump when the index layout or the parsed job fields change.
+INDEX_VERSION = 1
 
-TODAY = datetime.now(timezone.utc).date()
+# Change feed entries kept in jobs_changes.json.
+MAX_CHANGE_ENTRIES = 100
 
 TRUTHY = {"1", "true", "yes", "y", "on", "open"}
 
@@ -95,98 +125,286 @@ def is_truthy(v):
 
 
 # -----------------------------------------------------
-# Main
+# Today (per run, not per import: refresh_all keeps the module loaded)
 # -----------------------------------------------------
 
-def main():
+def today():
+    return datetime.now(timezone.utc).date()
 
-    if not CSV_URL:
-        raise RuntimeError("NYRG_JOBS_CSV_URL not set")
 
-    print("Downloading sheet...")
+# -----------------------------------------------------
+# Row index: fingerprint -> parsed row
+# -----------------------------------------------------
 
-    with urllib.request.urlopen(CSV_URL) as r:
-        lines = r.read().decode("utf-8").splitlines()
+def row_fingerprint(row):
+    # Cells in sheet order (extra cells end up in a list under the None key).
+    body = json.dumps(list(row.values()), ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(body.encode("utf-8")).hexdigest()
 
-    reader = csv.DictReader(lines)
 
-    headers = reader.fieldnames
+def posting_id(title, company):
+    """Stable id of a posting: edits to other fields keep it, a new title or company does not."""
+    key = norm(title) + "|" + norm(company)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
 
-    title_col = find_col(headers, "title", "position")
-    company_col = find_col(headers, "company", "person", "employer")
-    desc_col = find_col(headers, "description", "details")
-    location_col = find_col(headers, "location")
-    apply_col = find_col(headers, "apply", "url", "email", "link")
-    deadline_col = find_col(headers, "deadline")
-    show_col = find_col(headers, "show", "open")
-    notes_col = find_col(headers, "note")
 
-    print("Detected columns:")
-    print("title:", title_col)
-    print("company:", company_col)
-    print("description:", desc_col)
-    print("location:", location_col)
-    print("apply:", apply_col)
-    print("deadline:", deadline_col)
-    print("show:", show_col)
-    print("notes:", notes_col)
+def detect_columns(headers):
+    return {
+        "title": find_col(headers, "title", "position"),
+        "company": find_col(headers, "company", "person", "employer"),
+        "description": find_col(headers, "description", "details"),
+        "location": find_col(headers, "location"),
+        "apply": find_col(headers, "apply", "url", "email", "link"),
+        "deadline": find_col(headers, "deadline"),
+        "show": find_col(headers, "show", "open"),
+        "notes": find_col(headers, "note"),
+    }
+
+
+def parse_row(row, cols):
+    """Index entry for one CSV row: the job record plus what visibility needs."""
+    def cell(name):
+        return row.get(cols[name], "") if cols[name] else ""
+
+    deadline_raw = (cell("deadline") or "").strip()
+    deadline = parse_date(deadline_raw)
+    title, company = cell("title"), cell("company")
+
+    return {
+        "id": posting_id(title, company),
+        "show": is_truthy((cell("show") or "").strip()),
+        "deadline_iso": deadline.strftime("%Y-%m-%d") if deadline else "",
+        "job": {
+            "title": title,
+            "company": company,
+            "description": cell("description"),
+            "location": cell("location"),
+            "apply_url": cell("apply"),
+            "deadline": deadline_raw,
+            "deadline_iso": deadline.strftime("%Y-%m-%d") if deadline else "",
+            "note": cell("notes"),
+        },
+    }
 
-    jobs = []
 
+def is_visible(entry, day):
+    # A parsed deadline wins; otherwise the Show? flag decides.
+    if entry["deadline_iso"]:
+        return date.fromisoformat(entry["deadline_iso"]) >= day
+    return entry["show"]
+
+
+def load_index(path, csv_url):
+    data = feed_diff.load_json(path)
+    if (
+        not isinstance(data, dict)
+        or data.get("version") != INDEX_VERSION
+        or data.get("csv_url") != csv_url
+    ):
+        return None
+    return data
+
+
+def save_index(path, index):
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"WARNING: could not save the jobs row index: {e}")
+
+
+def update_index(lines, index, csv_url):
+    """
+    Read the CSV against the previous index. Returns (index, parsed, reused):
+    only rows whose fingerprint is new are parsed; rows gone from the sheet drop out.
+    """
+    reader = csv.DictReader(lines)
+    headers = reader.fieldnames or []
+
+    if index is None or index.get("headers") != headers:
+        if index is not None:
+            print("Header row changed; rebuilding the row index.")
+        cols = detect_columns(headers)
+        old_rows = {}
+    else:
+        cols = index["columns"]
+        old_rows = index["rows"]
+
+    print("Detected columns:")
+    for name, col in cols.items():
+        print(f"{name}:", col)
+
+    rows, order = {}, []
+    parsed = reused = 0
     for row in reader:
+        fp = row_fingerprint(row)
+        if fp not in rows:
+            if fp in old_rows:
+                rows[fp] = old_rows[fp]
+                reused += 1
+            else:
+                rows[fp] = parse_row(row, cols)
+                parsed += 1
+        order.append(fp)
+
+    new_index = {
+        "version": INDEX_VERSION,
+        "csv_url": csv_url,
+        "headers": headers,
+        "columns": cols,
+        "rows": rows,
+        "order": order,
+    }
+    return new_index, parsed, reused
 
-        deadline_raw = (row.get(deadline_col) or "").strip() if deadline_col else ""
-        open_flag = (row.get(show_col) or "").strip() if show_col else ""
 
-        deadline = parse_date(deadline_raw)
+def visible_jobs(index, day):
+    """jobs.json records in sheet order, with ids (repeated postings get -2, -3, ...)."""
+    jobs, seen = [], {}
+    for fp in index["order"]:
+        entry = index["rows"][fp]
+        if not is_visible(entry, day):
+            continue
+        n = seen[entry["id"]] = seen.get(entry["id"], 0) + 1
+        jobs.append({"id": entry["id"] if n == 1 else f"{entry['id']}-{n}", **entry["job"]})
+    return jobs
 
-        show = True
 
-        if deadline:
-            if deadline < TODAY:
-                show = False
-        else:
-            if not is_truthy(open_flag):
-                show = False
+# -----------------------------------------------------
+# Change feed (against the published jobs.json)
+# -----------------------------------------------------
+
+def job_summary(job):
+    return {"id": job["id"], "title": job.get("title", ""), "company": job.get("company", "")}
+
 
-        if not show:
+def job_changes(old_jobs, new_jobs, day):
+    """{"added", "updated", "removed"} between two jobs lists, matched by id."""
+    def keyed(jobs):
+        out = {}
+        for job in jobs:
+            # jobs.json files written before ids existed: derive the id the same way.
+            jid = job.get("id") or posting_id(job.get("title", ""), job.get("company", ""))
+            out.setdefault(jid, {**job, "id": jid})
+        return out
+
+    def digest(job):
+        return feed_diff.item_digest({k: v for k, v in job.items() if k != "id"})
+
+    old, new = keyed(old_jobs), keyed(new_jobs)
+    removed = []
+    for jid, job in old.items():
+        if jid in new:
             continue
+        expired = bool(job.get("deadline_iso")) and date.fromisoformat(job["deadline_iso"]) < day
+        removed.append({**job_summary(job), "reason": "expired" if expired else "removed"})
+    return {
+        "added": [job_summary(j) for jid, j in new.items() if jid not in old],
+        "updated": [job_summary(j) for jid, j in new.items() if jid in old and digest(j) != digest(old[jid])],
+        "removed": removed,
+    }
 
-        jobs.append({
-            "title": row.get(title_col, ""),
-            "company": row.get(company_col, ""),
-            "description": row.get(desc_col, ""),
-            "location": row.get(location_col, ""),
-            "apply_url": row.get(apply_col, ""),
-            "deadline": deadline_raw,
-            "deadline_iso": deadline.strftime("%Y-%m-%d") if deadline else "",
-            "note": row.get(notes_col, "")
-        })
 
-    os.makedirs("data", exist_ok=True)
+def append_change_feed(path, changes, stamp):
+    data = feed_diff.load_json(path)
+    entries = data.get("changes", []) if isinstance(data, dict) else []
+    entries = [{"at": stamp, **changes}] + entries
+    payload = {
+        "_comment": "THIS FILE IS AUTO-GENERATED. DO NOT EDIT MANUALLY. Recent changes to data/jobs.json, newest first.",
+        "updated_at": stamp,
+        "changes": entries[:MAX_CHANGE_ENTRIES],
+    }
+    safe_write_json(path, payload)
+
+
+# -----------------------------------------------------
+# Main
+# -----------------------------------------------------
+
+def main(output_path=None, changes_path=None, search_dir=None):
+
+    output_path = output_path or OUTPUT_PATH
+    changes_path = changes_path or CHANGES_PATH or os.path.join(os.path.dirname(output_path), "jobs_changes.json")
+
+    if not CSV_URL:
+        raise RuntimeError("NYRG_JOBS_CSV_URL not set")
+
+    metrics = run_metrics.current()
+    day = today()
+    print("Downloading sheet...")
 
+    # Conditional GET through the shared cache: an unchanged sheet costs a 304.
+    with metrics.phase("download"):
+        r = default_cache().get(CSV_URL, timeout=60)
+        r.raise_for_status()
+
+    index = load_index(INDEX_PATH, CSV_URL)
+
+    with metrics.phase("parse"):
+        if r.not_modified and index is not None:
+            # Same sheet as last run: only expiry can change, and that needs no parsing.
+            print("Sheet unchanged since last run (304); using the row index.")
+            parsed, reused = 0, len(index["order"])
+        else:
+            if r.not_modified:
+                print("Sheet unchanged since last run (304).")
+            lines = r.content.decode("utf-8").splitlines()
+            index, parsed, reused = update_index(lines, index, CSV_URL)
+            save_index(INDEX_PATH, index)
+        jobs = visible_jobs(index, day)
+
+    rows = len(index["order"])
+    print(f"Rows: {rows} ({parsed} parsed, {reused} from the row index)")
+
+    old = feed_diff.load_json(output_path)
+    changes = job_changes(old.get("jobs", []) if isinstance(old, dict) else [], jobs, day)
+
+    stamp = datetime.now(timezone.utc).isoformat()
     payload = {
         "_comment": "THIS FILE IS AUTO-GENERATED. DO NOT EDIT MANUALLY. Jobs come from the NYRG Google Sheet.",
-        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": stamp,
         "jobs": jobs
     }
 
-    safe_write_json(OUTPUT_PATH, payload)
-    
-    print(f"Saved {len(jobs)} jobs → {OUTPUT_PATH}")
+    with metrics.phase("write"):
+        written = safe_write_json(output_path, payload)
+        if any(changes.values()):
+            append_change_feed(changes_path, changes, stamp)
+    with metrics.phase("search_index"):
+        search_index.update_source("job", [search_index.job_doc(j) for j in jobs], search_dir)
+    metrics.set_items("rows", rows)
+    metrics.set_items("rows_parsed", parsed)
+    metrics.set_items("jobs", len(jobs))
+    for kind, items in changes.items():
+        metrics.set_items(f"jobs_{kind}", len(items))
+    metrics.set_items("files_unchanged", 0 if written else 1)
+
+    if any(changes.values()):
+        print(
+            f"Changes: {len(changes['added'])} added, {len(changes['updated'])} updated, "
+            f"{len(changes['removed'])} removed → {changes_path}"
+        )
+    if written:
+        print(f"Saved {len(jobs)} jobs → {output_path}")
 
 # -----------------------------------------------------
-# Safe JSON write (atomic)
+# Safe JSON write (atomic, skipped if only updated_at changed)
 # -----------------------------------------------------
 
 def safe_write_json(path, payload):
+    if not feed_diff.content_changed(path, payload):
+        return False
     os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
     tmp = path + '.tmp'
     with open(tmp, 'w', encoding='utf-8') as f:
         json.dump(payload, f, indent=2, ensure_ascii=False)
         f.write('\n')
     os.replace(tmp, path)
+    return True
 
 if __name__ == "__main__":
-    main()
+    run_metrics.run_main("jobs", main)
 